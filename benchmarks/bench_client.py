@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+
+from argparse import ArgumentParser
+from asyncio import run as asyncio_run, start_server, sleep as asyncio_sleep, gather as asyncio_gather, StreamReader, \
+    StreamWriter, IncompleteReadError
+from json import dumps as json_dumps
+from multiprocessing import Process, Event
+from time import perf_counter
+from typing import Callable
+
+from httpx import AsyncClient as HTTPXAsyncClient
+
+from twitter_api.client import make_http_client
+from twitter_api.synthetic import make_user_object
+
+
+async def serve_stub(port: int, latency: float, handshake_latency: float, ready) -> None:
+    body: bytes = json_dumps(make_user_object(user_id=1, with_status=True)).encode()
+    response: bytes = (
+        b'HTTP/1.1 200 OK\r\n'
+        b'Content-Type: application/json\r\n'
+        b'Content-Length: ' + str(len(body)).encode() + b'\r\n'
+        b'\r\n' + body
+    )
+
+    async def handle(reader: StreamReader, writer: StreamWriter) -> None:
+        try:
+            if handshake_latency:
+                await asyncio_sleep(handshake_latency)
+            while True:
+                request_head: bytes = await reader.readuntil(b'\r\n\r\n')
+                if latency:
+                    await asyncio_sleep(latency)
+                writer.write(response)
+                await writer.drain()
+                if b'connection: close' in request_head.lower():
+                    break
+        except (IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    server = await start_server(handle, host='127.0.0.1', port=port, backlog=1024)
+    ready.set()
+    async with server:
+        await server.serve_forever()
+
+
+def run_stub_server(port: int, latency: float, handshake_latency: float, ready) -> None:
+    asyncio_run(serve_stub(port=port, latency=latency, handshake_latency=handshake_latency, ready=ready))
+
+
+async def requests_per_second(
+    make_client: Callable[[], HTTPXAsyncClient],
+    url: str,
+    concurrency: int,
+    num_requests: int
+) -> float:
+    async with make_client() as http_client:
+        remaining = iter(range(num_requests))
+
+        async def work() -> None:
+            for _ in remaining:
+                (await http_client.get(url=url)).raise_for_status()
+
+        start: float = perf_counter()
+        await asyncio_gather(*(work() for _ in range(concurrency)))
+        return num_requests / (perf_counter() - start)
+
+
+def main():
+    parser = ArgumentParser(
+        description=(
+            'Measure the requests per second of the default client and of the client made by `make_http_client` '
+            'against a local stub server, at different concurrency levels.'
+        )
+    )
+    parser.add_argument('--port', help='The port on which to run the stub server.', type=int, default=8765)
+    parser.add_argument(
+        '--latency',
+        help='The number of seconds the stub server waits before responding, to simulate the network.',
+        type=float,
+        default=0.1
+    )
+    parser.add_argument(
+        '--handshake-latency',
+        help=(
+            'The number of seconds the stub server waits before serving a new connection, to simulate the TCP and TLS '
+            'handshakes that reusing connections avoids.'
+        ),
+        type=float,
+        default=0.1
+    )
+    parser.add_argument('--num-requests', help='The number of requests per measurement.', type=int, default=2000)
+    parser.add_argument(
+        '--concurrency',
+        help='The concurrency levels at which to measure.',
+        type=int,
+        nargs='+',
+        default=[1, 10, 50, 100, 200]
+    )
+    args = parser.parse_args()
+
+    ready = Event()
+    server_process = Process(
+        target=run_stub_server,
+        args=(args.port, args.latency, args.handshake_latency, ready),
+        daemon=True
+    )
+    server_process.start()
+    ready.wait()
+
+    url = f'http://127.0.0.1:{args.port}/1.1/users/show.json'
+
+    clients: list[tuple[str, Callable[[], HTTPXAsyncClient]]] = [
+        ('httpx.AsyncClient defaults', lambda: HTTPXAsyncClient()),
+        ('make_http_client', lambda: make_http_client(http2=False)),
+        ('make_http_client, 100 idle connections', lambda: make_http_client(http2=False, max_keepalive_connections=100))
+    ]
+
+    try:
+        print(
+            f'Stub server latency: {args.latency * 1000:.0f} ms, handshake latency: '
+            f'{args.handshake_latency * 1000:.0f} ms, {args.num_requests} requests per measurement'
+        )
+        for concurrency in args.concurrency:
+            for name, make_client in clients:
+                try:
+                    result = f'{asyncio_run(requests_per_second(make_client, url, concurrency, args.num_requests)):.0f}'
+                except Exception as e:
+                    result = f'failed ({e.__class__.__name__})'
+                print(f'concurrency {concurrency:>4}, {name}: {result} req/s')
+    finally:
+        server_process.terminate()
+
+
+if __name__ == '__main__':
+    main()
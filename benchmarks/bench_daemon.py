@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+
+from argparse import ArgumentParser
+from json import dumps as json_dumps
+from multiprocessing import Process, Event
+from pathlib import Path
+from socket import socket, AF_UNIX, SOCK_STREAM
+from statistics import median, quantiles
+from subprocess import run as subprocess_run, Popen, DEVNULL
+from sys import executable
+from tempfile import TemporaryDirectory
+from time import perf_counter, sleep
+
+from bench_client import run_stub_server
+
+ROOT_DIRECTORY: Path = Path(__file__).resolve().parent.parent
+
+
+def time_command(command: list[str]) -> float:
+    start: float = perf_counter()
+    subprocess_run(command, check=True, stdout=DEVNULL)
+    return perf_counter() - start
+
+
+def time_socket_request(socket_path: str, request: dict) -> float:
+    start: float = perf_counter()
+    with socket(AF_UNIX, SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        connection.sendall(json_dumps(request).encode() + b'\n')
+        with connection.makefile(mode='rb') as response_file:
+            for line in response_file:
+                if not line.startswith(b'{"result"'):
+                    if not line.startswith(b'{"done"'):
+                        raise RuntimeError(line.decode())
+                    break
+    return perf_counter() - start
+
+
+def format_latencies(name: str, latencies: list[float]) -> str:
+    p90: float = quantiles(latencies, n=10)[-1] if len(latencies) > 1 else latencies[0]
+    return f'{name}: median {median(latencies) * 1000:.1f} ms, p90 {p90 * 1000:.1f} ms'
+
+
+def main():
+    parser = ArgumentParser(
+        description=(
+            'Measure the latency of the user action performed by a cold invocation of `twitter_api.py`, by '
+            '`twitter_api_client.py` through a warm serve action, and by a request to the serve action\'s socket, '
+            'against a local stub server.'
+        )
+    )
+    parser.add_argument('--port', help='The port on which to run the stub server.', type=int, default=8766)
+    parser.add_argument(
+        '--latency',
+        help='The number of seconds the stub server waits before responding, to simulate the network.',
+        type=float,
+        default=0.05
+    )
+    parser.add_argument(
+        '--handshake-latency',
+        help='The number of seconds the stub server waits before serving a new connection.',
+        type=float,
+        default=0.05
+    )
+    parser.add_argument('--num-runs', help='The number of runs per measurement.', type=int, default=20)
+    args = parser.parse_args()
+
+    ready = Event()
+    server_process = Process(
+        target=run_stub_server,
+        args=(args.port, args.latency, args.handshake_latency, ready),
+        daemon=True
+    )
+    server_process.start()
+    ready.wait()
+
+    api_base_url = f'http://127.0.0.1:{args.port}'
+    credentials = ['consumer-key', 'consumer-secret']
+
+    with TemporaryDirectory() as directory:
+        socket_path = str(Path(directory) / 'twitter_api.sock')
+
+        daemon_process = Popen([
+            executable, str(ROOT_DIRECTORY / 'twitter_api.py'), *credentials, 'serve',
+            '--socket-path', socket_path, '--api-base-url', api_base_url
+        ])
+
+        try:
+            while not Path(socket_path).exists():
+                if daemon_process.poll() is not None:
+                    raise RuntimeError('The serve action exited.')
+                sleep(0.05)
+
+            # Distinct users are requested in every run, so that the daemon's cache does not serve them.
+            cold_latencies: list[float] = [
+                time_command([
+                    executable, str(ROOT_DIRECTORY / 'twitter_api.py'), *credentials, 'user',
+                    '--user-id', str(1_000 + run), '--api-base-url', api_base_url
+                ])
+                for run in range(args.num_runs)
+            ]
+            client_latencies: list[float] = [
+                time_command([
+                    executable, str(ROOT_DIRECTORY / 'twitter_api_client.py'), 'user',
+                    '--user-id', str(2_000 + run), '--socket-path', socket_path
+                ])
+                for run in range(args.num_runs)
+            ]
+            socket_latencies: list[float] = [
+                time_socket_request(socket_path=socket_path, request=dict(action='user', user_id=str(3_000 + run)))
+                for run in range(args.num_runs)
+            ]
+        finally:
+            daemon_process.terminate()
+            daemon_process.wait()
+            server_process.terminate()
+
+    print(
+        f'Stub server latency: {args.latency * 1000:.0f} ms, handshake latency: '
+        f'{args.handshake_latency * 1000:.0f} ms, {args.num_runs} runs per measurement'
+    )
+    print(format_latencies(name='cold twitter_api.py', latencies=cold_latencies))
+    print(format_latencies(name='twitter_api_client.py through the serve action', latencies=client_latencies))
+    print(format_latencies(name='request to the serve action socket', latencies=socket_latencies))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+
+from timeit import Timer
+from json import dumps as json_dumps, loads as stdlib_json_loads
+from typing import Callable, Any
+
+from twitter_api.calls import json_loads
+from twitter_api.structures import User, Status
+from twitter_api.lazy import LazyUser, LazyStatus
+from twitter_api.synthetic import make_user_object, make_timeline_objects
+
+
+def per_object_microseconds(function: Callable[[], Any], num_objects: int) -> float:
+    timer = Timer(stmt=function)
+    num_loops, _ = timer.autorange()
+    return min(timer.repeat(repeat=5, number=num_loops)) / num_loops / num_objects * 1e6
+
+
+def main():
+    lookup_page: bytes = json_dumps(
+        [make_user_object(user_id=user_id, with_status=True) for user_id in range(1, 101)]
+    ).encode()
+    timeline_page: bytes = json_dumps(make_timeline_objects(user_id=1, count=200)).encode()
+
+    cases: list[tuple[str, bytes, int, Callable[[bytes], Any]]] = [
+        (
+            'users/lookup (100 users), json + eager, all fields',
+            lookup_page,
+            100,
+            lambda content: [User.from_json(json_object=user_object) for user_object in stdlib_json_loads(content)]
+        ),
+        (
+            'users/lookup (100 users), fast decoder + eager, all fields',
+            lookup_page,
+            100,
+            lambda content: [User.from_json(json_object=user_object) for user_object in json_loads(content)]
+        ),
+        (
+            'users/lookup (100 users), fast decoder + lazy, screen_name',
+            lookup_page,
+            100,
+            lambda content: [LazyUser(json_object=user_object).screen_name for user_object in json_loads(content)]
+        ),
+        (
+            'statuses/user_timeline (200 statuses), json + eager, all fields',
+            timeline_page,
+            200,
+            lambda content: [
+                Status.from_json(json_object=status_object)
+                for status_object in stdlib_json_loads(content)
+            ]
+        ),
+        (
+            'statuses/user_timeline (200 statuses), fast decoder + eager, all fields',
+            timeline_page,
+            200,
+            lambda content: [Status.from_json(json_object=status_object) for status_object in json_loads(content)]
+        ),
+        (
+            'statuses/user_timeline (200 statuses), fast decoder + lazy, full_text and user.screen_name',
+            timeline_page,
+            200,
+            lambda content: [
+                (status.full_text, status.user.screen_name)
+                for status in (LazyStatus(json_object=status_object) for status_object in json_loads(content))
+            ]
+        )
+    ]
+
+    print(f'JSON decoder: {json_loads.__module__}')
+    for name, content, num_objects, decode in cases:
+        microseconds = per_object_microseconds(function=lambda: decode(content), num_objects=num_objects)
+        print(f'{name}: {microseconds:.2f} µs per object')
+
+
+if __name__ == '__main__':
+    main()
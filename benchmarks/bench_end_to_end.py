@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+
+from argparse import ArgumentParser
+from asyncio import run as asyncio_run
+from json import loads as json_loads
+from multiprocessing import Process, Event
+from os import wait4, waitstatus_to_exitcode
+from pathlib import Path
+from subprocess import Popen, DEVNULL, PIPE
+from sys import executable
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from twitter_api.fake_server import FakeApiConfig, FakeTwitterApi, DEFAULT_RATE_LIMITS, serve_fake_api
+
+ROOT_DIRECTORY: Path = Path(__file__).resolve().parent.parent
+
+
+async def serve(config: FakeApiConfig, port: int, ready) -> None:
+    server = await serve_fake_api(api=FakeTwitterApi(config=config), port=port)
+    ready.set()
+    async with server:
+        await server.serve_forever()
+
+
+def run_fake_api(config: FakeApiConfig, port: int, ready) -> None:
+    asyncio_run(serve(config=config, port=port, ready=ready))
+
+
+def run_action(arguments: list[str], api_base_url: str) -> tuple[float, int, int]:
+    """
+    Run an action of `twitter_api.py` against the fake API.
+
+    :param arguments: The action and its arguments.
+    :param api_base_url: The base URL of the fake API.
+    :return: The end-to-end time in seconds, the number of requests made, and the peak resident set size in bytes.
+    """
+
+    start: float = perf_counter()
+    process = Popen(
+        [
+            executable, str(ROOT_DIRECTORY / 'twitter_api.py'), 'consumer-key', 'consumer-secret', *arguments,
+            '--api-base-url', api_base_url, '--stats', '--stats-format', 'json'
+        ],
+        stdout=DEVNULL,
+        stderr=PIPE
+    )
+    stderr_output: bytes = process.stderr.read()
+    # Waited for with `wait4`, which reports the resource usage of the process alone.
+    _, status, resource_usage = wait4(process.pid, 0)
+    elapsed: float = perf_counter() - start
+    process.returncode = waitstatus_to_exitcode(status)
+
+    if process.returncode != 0:
+        raise RuntimeError(f'{" ".join(arguments)} failed:\n{stderr_output.decode()}')
+
+    # The statistics are the last output to stderr, and the only line of it starting with a brace.
+    stats: dict = json_loads(stderr_output[stderr_output.rfind(b'\n{') + 1:])
+    num_requests: int = sum(endpoint_stats['num_requests'] for endpoint_stats in stats.values())
+
+    # The maximum resident set size is reported in kilobytes on Linux.
+    return elapsed, num_requests, resource_usage.ru_maxrss * 1024
+
+
+def main():
+    parser = ArgumentParser(
+        description=(
+            'Measure the requests per second, the end-to-end time and the peak memory of the actions of '
+            '`twitter_api.py` against a local fake of the Twitter API, for accounts of different sizes.'
+        )
+    )
+    parser.add_argument('--port', help='The port on which to run the fake API.', type=int, default=8767)
+    parser.add_argument(
+        '--latency',
+        help='The number of seconds the fake API waits before responding, to simulate the network.',
+        type=float,
+        default=0.02
+    )
+    parser.add_argument(
+        '--follower-counts',
+        help='The numbers of followers of the accounts on which to run the follower actions.',
+        type=int,
+        nargs='+',
+        default=[10_000, 100_000, 1_000_000, 10_000_000]
+    )
+    parser.add_argument(
+        '--max-hydrated-followers',
+        help=(
+            'The largest number of followers for which to run the followers action, which looks up every follower; '
+            'larger accounts are measured with the follower-diff action, which retrieves the follower IDs only.'
+        ),
+        type=int,
+        default=100_000
+    )
+    parser.add_argument(
+        '--num-statuses',
+        help='The number of statuses of the timeline retrieved by the timeline action.',
+        type=int,
+        default=3_200
+    )
+    parser.add_argument(
+        '--num-search-results',
+        help='The number of statuses retrieved by the search action.',
+        type=int,
+        default=1_000
+    )
+    parser.add_argument(
+        '--max-concurrency',
+        help='The maximum number of lookup, timeline or search requests of the actions to have in flight.',
+        type=int,
+        default=10
+    )
+    parser.add_argument(
+        '--rate-limit-multiplier',
+        help=(
+            'A factor by which to multiply the rate limits of the API, so that the rate limits are exercised without '
+            'throttling the benchmark; with the real limits, 10 million follower IDs take over 30 hours.'
+        ),
+        type=float,
+        default=1_000.0
+    )
+    args = parser.parse_args()
+
+    # The accounts on which to run the follower actions, with user IDs from 1 in the order of their sizes.
+    account_num_followers: dict[int, int] = {
+        user_id: num_followers
+        for user_id, num_followers in enumerate(args.follower_counts, start=1)
+    }
+
+    config = FakeApiConfig(
+        account_num_followers=account_num_followers,
+        num_statuses=args.num_statuses,
+        num_search_results=args.num_search_results,
+        latency=args.latency,
+        rate_limits={
+            endpoint: max(round(limit * args.rate_limit_multiplier), 1)
+            for endpoint, limit in DEFAULT_RATE_LIMITS.items()
+        }
+    )
+
+    ready = Event()
+    server_process = Process(target=run_fake_api, args=(config, args.port, ready), daemon=True)
+    server_process.start()
+    ready.wait()
+
+    api_base_url = f'http://127.0.0.1:{args.port}'
+    concurrency: list[str] = ['--max-concurrency', str(args.max_concurrency)]
+
+    with TemporaryDirectory() as directory:
+        cases: list[tuple[str, int, list[str]]] = [
+            ('user', 1, ['user', '--user-id', '1']),
+            (
+                'timeline --full-history',
+                1,
+                ['timeline', '--user-id', '1', '--full-history', '--output-format', 'ndjson']
+            ),
+            (
+                'search',
+                1,
+                [
+                    'search', '--query', 'benchmark', '--max-results', str(args.num_search_results),
+                    '--output-format', 'ndjson', *concurrency
+                ]
+            )
+        ]
+        for user_id, num_followers in account_num_followers.items():
+            if num_followers <= args.max_hydrated_followers:
+                cases.append((
+                    'followers',
+                    num_followers,
+                    ['followers', '--user-id', str(user_id), '--output-format', 'ndjson', *concurrency]
+                ))
+            # The first diff of an account retrieves and stores its follower IDs, with no lookups.
+            cases.append((
+                'follower-diff',
+                num_followers,
+                [
+                    'follower-diff', '--user-id', str(user_id),
+                    '--snapshots-dir', str(Path(directory) / f'snapshots-{user_id}')
+                ]
+            ))
+
+        print(
+            f'Fake API latency: {args.latency * 1000:.0f} ms, rate limits x{args.rate_limit_multiplier:g}, '
+            f'max concurrency {args.max_concurrency}'
+        )
+        print(f'{"action":<24}{"followers":>12}{"requests":>10}{"time (s)":>10}{"req/s":>10}{"peak RSS (MiB)":>16}')
+
+        try:
+            for name, num_followers, arguments in cases:
+                elapsed, num_requests, peak_rss = run_action(arguments=arguments, api_base_url=api_base_url)
+                print(
+                    f'{name:<24}{num_followers if name.startswith("follower") else "":>12}{num_requests:>10}'
+                    f'{elapsed:>10.2f}{num_requests / elapsed:>10.1f}{peak_rss / 2 ** 20:>16.1f}',
+                    flush=True
+                )
+        finally:
+            server_process.terminate()
+
+
+if __name__ == '__main__':
+    main()
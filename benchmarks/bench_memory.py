@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+
+from argparse import ArgumentParser
+from gc import collect as gc_collect
+from tracemalloc import start as tracemalloc_start, stop as tracemalloc_stop, get_traced_memory
+from typing import Any, Callable
+
+from twitter_api.structures import User, Status
+from twitter_api.slotted_structures import SlottedUser, SlottedStatus
+from twitter_api.synthetic import make_user_object, make_timeline_objects
+
+
+def retained_bytes(decode: Callable[[dict[str, Any]], Any], make_json_object: Callable[[int], Any], num: int) -> int:
+    """
+    Measure the memory retained by decoded structures, excluding the JSON objects they were decoded from.
+
+    :param decode: A function decoding a JSON object into a structure.
+    :param make_json_object: A function making the JSON object with a given index.
+    :param num: The number of structures to decode and retain.
+    :return: The number of bytes retained.
+    """
+
+    gc_collect()
+    tracemalloc_start()
+
+    before, _ = get_traced_memory()
+    structures = [decode(make_json_object(index)) for index in range(num)]
+    gc_collect()
+    after, _ = get_traced_memory()
+
+    tracemalloc_stop()
+    del structures
+
+    return after - before
+
+
+def main():
+    parser = ArgumentParser(description='Compare the memory use of the plain and the slotted structures.')
+    parser.add_argument('--num', help='The number of structures of each kind to decode.', type=int, default=20_000)
+    args = parser.parse_args()
+
+    timeline_objects = make_timeline_objects(user_id=1, count=200)
+
+    cases = [
+        ('User', User.from_json, SlottedUser.from_json, lambda index: make_user_object(user_id=index + 1)),
+        (
+            'Status',
+            Status.from_json,
+            SlottedStatus.from_json,
+            lambda index: timeline_objects[index % len(timeline_objects)] | {'user': make_user_object(index + 1)}
+        )
+    ]
+
+    for name, decode, slotted_decode, make_json_object in cases:
+        plain_bytes = retained_bytes(decode=decode, make_json_object=make_json_object, num=args.num)
+        slotted_bytes = retained_bytes(decode=slotted_decode, make_json_object=make_json_object, num=args.num)
+
+        print(
+            f'{name}: {plain_bytes / args.num:.0f} bytes per object plain, '
+            f'{slotted_bytes / args.num:.0f} bytes per object slotted '
+            f'({1 - slotted_bytes / plain_bytes:.0%} less)'
+        )
+
+
+if __name__ == '__main__':
+    main()
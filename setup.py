@@ -3,9 +3,15 @@ setup(
     name='twitter_api',
     version='0.1',
     packages=find_packages(),
+    python_requires='>=3.10',
     install_requires=[
         'httpx',
         'httpx_oauth @ git+ssh://git@github.com/vphpersson/httpx_oauth.git#egg=httpx_oauth',
         'pyutils @ git+ssh://git@github.com/vphpersson/pyutils.git#egg=pyutils'
-    ]
+    ],
+    extras_require={
+        'numpy': ['numpy'],
+        'parquet': ['pyarrow'],
+        'http2': ['httpx[http2]']
+    }
 )
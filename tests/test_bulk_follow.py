@@ -0,0 +1,44 @@
+from asyncio import run as asyncio_run, sleep as asyncio_sleep
+from pathlib import Path
+
+from httpx import AsyncClient, MockTransport, Request, Response, HTTPStatusError
+
+from twitter_api.bulk_follow import FollowLog, follow_users, FOLLOW_LIMIT_ERROR_CODE
+from twitter_api.synthetic import make_user_object
+
+
+async def handle_request(request: Request) -> Response:
+    if request.url.path.endswith('friends/ids.json'):
+        return Response(
+            200,
+            json=dict(ids=[], next_cursor=0, next_cursor_str='0', previous_cursor=0, previous_cursor_str='0')
+        )
+
+    if (user_id := int(request.url.params['user_id'])) == 1:
+        # Still in flight when the follow limit is reached by the other requests.
+        await asyncio_sleep(0.05)
+        return Response(200, json=make_user_object(user_id=user_id))
+
+    return Response(403, json=dict(errors=[dict(code=FOLLOW_LIMIT_ERROR_CODE, message='Follow limit reached.')]))
+
+
+def test_follows_in_flight_are_logged_when_the_follow_limit_is_reached(tmp_path: Path):
+    async def follow() -> None:
+        async with AsyncClient(transport=MockTransport(handle_request), base_url='https://api.twitter.com') as client:
+            with FollowLog(path=tmp_path / 'follow.log') as follow_log:
+                await follow_users(
+                    http_client=client,
+                    user_ids=[1, 2, 3],
+                    follow_log=follow_log,
+                    max_concurrency=3,
+                    min_interval=0.0
+                )
+
+    try:
+        asyncio_run(follow())
+    except HTTPStatusError as e:
+        assert e.response.status_code == 403
+    else:
+        raise AssertionError('The follow limit did not stop the bulk follow.')
+
+    assert (tmp_path / 'follow.log').read_text() == '1 200\n'
@@ -0,0 +1,77 @@
+from asyncio import run as asyncio_run
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import parse_qsl
+
+from httpx import AsyncClient, MockTransport, Request, Response
+
+from twitter_api.cli import twitter_api, iter_target_results, format_target_error
+from twitter_api.fake_server import FakeApiConfig, FakeTwitterApi
+from twitter_api.timeline_sync import SinceIdStore
+
+
+def make_client(api: FakeTwitterApi) -> AsyncClient:
+    def handle_request(request: Request) -> Response:
+        status_code, headers, body = api.respond(
+            method=request.method,
+            path=request.url.path,
+            params=dict(parse_qsl(request.url.query.decode()))
+        )
+        return Response(status_code=status_code, headers=headers, content=body)
+
+    return AsyncClient(transport=MockTransport(handle_request), base_url='https://api.twitter.com/1.1/')
+
+
+def run_text_action(api: FakeTwitterApi, **kwargs) -> list[str]:
+    async def collect() -> list[str]:
+        async with make_client(api=api) as client:
+            return [line async for line in twitter_api(http_client=client, **kwargs)]
+
+    return asyncio_run(collect())
+
+
+def test_full_history_timeline_in_text_format():
+    api = FakeTwitterApi(config=FakeApiConfig(num_statuses=450, rate_limits={}))
+
+    lines = run_text_action(api=api, action='timeline', user_id='3', full_history=True)
+
+    assert len(lines) == 450
+    # Oldest first.
+    created_at = [datetime.strptime(line.split(' - ')[0], '%a %b %d %H:%M:%S %z %Y') for line in lines]
+    assert created_at == sorted(created_at)
+    assert api.num_requests['statuses/user_timeline'] > 1
+
+
+def test_since_id_timeline_in_text_format(tmp_path: Path):
+    api = FakeTwitterApi(config=FakeApiConfig(num_statuses=450, rate_limits={}))
+
+    with SinceIdStore(path=tmp_path / 'since_ids.json') as since_id_store:
+        first_lines = run_text_action(api=api, action='timeline', user_id='3', since_id_store=since_id_store)
+        second_lines = run_text_action(api=api, action='timeline', user_id='3', since_id_store=since_id_store)
+
+    assert first_lines
+    assert second_lines == []
+
+
+def test_target_errors_are_formatted_on_one_line():
+    api = FakeTwitterApi(config=FakeApiConfig(num_followers=10, rate_limits={}))
+    target_errors: list = []
+
+    async def collect() -> list:
+        async with make_client(api=api) as client:
+            return [
+                result
+                async for result in iter_target_results(
+                    http_client=client,
+                    action='followers',
+                    targets=[('0', None), ('5', None)],
+                    target_errors=target_errors
+                )
+            ]
+
+    results = asyncio_run(collect())
+
+    assert len(results) == 10 and {target for target, _ in results} == {'5'}
+    assert [(target, format_target_error(e=error)) for target, error in target_errors] == [
+        ('0', '404 Not Found: User not found. (code 50)')
+    ]
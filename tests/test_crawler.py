@@ -0,0 +1,44 @@
+from asyncio import run as asyncio_run
+from pathlib import Path
+
+from httpx import AsyncClient, MockTransport, Request, Response
+
+from twitter_api.crawler import EdgeListWriter, crawl_social_graph
+from twitter_api.synthetic import make_user_object
+
+
+def ids_response(ids: list[int]) -> Response:
+    return Response(
+        200,
+        json=dict(ids=ids, next_cursor=0, next_cursor_str='0', previous_cursor=0, previous_cursor_str='0')
+    )
+
+
+def handle_request(request: Request) -> Response:
+    if request.url.path.endswith('friends/ids.json'):
+        return ids_response(ids=[11, 12])
+    if request.url.path.endswith('followers/ids.json'):
+        return ids_response(ids=[])
+
+    user_ids: list[int] = [int(user_id) for user_id in request.url.params['user_id'].split(',')]
+    if user_ids == [5]:
+        return Response(200, json=[make_user_object(user_id=5)])
+    # The discovered accounts have all been suspended, so none of them can be looked up.
+    return Response(404, json=dict(errors=[dict(code=17, message='No user matches for specified terms.')]))
+
+
+def test_unresolvable_discovered_accounts_are_skipped(tmp_path: Path):
+    async def crawl():
+        async with AsyncClient(transport=MockTransport(handle_request), base_url='https://api.twitter.com') as client:
+            with EdgeListWriter(path=tmp_path / 'edges.txt') as edge_list_writer:
+                return await crawl_social_graph(
+                    http_client=client,
+                    edge_list_writer=edge_list_writer,
+                    seed_user_ids=[5],
+                    max_depth=2
+                )
+
+    stats = asyncio_run(crawl())
+
+    assert (stats.num_expanded, stats.num_discovered, stats.num_skipped, stats.num_edges) == (1, 2, 2, 2)
+    assert (tmp_path / 'edges.txt').read_text() == '5 11\n5 12\n'
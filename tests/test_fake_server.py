@@ -0,0 +1,27 @@
+from twitter_api.fake_server import FakeApiConfig, FakeTwitterApi
+
+
+def make_authorization(token: str, nonce: int) -> str:
+    return (
+        f'OAuth oauth_consumer_key="consumer-key", oauth_nonce="{nonce}", oauth_signature="signature-{nonce}", '
+        f'oauth_signature_method="HMAC-SHA1", oauth_timestamp="{1_600_000_000 + nonce}", oauth_token="{token}", '
+        f'oauth_version="1.0"'
+    )
+
+
+def test_rate_limit_is_counted_per_access_token():
+    api = FakeTwitterApi(config=FakeApiConfig(rate_limits={'users/show': 2}))
+
+    def show_user(token: str, nonce: int) -> int:
+        status_code, _, _ = api.respond(
+            method='GET',
+            path='/1.1/users/show.json',
+            params=dict(user_id='5'),
+            authorization=make_authorization(token=token, nonce=nonce)
+        )
+        return status_code
+
+    # Every request is signed with a new nonce, timestamp and signature, as by a real client.
+    assert [show_user(token='token-1', nonce=nonce) for nonce in range(3)] == [200, 200, 429]
+    assert show_user(token='token-2', nonce=3) == 200
+    assert len(api._windows) == 2
@@ -0,0 +1,184 @@
+from typing import Optional
+from asyncio import run as asyncio_run, gather as asyncio_gather, sleep as asyncio_sleep
+
+from httpx import Request, Response
+
+from twitter_api.rate_limit import RateLimitScheduler
+from twitter_api.stats import RequestStats
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000.0):
+        self.now = now
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, delay: float) -> None:
+        self.sleeps.append(delay)
+        # Lets other callers run before the time has passed, as a real sleep would.
+        await asyncio_sleep(0)
+        self.now += delay
+
+
+def make_scheduler(clock: FakeClock, **kwargs) -> RateLimitScheduler:
+    return RateLimitScheduler(clock=clock, sleep=clock.sleep, backoff_base=1.0, **kwargs)
+
+
+def make_send(status_codes: list[int], headers: Optional[dict[str, str]] = None):
+    requests: list[Request] = []
+
+    async def send(request: Request, **_) -> Response:
+        requests.append(request)
+        return Response(status_code=status_codes[len(requests) - 1], headers=headers or {}, request=request)
+
+    return send, requests
+
+
+def test_acquire_waits_for_exhausted_window():
+    clock = FakeClock()
+    scheduler = make_scheduler(clock=clock, reset_margin=1.0)
+    budget = scheduler.budget(endpoint='friends/ids')
+    budget.remaining, budget.reset = 0, clock.now + 10
+
+    asyncio_run(scheduler.acquire(endpoint='friends/ids'))
+
+    assert clock.sleeps == [11.0]
+    assert budget.remaining is None and budget.num_in_flight == 1
+
+
+def test_callers_queued_behind_a_sleep_count_as_sleeping():
+    clock = FakeClock()
+    scheduler = make_scheduler(clock=clock, reset_margin=1.0)
+    budget = scheduler.budget(endpoint='friends/ids')
+    budget.remaining, budget.reset = 0, clock.now + 10
+    stats = RequestStats()
+
+    async def acquire_twice() -> None:
+        await asyncio_gather(*(scheduler.acquire(endpoint='friends/ids', stats=stats) for _ in range(2)))
+
+    asyncio_run(acquire_twice())
+
+    assert clock.sleeps == [11.0]
+    assert stats.endpoints['friends/ids'].num_rate_limit_sleeps == 2
+    assert stats.endpoints['friends/ids'].rate_limit_sleep_time == 22.0
+
+
+def test_update_keeps_lowest_remaining_within_window():
+    clock = FakeClock()
+    scheduler = make_scheduler(clock=clock)
+    request = Request(method='GET', url='https://api.twitter.com/1.1/friends/ids.json')
+
+    for remaining in ('5', '3', '4'):
+        scheduler.update(
+            endpoint='friends/ids',
+            status_code=200,
+            headers=Response(
+                status_code=200,
+                headers={'x-rate-limit-remaining': remaining, 'x-rate-limit-reset': '2000', 'x-rate-limit-limit': '15'},
+                request=request
+            ).headers
+        )
+
+    budget = scheduler.budget(endpoint='friends/ids')
+    assert (budget.limit, budget.remaining, budget.reset) == (15, 3, 2000.0)
+
+
+def test_rate_limited_request_waits_for_reset_and_is_retried():
+    clock = FakeClock()
+    scheduler = make_scheduler(clock=clock, reset_margin=1.0)
+    send, requests = make_send(
+        status_codes=[429, 200],
+        headers={'x-rate-limit-remaining': '0', 'x-rate-limit-reset': str(int(clock.now) + 30)}
+    )
+
+    response = asyncio_run(
+        scheduler.send(send=send, request=Request(method='GET', url='https://api.twitter.com/1.1/followers/ids.json'))
+    )
+
+    assert response.status_code == 200
+    assert len(requests) == 2
+    assert clock.sleeps == [0.0, 31.0]
+
+
+def test_server_error_is_retried_for_get():
+    clock = FakeClock()
+    scheduler = make_scheduler(clock=clock)
+    send, requests = make_send(status_codes=[503, 502, 200])
+
+    response = asyncio_run(
+        scheduler.send(send=send, request=Request(method='GET', url='https://api.twitter.com/1.1/users/show.json'))
+    )
+
+    assert response.status_code == 200
+    assert len(requests) == 3
+
+
+def test_server_error_is_not_retried_for_post():
+    clock = FakeClock()
+    scheduler = make_scheduler(clock=clock)
+    send, requests = make_send(status_codes=[503, 200])
+
+    response = asyncio_run(
+        scheduler.send(
+            send=send,
+            request=Request(method='POST', url='https://api.twitter.com/1.1/friendships/create.json')
+        )
+    )
+
+    assert response.status_code == 503
+    assert len(requests) == 1
+
+
+def test_rate_limited_post_is_retried():
+    clock = FakeClock()
+    scheduler = make_scheduler(clock=clock)
+    send, requests = make_send(status_codes=[429, 200])
+
+    response = asyncio_run(
+        scheduler.send(
+            send=send,
+            request=Request(method='POST', url='https://api.twitter.com/1.1/friendships/create.json')
+        )
+    )
+
+    assert response.status_code == 200
+    assert len(requests) == 2
+
+
+def test_retries_are_limited():
+    clock = FakeClock()
+    scheduler = make_scheduler(clock=clock, max_retries=2)
+    send, requests = make_send(status_codes=[500, 500, 500, 500])
+
+    response = asyncio_run(
+        scheduler.send(send=send, request=Request(method='GET', url='https://api.twitter.com/1.1/users/show.json'))
+    )
+
+    assert response.status_code == 500
+    assert len(requests) == 3
+
+
+def test_select_credential_spreads_unknown_budgets():
+    scheduler = make_scheduler(clock=FakeClock())
+
+    selected = [
+        scheduler.select_credential(endpoint='users/show', credentials=['a', 'b', 'c'])
+        for _ in range(6)
+    ]
+
+    assert selected == ['a', 'b', 'c', 'a', 'b', 'c']
+
+
+def test_select_credential_prefers_remaining_budget():
+    clock = FakeClock()
+    scheduler = make_scheduler(clock=clock)
+    for credential, remaining in (('a', 1), ('b', 7), ('c', 3)):
+        budget = scheduler.budget(endpoint='users/show', credential=credential)
+        budget.remaining, budget.reset = remaining, clock.now + 60
+
+    assert {
+        scheduler.select_credential(endpoint='users/show', credentials=['a', 'b', 'c'])
+        for _ in range(3)
+    } == {'b'}
@@ -0,0 +1,39 @@
+from asyncio import run as asyncio_run
+from pathlib import Path
+
+from httpx import AsyncClient, MockTransport, Request, Response
+
+from twitter_api.cache import user_key
+from twitter_api.ids import sorted_id_array
+from twitter_api.snapshots import SnapshotStore, diff_ids
+from twitter_api.synthetic import make_user_object
+
+
+def handle_request(request: Request) -> Response:
+    if request.url.path.endswith('followers/ids.json'):
+        return Response(
+            200,
+            json=dict(ids=[4, 3, 2], next_cursor=0, next_cursor_str='0', previous_cursor=0, previous_cursor_str='0')
+        )
+
+    # The removed follower has been suspended, so none of the users of its lookup can be found.
+    user_ids: list[int] = [int(user_id) for user_id in request.url.params['user_id'].split(',')]
+    if 1 in user_ids:
+        return Response(404, json=dict(errors=[dict(code=17, message='No user matches for specified terms.')]))
+    return Response(200, json=[make_user_object(user_id=user_id) for user_id in user_ids])
+
+
+def test_diff_with_unresolvable_removed_followers_is_saved(tmp_path: Path):
+    snapshot_store = SnapshotStore(directory=tmp_path)
+    account_key: str = user_key(user_id='5')
+    snapshot_store.save(account_key=account_key, ids=sorted_id_array(ids=[1, 2, 3]))
+
+    async def diff():
+        async with AsyncClient(transport=MockTransport(handle_request), base_url='https://api.twitter.com') as client:
+            return await diff_ids(http_client=client, snapshot_store=snapshot_store, user_id='5')
+
+    ids_diff = asyncio_run(diff())
+
+    assert list(ids_diff.added_ids) == [4] and [user.id for user in ids_diff.added_users] == [4]
+    assert list(ids_diff.removed_ids) == [1] and ids_diff.removed_users == ()
+    assert list(snapshot_store.load(account_key=account_key)) == [2, 3, 4]
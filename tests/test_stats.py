@@ -0,0 +1,22 @@
+from twitter_api.stats import RequestStats, LATENCY_SAMPLE_SIZE
+
+
+def test_latency_sample_is_bounded():
+    stats = RequestStats()
+    num_requests: int = 3 * LATENCY_SAMPLE_SIZE
+
+    for index in range(num_requests):
+        stats.record_request(endpoint='users/lookup', latency=index / num_requests, num_bytes=10, status_code=200)
+
+    endpoint_stats = stats.endpoints['users/lookup']
+    assert len(endpoint_stats.latencies) == LATENCY_SAMPLE_SIZE
+    assert endpoint_stats.latency_max == (num_requests - 1) / num_requests
+    assert abs(endpoint_stats.latency_sum - (num_requests - 1) / 2) < 1e-6
+    # The sample is uniform, so its median is close to the median of all latencies.
+    assert abs(endpoint_stats.latency_quantiles(quantiles=(0.5,))[0.5] - 0.5) < 0.05
+
+    latency_seconds = stats.to_json_object()['users/lookup']['latency_seconds']
+    assert latency_seconds['sum'] == endpoint_stats.latency_sum
+    assert f'twitter_api_request_duration_seconds_count{{endpoint="users/lookup"}} {float(num_requests)!r}' in (
+        stats.to_prometheus()
+    )
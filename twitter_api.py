@@ -1,43 +1,245 @@
 #!/usr/bin/env python
 
 from asyncio import run as asyncio_run
-from typing import Type, Optional
-from sys import stderr
+from dataclasses import asdict
+from json import dumps as json_dumps
+from typing import Type, Optional, Any, Union, AsyncIterator
+from pathlib import Path
+from contextlib import nullcontext, aclosing
+from os import devnull, dup2, open as os_open, O_WRONLY
+from sys import stderr, stdout, exit as sys_exit
 
-from httpx import AsyncClient as HTTPXAsyncClient, HTTPStatusError
+from httpx import HTTPError, HTTPStatusError
 from httpx_oauth.v1 import OAuthAuth
 
-from twitter_api.cli import TwitterApiArgumentParser, twitter_api
-from twitter_api.utils import set_auth_tokens
+from twitter_api.cli import TwitterApiArgumentParser, twitter_api, twitter_api_records, iter_target_results, \
+    format_target_error, ACTION_COLUMNS, TARGETED_ACTIONS, TARGET_COLUMNS
+from twitter_api.export import OutputFormat, make_record_writer, export_records, open_output
+from twitter_api.utils import set_auth_tokens, read_user_list, read_targets
+from twitter_api.client import make_http_client, DEFAULT_MAX_CONNECTIONS
+from twitter_api.token_pool import TokenPool
+from twitter_api.cache import ResponseCache
+from twitter_api.timeline_sync import SinceIdStore
+from twitter_api.snapshots import SnapshotStore
+from twitter_api.checkpoint import PaginationCheckpoint
+from twitter_api.stats import RequestStats, format_stats
+from twitter_api.daemon import start_daemon
+from twitter_api.batching import UserNotFoundError
+from twitter_api.bulk_follow import FollowLog, follow_users
+
+
+def format_http_status_error(e: HTTPStatusError) -> str:
+    return '\n'.join(str(e).split('\n')[:-1]) + '\n' + e.response.text
+
+
+async def iter_target_records(**kwargs) -> AsyncIterator[tuple]:
+    async with aclosing(iter_target_results(records=True, **kwargs)) as target_results:
+        async for target, record in target_results:
+            yield target, *record
 
 
 async def main():
-    args: Type[TwitterApiArgumentParser.Namespace] = TwitterApiArgumentParser().parse_args()
+    parser = TwitterApiArgumentParser()
+    args: Type[TwitterApiArgumentParser.Namespace] = parser.parse_args()
+
+    if args.output_format != OutputFormat.TEXT.value and args.action not in ACTION_COLUMNS:
+        parser.error(f'The action {args.action!r} only supports the text output format.')
+
+    if args.action == 'search':
+        if not args.query:
+            parser.error('The search action requires --query.')
+    elif args.action == 'timelines':
+        if not args.user_list_path:
+            parser.error('The timelines action requires --user-list-path.')
+    elif args.action == 'serve':
+        if args.socket_path is None and args.port is None:
+            parser.error('The serve action requires --socket-path or --port.')
+    elif args.user_id is None and args.screen_name is None and args.targets_file is None:
+        parser.error(f'The action {args.action!r} requires --user-id, --screen-name or --targets-file.')
+
+    if args.targets_file is not None:
+        if args.action not in TARGETED_ACTIONS:
+            parser.error(f'The action {args.action!r} cannot be performed on a targets file.')
+        if args.checkpoint_path:
+            parser.error('--checkpoint-path cannot be used with --targets-file.')
+    elif args.follow_log_path:
+        parser.error('--follow-log-path requires --targets-file.')
+
+    if args.resume and not args.checkpoint_path:
+        parser.error('--resume requires --checkpoint-path.')
+
+    if args.resume and args.output_path and args.output_format == OutputFormat.PARQUET.value:
+        # The records of the resumed retrieval are appended to the output file, which a Parquet file does not allow.
+        parser.error('--resume cannot append to a Parquet --output-path.')
+
+    request_stats: Optional[RequestStats] = RequestStats() if args.stats else None
 
     try:
         auth = OAuthAuth(consumer_key=args.consumer_key, consumer_secret=args.consumer_secret)
-        async with HTTPXAsyncClient(auth=auth) as http_client:
-            if args.access_tokens_path:
+
+        token_pool: Optional[TokenPool] = None
+        if args.access_tokens_path and (len(args.access_tokens_path) > 1 or Path(args.access_tokens_path[0]).is_dir()):
+            token_pool = TokenPool.from_paths(
+                consumer_key=args.consumer_key,
+                consumer_secret=args.consumer_secret,
+                paths=args.access_tokens_path
+            )
+
+        if args.cache_path:
+            cache_context = ResponseCache(path=args.cache_path)
+        elif args.action == 'serve':
+            # The responses are cached for the lifetime of the server.
+            cache_context = ResponseCache()
+        else:
+            cache_context = nullcontext()
+
+        # With a targets file, the action is performed on several users at the same time, each with its own requests.
+        max_num_concurrent_requests: int = args.max_concurrency * (
+            args.max_target_concurrency if args.targets_file is not None else 1
+        )
+
+        async with make_http_client(
+            auth=auth,
+            token_pool=token_pool,
+            request_stats=request_stats,
+            max_connections=max(DEFAULT_MAX_CONNECTIONS, max_num_concurrent_requests),
+            api_base_url=args.api_base_url
+        ) as http_client:
+            if args.access_tokens_path and token_pool is None:
                 await set_auth_tokens(
                     http_client=http_client,
                     consumer_key=args.consumer_key,
-                    tokens_path=args.access_tokens_path
+                    tokens_path=args.access_tokens_path[0]
                 )
 
-            str_result: Optional[str] = await twitter_api(
-                http_client=http_client,
-                action=args.action,
-                user_id=args.user_id,
-                screen_name=args.screen_name
+            since_id_store_context = SinceIdStore(path=args.since_id_path) if args.since_id_path else nullcontext()
+
+            snapshot_store: Optional[SnapshotStore] = (
+                SnapshotStore(directory=args.snapshots_dir) if args.action == 'follower-diff' else None
+            )
+
+            user_list: Optional[tuple[list[int], list[str]]] = (
+                read_user_list(path=args.user_list_path) if args.user_list_path else None
+            )
+
+            checkpoint: Optional[PaginationCheckpoint] = (
+                PaginationCheckpoint(path=args.checkpoint_path, resume=args.resume) if args.checkpoint_path else None
+            )
+
+            targets: Optional[list[tuple[Optional[str], Optional[str]]]] = (
+                read_targets(path=args.targets_file) if args.targets_file is not None else None
             )
-            if str_result:
-                print(str_result)
+            target_errors: list[tuple[str, Union[HTTPError, UserNotFoundError]]] = []
+
+            with cache_context as cache, since_id_store_context as since_id_store:
+                action_kwargs: dict[str, Any] = dict(
+                    http_client=http_client,
+                    action=args.action,
+                    max_concurrency=args.max_concurrency,
+                    cache=cache,
+                    full_history=args.full_history,
+                    since_id_store=since_id_store,
+                    snapshot_store=snapshot_store,
+                    checkpoint=checkpoint,
+                    queries=args.query,
+                    max_results=args.max_results,
+                    user_list=user_list
+                )
+
+                if args.action == 'serve':
+                    server = await start_daemon(
+                        http_client=http_client,
+                        socket_path=args.socket_path,
+                        port=args.port,
+                        max_concurrency=args.max_concurrency,
+                        cache=cache,
+                        since_id_store=since_id_store
+                    )
+                    try:
+                        async with server:
+                            await server.serve_forever()
+                    finally:
+                        if args.socket_path is not None:
+                            Path(args.socket_path).unlink(missing_ok=True)
+                elif args.action == 'follow' and targets is not None:
+                    follow_log_context = FollowLog(path=args.follow_log_path) if args.follow_log_path else nullcontext()
+                    with follow_log_context as follow_log:
+                        bulk_follow_stats = await follow_users(
+                            http_client=http_client,
+                            user_ids=[user_id for user_id, _ in targets if user_id is not None],
+                            screen_names=[screen_name for _, screen_name in targets if screen_name is not None],
+                            follow_log=follow_log,
+                            max_concurrency=args.max_target_concurrency,
+                            min_interval=args.follow_interval,
+                            max_num_follows=args.max_follows,
+                            cache=cache
+                        )
+                    print(json_dumps(asdict(bulk_follow_stats)), flush=True)
+                elif args.output_format != OutputFormat.TEXT.value:
+                    output_file_context = open_output(output_path=args.output_path, append=args.resume)
+                    with output_file_context as output_file, make_record_writer(
+                        output_format=args.output_format,
+                        file=output_file,
+                        columns=(
+                            TARGET_COLUMNS | ACTION_COLUMNS[args.action] if targets is not None
+                            else ACTION_COLUMNS[args.action]
+                        )
+                    ) as record_writer:
+                        await export_records(
+                            records=(
+                                iter_target_records(
+                                    targets=targets,
+                                    max_target_concurrency=args.max_target_concurrency,
+                                    target_errors=target_errors,
+                                    **action_kwargs
+                                ) if targets is not None
+                                else twitter_api_records(
+                                    user_id=args.user_id,
+                                    screen_name=args.screen_name,
+                                    **action_kwargs
+                                )
+                            ),
+                            record_writer=record_writer
+                        )
+                elif targets is not None:
+                    async with aclosing(
+                        iter_target_results(
+                            targets=targets,
+                            max_target_concurrency=args.max_target_concurrency,
+                            target_errors=target_errors,
+                            **action_kwargs
+                        )
+                    ) as target_results:
+                        async for target, str_result in target_results:
+                            print('\n'.join(f'{target}\t{line}' for line in str_result.splitlines()), flush=True)
+                else:
+                    async with aclosing(
+                        twitter_api(
+                            user_id=args.user_id,
+                            screen_name=args.screen_name,
+                            **action_kwargs
+                        )
+                    ) as str_results:
+                        async for str_result in str_results:
+                            print(str_result, flush=True)
+
+            for target, error in target_errors:
+                print(f'{target}: {format_target_error(e=error)}', file=stderr)
+
+            if checkpoint is not None:
+                checkpoint.delete()
     except HTTPStatusError as e:
-        print(
-            '\n'.join(str(e).split('\n')[:-1]) + '\n' + e.response.text,
-            file=stderr
-        )
+        print(format_http_status_error(e=e), file=stderr)
+    finally:
+        if request_stats is not None:
+            print(format_stats(request_stats=request_stats, stats_format=args.stats_format), file=stderr)
 
 
 if __name__ == '__main__':
-    asyncio_run(main())
+    try:
+        asyncio_run(main())
+    except BrokenPipeError:
+        # The reader of the output, e.g. `head`, has exited. Standard output is redirected to /dev/null, as Python
+        # flushes it at exit, which would fail with the same error again.
+        dup2(os_open(devnull, O_WRONLY), stdout.fileno())
+        sys_exit(1)
@@ -0,0 +1,168 @@
+from typing import Optional, Union, Any, Sequence
+from asyncio import Future, TimerHandle, Task, CancelledError, get_running_loop, create_task, shield
+
+from httpx import AsyncClient as HTTPXAsyncClient
+
+from twitter_api.calls import lookup_users, make_decoder
+from twitter_api.cache import ResponseCache, user_key
+from twitter_api.structures import User
+from twitter_api.lazy import LazyUser
+
+# The maximum number of users per `users/lookup` request.
+MAX_LOOKUP_BATCH_SIZE = 100
+
+# The number of seconds for which to collect lookups before they are sent as one batch.
+DEFAULT_MAX_DELAY = 0.005
+
+
+class UserNotFoundError(LookupError):
+    """
+    An error raised for a user that `users/lookup` did not return, e.g. because the user does not exist or has been
+    suspended.
+    """
+
+
+def _set_exception(future: Future, exception: BaseException) -> None:
+    future.set_exception(exception)
+    # Marks the exception as retrieved, as all the callers awaiting the future may have been cancelled -- which the
+    # shielded future outlives -- in which case asyncio would log it as never retrieved.
+    future.exception()
+
+
+class UserLoader:
+    """
+    A loader of users that coalesces concurrent lookups of single users into `users/lookup` requests.
+
+    Where `show_user` costs one request -- and one unit of the rate limit budget -- per user, the lookups made with
+    `load` within a few milliseconds of each other are sent as one `lookup_users` request of up to 100 users. A user
+    whose lookup is already pending or in flight is not requested again: its callers wait for the same response.
+
+    The users are shared between callers as JSON objects only; every caller is handed a structure decoded for it
+    alone, so that callers cannot observe each other's changes.
+    """
+
+    def __init__(
+        self,
+        http_client: HTTPXAsyncClient,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        max_batch_size: int = MAX_LOOKUP_BATCH_SIZE,
+        include_entities: Optional[bool] = None,
+        cache: Optional[ResponseCache] = None,
+        lazy: bool = False,
+        fields: Optional[Sequence[str]] = None
+    ):
+        """
+        :param http_client: The HTTP client with which to perform the lookups.
+        :param max_delay: The number of seconds for which to collect lookups before sending them, counted from the
+            first lookup of a batch.
+        :param max_batch_size: The number of lookups at which a batch is sent without waiting for `max_delay`; at
+            most 100.
+        :param include_entities:
+        :param cache: A cache from which to serve the users that are present in it and in which to store the others.
+        :param lazy: Whether to return lazily decoded views of the users, whose fields are decoded on first access.
+        :param fields: Names or dotted paths of fields to extract into named tuples, instead of decoding the complete
+            users; see `twitter_api.projection.make_projection`.
+        """
+
+        if not 1 <= max_batch_size <= MAX_LOOKUP_BATCH_SIZE:
+            raise ValueError(f'The batch size must be between 1 and {MAX_LOOKUP_BATCH_SIZE}.')
+
+        self.http_client = http_client
+        self.max_delay = max_delay
+        self.max_batch_size = max_batch_size
+        self.include_entities = include_entities
+        self.cache = cache
+
+        self._decode = make_decoder(structure=User, lazy_structure=LazyUser, lazy=lazy, fields=fields)
+
+        # The futures of the JSON objects of the users whose lookups are pending or in flight, keyed by user key.
+        self._futures: dict[str, Future[dict[str, Any]]] = {}
+        # The user IDs and screen names of the batch being collected, keyed by user key.
+        self._batch: dict[str, tuple[Optional[str], Optional[str]]] = {}
+        self._timer: Optional[TimerHandle] = None
+        self._tasks: set[Task] = set()
+
+        self.num_lookups = 0
+        self.num_requests = 0
+
+    async def load(
+        self,
+        user_id: Optional[Union[int, str]] = None,
+        screen_name: Optional[str] = None
+    ) -> Union[User, LazyUser, tuple]:
+        """
+        Look up a user, as part of a batch of concurrent lookups.
+
+        :param user_id: The user ID of the user to look up.
+        :param screen_name: The screen name of the user to look up.
+        :return: User information about the user.
+        """
+
+        if user_id is None and screen_name is None:
+            raise ValueError('A user ID or a screen name must be provided.')
+
+        key: str = user_key(user_id=user_id, screen_name=screen_name)
+        self.num_lookups += 1
+
+        if (future := self._futures.get(key)) is None:
+            self._futures[key] = future = get_running_loop().create_future()
+            self._batch[key] = (str(user_id), None) if user_id is not None else (None, screen_name)
+
+            if len(self._batch) >= self.max_batch_size:
+                self._dispatch()
+            elif self._timer is None:
+                self._timer = get_running_loop().call_later(self.max_delay, self._dispatch)
+
+        # Shielded, so that a caller that is cancelled does not cancel the lookup of the other callers.
+        return self._decode(await shield(future))
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._batch = self._batch, {}
+        if batch:
+            task = create_task(self._lookup_batch(batch=batch))
+            # A reference to the task is kept until it is done, so that it is not garbage collected.
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _lookup_batch(self, batch: dict[str, tuple[Optional[str], Optional[str]]]) -> None:
+        try:
+            self.num_requests += 1
+            users: tuple[LazyUser, ...] = await lookup_users(
+                http_client=self.http_client,
+                user_ids=[user_id for user_id, _ in batch.values() if user_id is not None],
+                screen_names=[screen_name for _, screen_name in batch.values() if screen_name is not None],
+                include_entities=self.include_entities,
+                cache=self.cache,
+                lazy=True
+            )
+        except CancelledError:
+            for key in batch:
+                self._futures.pop(key).cancel()
+            raise
+        except Exception as e:
+            # The error, e.g. an error response, is raised to every caller of the batch.
+            for key in batch:
+                if not (future := self._futures.pop(key)).done():
+                    _set_exception(future=future, exception=e)
+            return
+
+        key_to_user_object: dict[str, dict[str, Any]] = {}
+        for user in users:
+            key_to_user_object[user_key(user_id=user.json_object['id_str'])] = user.json_object
+            key_to_user_object[user_key(screen_name=user.json_object['screen_name'])] = user.json_object
+
+        for key in batch:
+            future = self._futures.pop(key)
+            if future.done():
+                continue
+            if (user_object := key_to_user_object.get(key)) is not None:
+                future.set_result(user_object)
+            else:
+                _set_exception(
+                    future=future,
+                    exception=UserNotFoundError(f'The user {key!r} could not be looked up.')
+                )
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+from typing import Optional, Union, Iterable, TextIO
+from asyncio import Queue, Task, create_task, shield, gather as asyncio_gather, sleep as asyncio_sleep
+from dataclasses import dataclass
+from pathlib import Path
+from time import monotonic
+
+from httpx import AsyncClient as HTTPXAsyncClient, HTTPStatusError, Response
+
+from twitter_api.calls import get_friend_ids, lookup_users, create_friendship
+from twitter_api.cache import ResponseCache
+from twitter_api.ids import CompactIds, CompactIdSet
+
+# The status codes of follow requests for accounts that cannot be followed, e.g. ones that have blocked the
+# authenticated user or that have been suspended. They are recorded as processed, so that they are not retried.
+UNFOLLOWABLE_STATUS_CODES = frozenset({403, 404})
+
+# The error code with which a follow request is refused once the authenticated user has reached its follow limit.
+FOLLOW_LIMIT_ERROR_CODE = 161
+
+# The number of accounts that a user can follow per day.
+# https://help.twitter.com/en/rules-and-policies/twitter-limits
+DAILY_FOLLOW_LIMIT = 400
+
+# The number of seconds between follow requests that spreads the daily follow limit over a day.
+DEFAULT_FOLLOW_INTERVAL: float = 24 * 60 * 60 / DAILY_FOLLOW_LIMIT
+
+
+@dataclass
+class BulkFollowStats:
+    num_followed: int = 0
+    # The number of accounts that the authenticated user was already following.
+    num_already_followed: int = 0
+    # The number of accounts recorded in the follow log by an earlier run.
+    num_previously_processed: int = 0
+    # The number of screen names that could not be looked up.
+    num_not_found: int = 0
+    # The number of accounts whose follow requests were refused, e.g. because they have blocked the user.
+    num_refused: int = 0
+
+
+class FollowLog:
+    """
+    A persistent log of the accounts that a bulk follow has processed, with which a stopped or repeated bulk follow
+    skips them.
+
+    The log is a text file with one processed account per line: its user ID and the status code of its follow
+    request, separated by a space. Each line is flushed as soon as the response has been received.
+    """
+
+    def __init__(self, path: Union[Path, str]):
+        """
+        :param path: The path of the log file. It is created if it does not exist.
+        """
+
+        self.path = Path(path)
+        self.user_ids = CompactIdSet()
+
+        try:
+            with self.path.open() as log_file:
+                self.user_ids.update(int(line.split(maxsplit=1)[0]) for line in log_file if line.strip())
+        except FileNotFoundError:
+            pass
+
+        self.file: TextIO = self.path.open(mode='a')
+
+    def __enter__(self) -> FollowLog:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def __contains__(self, user_id: object) -> bool:
+        return user_id in self.user_ids
+
+    def record(self, user_id: int, status_code: int) -> None:
+        """
+        Record an account as processed.
+
+        :param user_id: The user ID of the account.
+        :param status_code: The status code of the follow request of the account.
+        :return: None
+        """
+
+        self.file.write(f'{user_id} {status_code}\n')
+        self.file.flush()
+        self.user_ids.add(user_id)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def _error_codes(response: Response) -> set[int]:
+    try:
+        return {error['code'] for error in response.json().get('errors', [])}
+    except (ValueError, AttributeError, KeyError, TypeError):
+        return set()
+
+
+async def follow_users(
+    http_client: HTTPXAsyncClient,
+    user_ids: Optional[Iterable[Union[int, str]]] = None,
+    screen_names: Optional[Iterable[str]] = None,
+    follow_log: Optional[FollowLog] = None,
+    friend_ids: Optional[CompactIds] = None,
+    max_concurrency: int = 4,
+    min_interval: float = DEFAULT_FOLLOW_INTERVAL,
+    max_num_follows: Optional[int] = None,
+    cache: Optional[ResponseCache] = None
+) -> BulkFollowStats:
+    """
+    Follow many accounts, skipping the ones that the authenticated user already follows.
+
+    The IDs of the accounts that the authenticated user follows are retrieved with `get_friend_ids` first -- a
+    request per 5,000 accounts -- and screen names are resolved with `lookup_users`, so that follow requests are only
+    sent for the accounts not followed yet. The follow requests are sent by `max_concurrency` workers, started at
+    least `min_interval` seconds apart, which paces them within the daily follow limit. Every processed account is
+    recorded in the follow log, so that running the bulk follow again sends no request twice.
+
+    A refusal because of the follow limit stops the bulk follow with the `HTTPStatusError`, as does any other error.
+    The follow requests in flight at that time -- which may have taken effect -- are still awaited and recorded, so
+    that the accounts followed until then are in the log.
+
+    :param http_client: The HTTP client with which to perform the requests.
+    :param user_ids: The user IDs of the accounts to follow.
+    :param screen_names: The screen names of the accounts to follow.
+    :param follow_log: The log of the processed accounts, in which to record the accounts as they are processed.
+    :param friend_ids: The IDs of the accounts that the authenticated user follows, if already retrieved.
+    :param max_concurrency: The maximum number of follow requests to have in flight at the same time.
+    :param min_interval: The minimum number of seconds between the starts of consecutive follow requests.
+    :param max_num_follows: The maximum number of follow requests to send.
+    :param cache: A cache from which to serve the looked-up screen names if present.
+    :return: Statistics of the bulk follow.
+    """
+
+    stats = BulkFollowStats()
+
+    if friend_ids is None:
+        # Without a user, the IDs are those of the accounts that the authenticated user follows.
+        friend_ids = await get_friend_ids(http_client=http_client, follow_cursor=True, compact=True)
+
+    target_ids: list[int] = [int(user_id) for user_id in user_ids or ()]
+
+    if screen_names := list(screen_names or ()):
+        looked_up_ids: list[int] = [
+            user.id
+            for user in await lookup_users(
+                http_client=http_client,
+                screen_names=screen_names,
+                max_concurrency=max_concurrency,
+                cache=cache,
+                lazy=True
+            )
+        ]
+        stats.num_not_found += len(screen_names) - len(looked_up_ids)
+        target_ids.extend(looked_up_ids)
+
+    follow_queue: Queue[Optional[int]] = Queue()
+    queued_ids: set[int] = set()
+
+    for user_id in target_ids:
+        if user_id in queued_ids:
+            continue
+        queued_ids.add(user_id)
+
+        if follow_log is not None and user_id in follow_log:
+            stats.num_previously_processed += 1
+        elif user_id in friend_ids:
+            stats.num_already_followed += 1
+        elif max_num_follows is None or follow_queue.qsize() < max_num_follows:
+            follow_queue.put_nowait(user_id)
+
+    for _ in range(max_concurrency):
+        follow_queue.put_nowait(None)
+
+    next_start_time: float = monotonic()
+
+    async def follow(user_id: int) -> None:
+        try:
+            await create_friendship(http_client=http_client, user_id=user_id)
+        except HTTPStatusError as e:
+            if (
+                e.response.status_code not in UNFOLLOWABLE_STATUS_CODES
+                or FOLLOW_LIMIT_ERROR_CODE in _error_codes(response=e.response)
+            ):
+                raise
+
+            stats.num_refused += 1
+            status_code: int = e.response.status_code
+        else:
+            stats.num_followed += 1
+            status_code = 200
+
+        if follow_log is not None:
+            follow_log.record(user_id=user_id, status_code=status_code)
+
+    # The follow requests in flight, which outlive the cancellation of their workers.
+    follow_tasks: set[Task] = set()
+
+    async def work() -> None:
+        nonlocal next_start_time
+
+        while (user_id := follow_queue.get_nowait()) is not None:
+            # Each worker reserves the next start time before waiting for it, so that the requests are evenly spaced.
+            start_time: float = max(next_start_time, monotonic())
+            next_start_time = start_time + min_interval
+            if (delay := start_time - monotonic()) > 0:
+                await asyncio_sleep(delay)
+
+            follow_task = create_task(follow(user_id=user_id))
+            follow_tasks.add(follow_task)
+            follow_task.add_done_callback(follow_tasks.discard)
+            await shield(follow_task)
+
+    workers = [create_task(work()) for _ in range(max_concurrency)]
+    try:
+        await asyncio_gather(*workers)
+    finally:
+        for worker in workers:
+            worker.cancel()
+        await asyncio_gather(*workers, *follow_tasks, return_exceptions=True)
+
+    return stats
@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+from typing import Optional, Union, Any, Iterable, Mapping, Callable
+from collections import Counter
+from json import loads as json_loads, dumps as json_dumps
+from pathlib import Path
+from sqlite3 import connect as sqlite3_connect, Connection
+from time import time
+
+# The number of seconds for which the responses of an endpoint are considered fresh, unless overridden.
+DEFAULT_TTLS: dict[str, float] = {
+    'users': 24 * 60 * 60,
+    'friends/ids': 60 * 60,
+    'followers/ids': 60 * 60,
+    'statuses/user_timeline': 5 * 60
+}
+
+DEFAULT_TTL: float = 60 * 60
+
+
+class ResponseCache:
+    """
+    A persistent cache of API response data, backed by an SQLite database.
+
+    Entries are keyed by endpoint and a key derived from the request parameters, or, for user objects, by the user
+    ID and screen name, so that users obtained with any call can be served to any other call requesting the same
+    variant of the user objects (see `user_variant`). Each endpoint has a TTL of its own; when the number of entries
+    exceeds the size cap, the least recently used entries are evicted.
+
+    The SQLite reads and writes are synchronous: each call of the cache blocks the event loop for the duration of its
+    queries. The calls read and write their entries in batches -- one query per up to 500 keys -- which costs well
+    under a millisecond for a local database, but a cache on a slow file system stalls all concurrent requests.
+    """
+
+    def __init__(
+        self,
+        path: Union[Path, str] = ':memory:',
+        ttls: Optional[Mapping[str, float]] = None,
+        max_num_entries: int = 1_000_000,
+        clock: Callable[[], float] = time
+    ):
+        """
+        :param path: The path of the SQLite database file. Defaults to an in-memory database.
+        :param ttls: TTLs in seconds keyed by endpoint, overriding the default ones.
+        :param max_num_entries: The maximum number of entries to keep.
+        :param clock: A function returning the current Unix time.
+        """
+
+        self.ttls: dict[str, float] = DEFAULT_TTLS | dict(ttls or {})
+        self.max_num_entries = max_num_entries
+        self._clock = clock
+
+        self.hits: Counter[str] = Counter()
+        self.misses: Counter[str] = Counter()
+
+        self._connection: Connection = sqlite3_connect(str(path))
+        self._connection.executescript(
+            '''
+            CREATE TABLE IF NOT EXISTS entries (
+                endpoint TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires REAL NOT NULL,
+                accessed REAL NOT NULL,
+                PRIMARY KEY (endpoint, key)
+            );
+            CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+            '''
+        )
+
+    def __enter__(self) -> ResponseCache:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __len__(self) -> int:
+        return self._connection.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+
+    def get_many(self, endpoint: str, keys: Iterable[str]) -> dict[str, Any]:
+        """
+        Retrieve the fresh entries of an endpoint with the specified keys.
+
+        :param endpoint: The endpoint whose entries to retrieve.
+        :param keys: The keys of the entries to retrieve.
+        :return: The values of the entries that were found and are fresh, keyed by key.
+        """
+
+        keys = list(dict.fromkeys(keys))
+        now: float = self._clock()
+
+        key_to_value: dict[str, Any] = {}
+
+        # Stay below SQLite's default limit on the number of host parameters.
+        for index in range(0, len(keys), 500):
+            iter_keys = keys[index:index+500]
+            rows = self._connection.execute(
+                f'SELECT key, value FROM entries '
+                f'WHERE endpoint = ? AND expires > ? AND key IN ({",".join("?" * len(iter_keys))})',
+                (endpoint, now, *iter_keys)
+            ).fetchall()
+
+            if rows:
+                self._connection.executemany(
+                    'UPDATE entries SET accessed = ? WHERE endpoint = ? AND key = ?',
+                    ((now, endpoint, key) for key, _ in rows)
+                )
+
+            key_to_value.update((key, json_loads(value)) for key, value in rows)
+
+        self._connection.commit()
+
+        self.hits[endpoint] += len(key_to_value)
+        self.misses[endpoint] += len(keys) - len(key_to_value)
+
+        return key_to_value
+
+    def get(self, endpoint: str, key: str) -> Optional[Any]:
+        """
+        Retrieve a fresh entry of an endpoint.
+
+        :param endpoint: The endpoint whose entry to retrieve.
+        :param key: The key of the entry to retrieve.
+        :return: The value of the entry, or `None` if it was not found or has expired.
+        """
+
+        return self.get_many(endpoint=endpoint, keys=[key]).get(key)
+
+    def set_many(self, endpoint: str, items: Iterable[tuple[str, Any]]) -> None:
+        """
+        Store entries of an endpoint, evicting the least recently used entries if the size cap is exceeded.
+
+        :param endpoint: The endpoint whose entries to store.
+        :param items: Pairs of keys and JSON-serializable values to store.
+        :return: None
+        """
+
+        now: float = self._clock()
+        expires: float = now + self.ttls.get(endpoint, DEFAULT_TTL)
+
+        self._connection.executemany(
+            'INSERT OR REPLACE INTO entries (endpoint, key, value, expires, accessed) VALUES (?, ?, ?, ?, ?)',
+            ((endpoint, key, json_dumps(value), expires, now) for key, value in items)
+        )
+
+        if (num_excess_entries := len(self) - self.max_num_entries) > 0:
+            self._connection.execute(
+                'DELETE FROM entries WHERE rowid IN (SELECT rowid FROM entries ORDER BY accessed LIMIT ?)',
+                (num_excess_entries,)
+            )
+
+        self._connection.commit()
+
+    def set(self, endpoint: str, key: str, value: Any) -> None:
+        """
+        Store an entry of an endpoint.
+
+        :param endpoint: The endpoint whose entry to store.
+        :param key: The key of the entry.
+        :param value: The JSON-serializable value of the entry.
+        :return: None
+        """
+
+        self.set_many(endpoint=endpoint, items=[(key, value)])
+
+    def get_users(
+        self,
+        user_ids: Iterable[Union[int, str]] = (),
+        screen_names: Iterable[str] = (),
+        variant: str = ''
+    ) -> dict[str, Any]:
+        """
+        Retrieve fresh user objects by user ID or screen name.
+
+        :param user_ids: The user IDs of the users to retrieve.
+        :param screen_names: The screen names of the users to retrieve.
+        :param variant: The variant of the user objects to retrieve; see `user_variant`.
+        :return: The user objects that were found, keyed by their user key (see `user_key`).
+        """
+
+        prefix: str = f'{variant}|' if variant else ''
+
+        return {
+            key.removeprefix(prefix): user_object
+            for key, user_object in self.get_many(
+                endpoint='users',
+                keys=[
+                    *(prefix + user_key(user_id=user_id) for user_id in user_ids),
+                    *(prefix + user_key(screen_name=screen_name) for screen_name in screen_names)
+                ]
+            ).items()
+        }
+
+    def set_users(self, user_objects: Iterable[dict[str, Any]], variant: str = '') -> None:
+        """
+        Store user objects, retrievable both by user ID and by screen name.
+
+        :param user_objects: The user objects, as returned by the API, to store.
+        :param variant: The variant of the user objects; see `user_variant`.
+        :return: None
+        """
+
+        prefix: str = f'{variant}|' if variant else ''
+
+        self.set_many(
+            endpoint='users',
+            items=(
+                (prefix + key, user_object)
+                for user_object in user_objects
+                for key in (
+                    user_key(user_id=user_object['id_str']),
+                    user_key(screen_name=user_object['screen_name'])
+                )
+            )
+        )
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """
+        Summarize the hits and misses of the cache.
+
+        :return: The number of hits and misses, keyed by endpoint.
+        """
+
+        return {
+            endpoint: dict(hits=self.hits[endpoint], misses=self.misses[endpoint])
+            for endpoint in sorted(self.hits.keys() | self.misses.keys())
+        }
+
+
+def user_key(user_id: Optional[Union[int, str]] = None, screen_name: Optional[str] = None) -> str:
+    """
+    Make the cache key of a user, from either the user's ID or the user's screen name.
+
+    Screen names are case-insensitive and are prefixed with `@`, so that numeric screen names and user IDs do not
+    collide.
+
+    :param user_id: The user ID of the user.
+    :param screen_name: The screen name of the user.
+    :return: The cache key of the user.
+    """
+
+    return str(user_id) if user_id is not None else f'@{screen_name.lower()}'
+
+
+def user_variant(include_entities: Optional[bool] = None, tweet_mode: Optional[str] = None) -> str:
+    """
+    Make the cache variant of user objects retrieved with the specified parameters.
+
+    The parameters change the content of the user objects -- their entities, and the text of their embedded statuses
+    -- so that user objects retrieved with different parameters are cached apart. The variant of the API's defaults
+    is the empty string.
+
+    :param include_entities: The `include_entities` parameter with which the user objects were retrieved.
+    :param tweet_mode: The `tweet_mode` parameter with which the user objects were retrieved.
+    :return: The variant of the user objects.
+    """
+
+    variant_params: dict[str, str] = {}
+    if include_entities is not None and not include_entities:
+        variant_params['include_entities'] = 'false'
+    if tweet_mode is not None and tweet_mode != 'compat':
+        variant_params['tweet_mode'] = str(tweet_mode)
+
+    return '&'.join(f'{key}={value}' for key, value in variant_params.items())
+
+
+def params_key(params: Mapping[str, Any]) -> str:
+    """
+    Make a cache key from request parameters, independent of their order.
+
+    :param params: The request parameters.
+    :return: The cache key.
+    """
+
+    return json_dumps(sorted((key, str(value)) for key, value in params.items()))
@@ -1,10 +1,26 @@
-from typing import Optional, Iterable, Union, Any
+from typing import Optional, Iterable, Union, Any, AsyncIterator, Sequence, Callable
+from asyncio import Semaphore, gather as asyncio_gather
+from itertools import chain
+from array import array
 from urllib.parse import urljoin, quote, parse_qs, urlparse, urlencode
 
 from httpx import AsyncClient as HTTPXAsyncClient
 from httpx_oauth.v1 import RequestTokenResponse
 
-from twitter_api.structures import IdsResult, User, AccessTokenResponse, Status, SearchTweetsResponse
+from twitter_api.structures import (
+    IdsResult, User, AccessTokenResponse, Status, SearchTweetsResponse, SearchMetadata
+)
+from twitter_api.cache import ResponseCache, user_key, user_variant, params_key
+from twitter_api.ids import CompactIds, CompactIdSet, ID_TYPECODE
+from twitter_api.lazy import LazyUser, LazyStatus
+from twitter_api.projection import make_projection
+from twitter_api.checkpoint import PaginationCheckpoint
+from twitter_api.stats import time_decode
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
 
 user_info_url = 'https://api.twitter.com/1.1/account/verify_credentials.json'
 
@@ -12,6 +28,32 @@ API_VERSION = '1.1'
 TWITTER_BASE_URL = 'https://api.twitter.com/'
 TWITTER_API_URL: str = f'{TWITTER_BASE_URL}{API_VERSION}/'
 
+# The status codes of requests for the data of unavailable accounts, e.g. protected or suspended ones.
+UNAVAILABLE_ACCOUNT_STATUS_CODES = frozenset({401, 403, 404})
+
+
+def make_decoder(
+    structure: type,
+    lazy_structure: type,
+    lazy: bool = False,
+    fields: Optional[Sequence[str]] = None
+) -> Callable[[dict[str, Any]], Any]:
+    """
+    Make a function decoding JSON objects of a structure in the manner requested by the caller of a call.
+
+    :param structure: The structure of the JSON objects, e.g. `User`.
+    :param lazy_structure: The lazy variant of the structure, e.g. `LazyUser`.
+    :param lazy: Whether to decode into the lazy variant.
+    :param fields: The fields to project the JSON objects into. Takes precedence over `lazy`.
+    :return: A function decoding a JSON object.
+    """
+
+    if fields is not None:
+        return make_projection(structure=structure, fields=tuple(fields))
+
+    decoding_structure: type = lazy_structure if lazy else structure
+    return lambda json_object: decoding_structure.from_json(json_object=json_object)
+
 
 async def request_oauth_token(http_client: HTTPXAsyncClient) -> RequestTokenResponse:
 
@@ -99,7 +141,9 @@ async def search_users(
     page: Optional[int] = None,
     count: Optional[int] = None,
     include_entities: Optional[bool] = None,
-) -> tuple[User, ...]:
+    lazy: bool = False,
+    fields: Optional[Sequence[str]] = None
+) -> tuple[Union[User, LazyUser, tuple], ...]:
     """
     Retrieve user information of users matching a search query.
 
@@ -112,6 +156,9 @@ async def search_users(
     :param page:
     :param count:
     :param include_entities:
+    :param lazy: Whether to return lazily decoded views of the users, whose fields are decoded on first access.
+    :param fields: Names or dotted paths of fields to extract into named tuples, instead of decoding the complete
+        users; see `twitter_api.projection.make_projection`.
     :return: A tuple of user information of the users matching the search query.
     """
 
@@ -130,7 +177,10 @@ async def search_users(
     )
     response.raise_for_status()
 
-    return tuple(User.from_json(json_object=user_object) for user_object in response.json())
+    decode = make_decoder(structure=User, lazy_structure=LazyUser, lazy=lazy, fields=fields)
+
+    with time_decode(http_client=http_client, endpoint='users/search'):
+        return tuple(decode(user_object) for user_object in json_loads(response.content))
 
 
 async def show_user(
@@ -138,7 +188,10 @@ async def show_user(
     user_id: Optional[int] = None,
     screen_name: Optional[str] = None,
     include_entities: Optional[bool] = None,
-) -> User:
+    cache: Optional[ResponseCache] = None,
+    lazy: bool = False,
+    fields: Optional[Sequence[str]] = None
+) -> Union[User, LazyUser, tuple]:
     """
     Retrieve user information about a specified user.
 
@@ -148,9 +201,25 @@ async def show_user(
     :param user_id: The user ID of the user whose information to retrieve.
     :param screen_name: The screen name of the user whose information to retrieve.
     :param include_entities:
+    :param cache: A cache from which to serve the user if present and in which to store the user otherwise.
+    :param lazy: Whether to return lazily decoded views of the user, whose fields are decoded on first access.
+    :param fields: Names or dotted paths of fields to extract into named tuples, instead of decoding the complete
+        user; see `twitter_api.projection.make_projection`.
     :return: User information about the specified user.
     """
 
+    decode = make_decoder(structure=User, lazy_structure=LazyUser, lazy=lazy, fields=fields)
+
+    if cache is not None:
+        cached_user_objects: dict[str, Any] = cache.get_users(
+            user_ids=[user_id] if user_id is not None else [],
+            screen_names=[screen_name] if user_id is None and screen_name is not None else [],
+            variant=user_variant(include_entities=include_entities)
+        )
+        if cached_user_objects:
+            with time_decode(http_client=http_client, endpoint='users/show'):
+                return decode(next(iter(cached_user_objects.values())))
+
     response = await http_client.get(
         url=urljoin(TWITTER_API_URL, 'users/show.json'),
         params={
@@ -165,7 +234,14 @@ async def show_user(
     )
     response.raise_for_status()
 
-    return User.from_json(json_object=response.json())
+    with time_decode(http_client=http_client, endpoint='users/show'):
+        user_object: dict[str, Any] = json_loads(response.content)
+
+    if cache is not None:
+        cache.set_users(user_objects=[user_object], variant=user_variant(include_entities=include_entities))
+
+    with time_decode(http_client=http_client, endpoint='users/show'):
+        return decode(user_object)
 
 
 async def lookup_users(
@@ -174,11 +250,19 @@ async def lookup_users(
     screen_names: Iterable[str] = None,
     include_entities: Optional[bool] = None,
     # NOTE: Undocumented (!) - When set to "extended", the full text a of a tweet is returned.
-    tweet_mode: Optional[bool] = None
-) -> tuple[User, ...]:
+    tweet_mode: Optional[bool] = None,
+    max_concurrency: int = 1,
+    cache: Optional[ResponseCache] = None,
+    lazy: bool = False,
+    fields: Optional[Sequence[str]] = None
+) -> tuple[Union[User, LazyUser, tuple], ...]:
     """
     Retrieve user information about specified users.
 
+    The users are looked up in chunks of 100 per request; up to `max_concurrency` of these requests are in flight at
+    the same time. The users are returned in the order in which they were specified, user IDs before screen names;
+    users that could not be looked up (e.g. suspended users) are omitted.
+
     https://developer.twitter.com/en/docs/accounts-and-users/follow-search-get-users/api-reference/get-users-lookup
 
     :param http_client: The HTTP client with which to perform the HTTP request to look up the users.
@@ -186,49 +270,277 @@ async def lookup_users(
     :param screen_names: The screen names of the users whose information to retrieve.
     :param include_entities:
     :param tweet_mode:
+    :param max_concurrency: The maximum number of lookup requests to have in flight at the same time.
+    :param cache: A cache from which to serve the users that are present in it; only the other users are requested,
+        and stored in the cache.
+    :param lazy: Whether to return lazily decoded views of the users, whose fields are decoded on first access.
+    :param fields: Names or dotted paths of fields to extract into named tuples, instead of decoding the complete
+        users; see `twitter_api.projection.make_projection`.
     :return: A tuple of user information about the specified users.
     """
 
-    json_user_objects: list[dict[str, Any]] = []
-
     user_ids = [str(user_id) for user_id in user_ids] if user_ids is not None else []
     screen_names = list(screen_names) if screen_names else []
 
+    variant: str = user_variant(include_entities=include_entities, tweet_mode=tweet_mode)
+
+    user_key_to_user_object: dict[str, dict[str, Any]] = (
+        cache.get_users(user_ids=user_ids, screen_names=screen_names, variant=variant) if cache is not None else {}
+    )
+
+    missing_user_ids = [
+        user_id for user_id in user_ids
+        if user_key(user_id=user_id) not in user_key_to_user_object
+    ]
+    missing_screen_names = [
+        screen_name for screen_name in screen_names
+        if user_key(screen_name=screen_name) not in user_key_to_user_object
+    ]
+
     user_ids_index = 0
     screen_names_index = 0
 
-    # TODO: It would be cool to use `asyncio.gather` here...
+    chunks: list[tuple[list[str], list[str]]] = []
 
     while True:
-        iter_user_ids = user_ids[user_ids_index:user_ids_index+100]
+        iter_user_ids = missing_user_ids[user_ids_index:user_ids_index+100]
         user_ids_index += 100
 
         num_slots_remaining = 100 - len(iter_user_ids)
 
-        iter_screen_names = screen_names[screen_names_index:screen_names_index+num_slots_remaining]
+        iter_screen_names = missing_screen_names[screen_names_index:screen_names_index+num_slots_remaining]
         screen_names_index += num_slots_remaining
 
         if not iter_user_ids and not iter_screen_names:
             break
 
-        response = await http_client.get(
-            url=urljoin(TWITTER_API_URL, 'users/lookup.json'),
-            params={
-                key: value
-                for key, value in [
-                    ('user_id', ','.join(iter_user_ids) if iter_user_ids else None),
-                    ('screen_name', ','.join(iter_screen_names) if iter_screen_names else None),
-                    ('include_entities', include_entities),
-                    ('tweet_mode', tweet_mode)
-                ]
-                if value is not None
-            }
+        chunks.append((iter_user_ids, iter_screen_names))
+
+    semaphore = Semaphore(max_concurrency)
+
+    async def lookup_chunk(chunk_user_ids: list[str], chunk_screen_names: list[str]) -> list[dict[str, Any]]:
+        async with semaphore:
+            response = await http_client.get(
+                url=urljoin(TWITTER_API_URL, 'users/lookup.json'),
+                params={
+                    key: value
+                    for key, value in [
+                        ('user_id', ','.join(chunk_user_ids) if chunk_user_ids else None),
+                        ('screen_name', ','.join(chunk_screen_names) if chunk_screen_names else None),
+                        ('include_entities', include_entities),
+                        ('tweet_mode', tweet_mode)
+                    ]
+                    if value is not None
+                }
+            )
+            # The endpoint responds with 404 if none of the users of the chunk could be looked up, e.g. if they have
+            # all been suspended or deleted.
+            if response.status_code == 404:
+                return []
+            response.raise_for_status()
+
+        with time_decode(http_client=http_client, endpoint='users/lookup'):
+            return json_loads(response.content)
+
+    fetched_user_objects: list[dict[str, Any]] = [
+        user_object
+        for json_user_objects in await asyncio_gather(*(lookup_chunk(*chunk) for chunk in chunks))
+        for user_object in json_user_objects
+    ]
+
+    if cache is not None:
+        cache.set_users(user_objects=fetched_user_objects, variant=variant)
+
+    # The endpoint does not guarantee any particular order of the returned user objects.
+
+    for user_object in fetched_user_objects:
+        user_key_to_user_object[user_key(user_id=user_object['id_str'])] = user_object
+        user_key_to_user_object[user_key(screen_name=user_object['screen_name'])] = user_object
+
+    decode = make_decoder(structure=User, lazy_structure=LazyUser, lazy=lazy, fields=fields)
+
+    with time_decode(http_client=http_client, endpoint='users/lookup'):
+        return tuple(
+            decode(user_key_to_user_object[key])
+            for key in chain(
+                (user_key(user_id=user_id) for user_id in user_ids),
+                (user_key(screen_name=screen_name) for screen_name in screen_names)
+            )
+            if key in user_key_to_user_object
         )
-        response.raise_for_status()
 
-        json_user_objects.extend(response.json())
 
-    return tuple(User.from_json(json_object=user_object) for user_object in json_user_objects)
+async def _iter_ids(
+    http_client: HTTPXAsyncClient,
+    endpoint: str,
+    user_id: Optional[int] = None,
+    screen_name: Optional[str] = None,
+    cursor: Optional[int] = None,
+    stringify_ids: Optional[bool] = None,
+    count: Optional[int] = None,
+    follow_cursor: bool = True,
+    cache: Optional[ResponseCache] = None,
+    checkpoint: Optional[PaginationCheckpoint] = None,
+    record_pages: bool = True
+) -> AsyncIterator[IdsResult]:
+    """
+    Retrieve pages of user IDs from a cursored IDs endpoint, following the cursor iteratively.
+
+    :param http_client: The HTTP client with which to perform the HTTP requests.
+    :param endpoint: The name of the endpoint, e.g. `friends/ids`.
+    :param user_id:
+    :param screen_name:
+    :param cursor:
+    :param stringify_ids:
+    :param count:
+    :param follow_cursor: Whether to follow the cursor, in order to obtain the complete result.
+    :param cache: A cache from which to serve pages if present and in which to store pages otherwise.
+    :param checkpoint: A checkpoint from whose cursor to resume and in which to record each page once it has been
+        consumed.
+    :param record_pages: Whether to record the pages in the checkpoint, rather than leave that to the consumer.
+    :return: An async iterator of the ID result pages, in the order they were retrieved.
+    """
+
+    if checkpoint is not None:
+        checkpoint.start(job=f'{endpoint}:{user_key(user_id=user_id, screen_name=screen_name)}')
+        if checkpoint.is_complete:
+            return
+        if checkpoint.cursor is not None:
+            cursor = checkpoint.cursor
+
+    while True:
+        params = {
+            key: value
+            for key, value in [
+                ('user_id', user_id),
+                ('screen_name', screen_name),
+                ('cursor', cursor),
+                ('stringify_ids', stringify_ids),
+                ('count', count)
+            ]
+            if value is not None
+        }
+
+        json_object: Optional[dict[str, Any]] = (
+            cache.get(endpoint=endpoint, key=params_key(params=params)) if cache is not None else None
+        )
+
+        if json_object is None:
+            response = await http_client.get(url=urljoin(TWITTER_API_URL, f'{endpoint}.json'), params=params)
+            response.raise_for_status()
+
+            with time_decode(http_client=http_client, endpoint=endpoint):
+                json_object = json_loads(response.content)
+
+            if cache is not None:
+                cache.set(endpoint=endpoint, key=params_key(params=params), value=json_object)
+
+        with time_decode(http_client=http_client, endpoint=endpoint):
+            ids_result = IdsResult.from_json(json_object=json_object)
+
+        yield ids_result
+
+        if checkpoint is not None and record_pages:
+            checkpoint.record_ids_page(ids=ids_result.ids, next_cursor=ids_result.next_cursor)
+
+        if not follow_cursor or ids_result.next_cursor == 0:
+            break
+
+        cursor = ids_result.next_cursor
+
+
+def iter_friend_ids(
+    http_client: HTTPXAsyncClient,
+    user_id: Optional[int] = None,
+    screen_name: Optional[str] = None,
+    cursor: Optional[int] = None,
+    stringify_ids: Optional[bool] = None,
+    count: Optional[int] = None,
+    cache: Optional[ResponseCache] = None,
+    checkpoint: Optional[PaginationCheckpoint] = None,
+    record_pages: bool = True
+) -> AsyncIterator[IdsResult]:
+    """
+    Retrieve the user IDs of the users a specified user is following, one page at a time.
+
+    Each page is yielded as soon as it has been retrieved, so that the IDs can be consumed while the cursor is still
+    being followed.
+
+    https://developer.twitter.com/en/docs/accounts-and-users/follow-search-get-users/api-reference/get-friends-ids
+
+    :param http_client: The HTTP client with which to perform the HTTP requests to retrieve the user's friends' IDs.
+    :param user_id: The user ID of the user whose friends' user IDs to retrieve.
+    :param screen_name: The screen name of the user whose friends' user IDs to retrieve.
+    :param cursor: A cursor indicating an offset from which to start obtaining the results.
+    :param stringify_ids: Whether to have IDs returned as strings.
+    :param count: the number of IDs attempt retrieval of per page, up to a maximum of 5,000.
+    :param cache: A cache from which to serve pages if present and in which to store pages otherwise.
+    :param checkpoint: A checkpoint from whose cursor to resume and in which to record each page once it has been
+        consumed. Pages retrieved before the resumption are not yielded again.
+    :param record_pages: Whether to record the pages in the checkpoint once they have been consumed; `False` if the
+        consumer records them itself, e.g. `iter_hydrated_users` once the users of a page have been yielded.
+    :return: An async iterator of the pages of user IDs of the friends of the specified user.
+    """
+
+    return _iter_ids(
+        http_client=http_client,
+        endpoint='friends/ids',
+        user_id=user_id,
+        screen_name=screen_name,
+        cursor=cursor,
+        stringify_ids=stringify_ids,
+        count=count,
+        cache=cache,
+        checkpoint=checkpoint,
+        record_pages=record_pages
+    )
+
+
+def iter_follower_ids(
+    http_client: HTTPXAsyncClient,
+    user_id: Optional[int] = None,
+    screen_name: Optional[str] = None,
+    cursor: Optional[int] = None,
+    stringify_ids: Optional[bool] = None,
+    count: Optional[int] = None,
+    cache: Optional[ResponseCache] = None,
+    checkpoint: Optional[PaginationCheckpoint] = None,
+    record_pages: bool = True
+) -> AsyncIterator[IdsResult]:
+    """
+    Retrieve the user IDs of followers of a specified user, one page at a time.
+
+    Each page is yielded as soon as it has been retrieved, so that the IDs can be consumed while the cursor is still
+    being followed.
+
+    https://developer.twitter.com/en/docs/accounts-and-users/follow-search-get-users/api-reference/get-followers-ids
+
+    :param http_client: The HTTP client with which to perform the HTTP requests to retrieve user's followers' IDs.
+    :param user_id: The user ID of the user whose followers' IDs to retrieve.
+    :param screen_name: The screen name of the user whose followers' IDs to retrieve.
+    :param cursor: A cursor indicating an offset from which to start obtaining the results.
+    :param stringify_ids: Whether to have IDs returned as strings.
+    :param count: the number of IDs attempt retrieval of per page, up to a maximum of 5,000.
+    :param cache: A cache from which to serve pages if present and in which to store pages otherwise.
+    :param checkpoint: A checkpoint from whose cursor to resume and in which to record each page once it has been
+        consumed. Pages retrieved before the resumption are not yielded again.
+    :param record_pages: Whether to record the pages in the checkpoint once they have been consumed; `False` if the
+        consumer records them itself, e.g. `iter_hydrated_users` once the users of a page have been yielded.
+    :return: An async iterator of the pages of user IDs of the followers of the specified user.
+    """
+
+    return _iter_ids(
+        http_client=http_client,
+        endpoint='followers/ids',
+        user_id=user_id,
+        screen_name=screen_name,
+        cursor=cursor,
+        stringify_ids=stringify_ids,
+        count=count,
+        cache=cache,
+        checkpoint=checkpoint,
+        record_pages=record_pages
+    )
 
 
 async def get_friend_ids(
@@ -238,8 +550,11 @@ async def get_friend_ids(
     cursor: Optional[int] = None,
     stringify_ids: Optional[bool] = None,
     count: Optional[int] = None,
-    follow_cursor: bool = False
-) -> list[int]:
+    follow_cursor: bool = False,
+    cache: Optional[ResponseCache] = None,
+    compact: bool = False,
+    checkpoint: Optional[PaginationCheckpoint] = None
+) -> Union[list[int], CompactIds]:
     """
     Retrieve the user IDs of the users a specified user is following.
 
@@ -252,41 +567,35 @@ async def get_friend_ids(
     :param stringify_ids: Whether to have IDs returned as strings.
     :param count: the number of IDs attempt retrieval of, up to a maximum of 5,000 per distinct request.
     :param follow_cursor: Whether to follow the cursor, in order to obtain the complete result.
+    :param cache: A cache from which to serve pages if present and in which to store pages otherwise.
+    :param compact: Whether to return the IDs as a `CompactIds`, sorted and stored at eight bytes per ID, rather than
+        as a list in the order returned by the API.
+    :param checkpoint: A checkpoint from which to resume, with the IDs of the pages retrieved before the resumption,
+        and in which to record each page.
     :return: A set of user IDs of the friends of the specified user.
     """
 
-    response = await http_client.get(
-        url=urljoin(TWITTER_API_URL, 'friends/ids.json'),
-        params={
-            key: value
-            for key, value in [
-                ('user_id', user_id),
-                ('screen_name', screen_name),
-                ('cursor', cursor),
-                ('stringify_ids', stringify_ids),
-                ('count', count)
-            ]
-            if value is not None
-        }
-    )
-    response.raise_for_status()
+    ids: Union[list[int], array] = array(ID_TYPECODE) if compact else []
 
-    ids_result = IdsResult.from_json(json_object=response.json())
-
-    if follow_cursor and ids_result.next_cursor != 0:
-        ids_result.ids.extend(
-            await get_friend_ids(
-                http_client=http_client,
-                user_id=user_id,
-                screen_name=screen_name,
-                cursor=ids_result.next_cursor,
-                stringify_ids=stringify_ids,
-                count=count,
-                follow_cursor=follow_cursor
-            )
-        )
+    if checkpoint is not None:
+        checkpoint_ids: array = checkpoint.load_ids()
+        ids.extend(map(str, checkpoint_ids) if stringify_ids and not compact else checkpoint_ids)
 
-    return ids_result.ids
+    async for ids_result in _iter_ids(
+        http_client=http_client,
+        endpoint='friends/ids',
+        user_id=user_id,
+        screen_name=screen_name,
+        cursor=cursor,
+        stringify_ids=stringify_ids,
+        count=count,
+        follow_cursor=follow_cursor,
+        cache=cache,
+        checkpoint=checkpoint
+    ):
+        ids.extend(map(int, ids_result.ids) if compact and stringify_ids else ids_result.ids)
+
+    return CompactIds(ids=ids) if compact else ids
 
 
 async def get_follower_ids(
@@ -296,8 +605,11 @@ async def get_follower_ids(
     cursor: Optional[int] = None,
     stringify_ids: Optional[bool] = None,
     count: Optional[int] = None,
-    follow_cursor: bool = False
-) -> list[int]:
+    follow_cursor: bool = False,
+    cache: Optional[ResponseCache] = None,
+    compact: bool = False,
+    checkpoint: Optional[PaginationCheckpoint] = None
+) -> Union[list[int], CompactIds]:
     """
     Retrieve the user IDs of followers of a specified user.
 
@@ -310,41 +622,35 @@ async def get_follower_ids(
     :param stringify_ids:
     :param count:
     :param follow_cursor: Whether to follow the cursor, in order to obtain the complete result.
+    :param cache: A cache from which to serve pages if present and in which to store pages otherwise.
+    :param compact: Whether to return the IDs as a `CompactIds`, sorted and stored at eight bytes per ID, rather than
+        as a list in the order returned by the API.
+    :param checkpoint: A checkpoint from which to resume, with the IDs of the pages retrieved before the resumption,
+        and in which to record each page.
     :return: A set of the IDs of the followers of the specified user.
     """
 
-    response = await http_client.get(
-        url=urljoin(TWITTER_API_URL, 'followers/ids.json'),
-        params={
-            key: value
-            for key, value in [
-                ('user_id', user_id),
-                ('screen_name', screen_name),
-                ('cursor', cursor),
-                ('stringify_ids', stringify_ids),
-                ('count', count)
-            ]
-            if value is not None
-        }
-    )
-    response.raise_for_status()
+    ids: Union[list[int], array] = array(ID_TYPECODE) if compact else []
 
-    ids_result = IdsResult.from_json(json_object=response.json())
-
-    if follow_cursor and ids_result.next_cursor != 0:
-        ids_result.ids.extend(
-            await get_follower_ids(
-                http_client=http_client,
-                user_id=user_id,
-                screen_name=screen_name,
-                cursor=ids_result.next_cursor,
-                stringify_ids=stringify_ids,
-                count=count,
-                follow_cursor=follow_cursor
-            )
-        )
+    if checkpoint is not None:
+        checkpoint_ids: array = checkpoint.load_ids()
+        ids.extend(map(str, checkpoint_ids) if stringify_ids and not compact else checkpoint_ids)
 
-    return ids_result.ids
+    async for ids_result in _iter_ids(
+        http_client=http_client,
+        endpoint='followers/ids',
+        user_id=user_id,
+        screen_name=screen_name,
+        cursor=cursor,
+        stringify_ids=stringify_ids,
+        count=count,
+        follow_cursor=follow_cursor,
+        cache=cache,
+        checkpoint=checkpoint
+    ):
+        ids.extend(map(int, ids_result.ids) if compact and stringify_ids else ids_result.ids)
+
+    return CompactIds(ids=ids) if compact else ids
 
 
 async def create_friendship(
@@ -379,7 +685,8 @@ async def create_friendship(
     )
     response.raise_for_status()
 
-    return User.from_json(json_object=response.json())
+    with time_decode(http_client=http_client, endpoint='friendships/create'):
+        return User.from_json(json_object=json_loads(response.content))
 
 
 async def user_timeline_statuses(
@@ -392,8 +699,11 @@ async def user_timeline_statuses(
     trim_user: Optional[bool] = None,
     exclude_replies: Optional[bool] = None,
     include_rts: Optional[bool] = None,
-    tweet_mode: Optional[str] = 'extended'
-) -> tuple[Status, ...]:
+    tweet_mode: Optional[str] = 'extended',
+    cache: Optional[ResponseCache] = None,
+    lazy: bool = False,
+    fields: Optional[Sequence[str]] = None
+) -> tuple[Union[Status, LazyStatus, tuple], ...]:
     """
     Retrieve statuses (i.e. tweets) of a user.
 
@@ -409,30 +719,128 @@ async def user_timeline_statuses(
     :param exclude_replies: Whether to exclude replies.
     :param include_rts: Whether to include retweets.
     :param tweet_mode:
+    :param cache: A cache from which to serve the statuses if present and in which to store them otherwise.
+    :param lazy: Whether to return lazily decoded views of the statuses, whose fields are decoded on first access.
+    :param fields: Names or dotted paths of fields to extract into named tuples, instead of decoding the complete
+        statuses; see `twitter_api.projection.make_projection`.
     :return: Statuses matching the criteria.
     """
 
-    response = await http_client.get(
-        url=urljoin(TWITTER_API_URL, 'statuses/user_timeline.json'),
-        params={
-            key: value
-            for key, value in [
-                ('user_id', user_id),
-                ('screen_name', screen_name),
-                ('since_id', since_id),
-                ('count', count),
-                ('max_id', max_id),
-                ('trim_user', 'true' if trim_user else None),
-                ('exclude_replies', 'true' if exclude_replies else None),
-                ('include_rts', 'true' if include_rts else None),
-                ('tweet_mode', tweet_mode)
-            ]
-            if value is not None
-        }
+    params = {
+        key: value
+        for key, value in [
+            ('user_id', user_id),
+            ('screen_name', screen_name),
+            ('since_id', since_id),
+            ('count', count),
+            ('max_id', max_id),
+            ('trim_user', 'true' if trim_user else None),
+            ('exclude_replies', 'true' if exclude_replies else None),
+            ('include_rts', 'true' if include_rts else None),
+            ('tweet_mode', tweet_mode)
+        ]
+        if value is not None
+    }
+
+    status_dicts: Optional[list[dict[str, Any]]] = (
+        cache.get(endpoint='statuses/user_timeline', key=params_key(params=params)) if cache is not None else None
     )
-    response.raise_for_status()
 
-    return tuple(Status.from_json(json_object=status_dict) for status_dict in response.json())
+    if status_dicts is None:
+        response = await http_client.get(url=urljoin(TWITTER_API_URL, 'statuses/user_timeline.json'), params=params)
+        response.raise_for_status()
+
+        with time_decode(http_client=http_client, endpoint='statuses/user_timeline'):
+            status_dicts = json_loads(response.content)
+
+        if cache is not None:
+            cache.set(endpoint='statuses/user_timeline', key=params_key(params=params), value=status_dicts)
+
+    decode = make_decoder(structure=Status, lazy_structure=LazyStatus, lazy=lazy, fields=fields)
+
+    with time_decode(http_client=http_client, endpoint='statuses/user_timeline'):
+        return tuple(decode(status_dict) for status_dict in status_dicts)
+
+
+async def iter_user_timeline_statuses(
+    http_client: HTTPXAsyncClient,
+    user_id: Optional[int] = None,
+    screen_name: Optional[str] = None,
+    since_id: Optional[int] = None,
+    max_id: Optional[int] = None,
+    count: Optional[int] = 200,
+    trim_user: Optional[bool] = None,
+    exclude_replies: Optional[bool] = None,
+    include_rts: Optional[bool] = None,
+    tweet_mode: Optional[str] = 'extended',
+    cache: Optional[ResponseCache] = None,
+    lazy: bool = False,
+    fields: Optional[Sequence[str]] = None,
+    checkpoint: Optional[PaginationCheckpoint] = None
+) -> AsyncIterator[tuple[Union[Status, LazyStatus, tuple], ...]]:
+    """
+    Retrieve statuses (i.e. tweets) of a user, one page at a time, walking backwards through the user's timeline.
+
+    After each page, `max_id` is set to just below the lowest status ID of the page, until a page is empty; the API
+    makes at most the 3,200 most recent statuses of a user available this way. Specifying `since_id` stops the walk
+    at the statuses that have already been seen.
+
+    https://developer.twitter.com/en/docs/twitter-api/v1/tweets/timelines/guides/working-with-timelines
+
+    :param http_client: The HTTP client with which to perform the requests.
+    :param user_id: The user id of the user whose statuses to retrieve.
+    :param screen_name: The screen name of the user whose statuses to retrieve.
+    :param since_id: The minimum non-inclusive id of the statuses to return.
+    :param max_id: The maximum id of the statuses to return.
+    :param count: The maximum number of statuses to retrieve per page.
+    :param trim_user: Whether to trim the user object included in the statuses.
+    :param exclude_replies: Whether to exclude replies.
+    :param include_rts: Whether to include retweets.
+    :param tweet_mode:
+    :param cache: A cache from which to serve pages if present and in which to store pages otherwise.
+    :param lazy: Whether to return lazily decoded views of the statuses, whose fields are decoded on first access.
+    :param fields: The fields of the statuses to return as named tuples; must include `id`. See
+        `user_timeline_statuses`.
+    :param checkpoint: A checkpoint from whose `max_id` to resume and in which to record each page once it has been
+        consumed. Pages retrieved before the resumption are not yielded again.
+    :return: An async iterator of pages of statuses, newest first.
+    """
+
+    if checkpoint is not None:
+        checkpoint.start(job=f'statuses/user_timeline:{user_key(user_id=user_id, screen_name=screen_name)}')
+        if checkpoint.is_complete:
+            return
+        if checkpoint.max_id is not None:
+            max_id = checkpoint.max_id
+
+    while True:
+        statuses: tuple[Union[Status, LazyStatus, tuple], ...] = await user_timeline_statuses(
+            http_client=http_client,
+            user_id=user_id,
+            screen_name=screen_name,
+            since_id=since_id,
+            count=count,
+            max_id=max_id,
+            trim_user=trim_user,
+            exclude_replies=exclude_replies,
+            include_rts=include_rts,
+            tweet_mode=tweet_mode,
+            cache=cache,
+            lazy=lazy,
+            fields=fields
+        )
+
+        if not statuses:
+            if checkpoint is not None:
+                checkpoint.record_max_id(max_id=None)
+            break
+
+        yield statuses
+
+        max_id = min(status.id for status in statuses) - 1
+
+        if checkpoint is not None:
+            checkpoint.record_max_id(max_id=max_id, newest_id=max(status.id for status in statuses))
 
 
 async def search_tweets(
@@ -446,7 +854,9 @@ async def search_tweets(
     until: Optional[str] = None,
     since_id: Optional[str] = None,
     max_id: Optional[str] = None,
-    include_entities: Optional[bool] = None
+    include_entities: Optional[bool] = None,
+    tweet_mode: Optional[str] = None,
+    lazy: bool = False
 ) -> SearchTweetsResponse:
     """
     Search Tweets.
@@ -464,6 +874,8 @@ async def search_tweets(
     :param since_id:
     :param max_id:
     :param include_entities:
+    :param tweet_mode:
+    :param lazy: Whether to return lazily decoded views of the statuses, whose fields are decoded on first access.
     :return:
     """
 
@@ -481,11 +893,107 @@ async def search_tweets(
                 ('until', until),
                 ('since_id', since_id),
                 ('max_id', max_id),
-                ('include_entities', 'true' if include_entities else None)
+                ('include_entities', 'true' if include_entities else None),
+                ('tweet_mode', tweet_mode)
             ]
             if value is not None
         }
     )
     response.raise_for_status()
 
-    return SearchTweetsResponse.from_json(json_object=response.json())
+    with time_decode(http_client=http_client, endpoint='search/tweets'):
+        json_object: dict[str, Any] = json_loads(response.content)
+
+        if lazy:
+            return SearchTweetsResponse(
+                statuses=[
+                    LazyStatus.from_json(json_object=status_object) for status_object in json_object['statuses']
+                ],
+                search_metadata=SearchMetadata.from_json(json_object=json_object['search_metadata'])
+            )
+
+        return SearchTweetsResponse.from_json(json_object=json_object)
+
+
+async def iter_search_tweets(
+    http_client: HTTPXAsyncClient,
+    q: str,
+    geocode: Optional[str] = None,
+    lang: Optional[str] = None,
+    locale: Optional[str] = None,
+    result_type: ... = None,
+    count: Optional[int] = 100,
+    until: Optional[str] = None,
+    since_id: Optional[str] = None,
+    max_id: Optional[str] = None,
+    include_entities: Optional[bool] = None,
+    tweet_mode: Optional[str] = 'extended',
+    max_num_statuses: Optional[int] = None,
+    seen_ids: Optional[CompactIdSet] = None,
+    lazy: bool = False
+) -> AsyncIterator[tuple[Union[Status, LazyStatus], ...]]:
+    """
+    Search Tweets, one page at a time, following the `next_results` of each page until the results are exhausted.
+
+    The `max_id` of the next page is taken from the `next_results` of the search metadata. Statuses whose IDs have
+    already been seen -- in an earlier page, or by another search sharing `seen_ids` -- are left out, and pages left
+    empty by that are not yielded.
+
+    https://developer.twitter.com/en/docs/twitter-api/v1/tweets/search/guides/standard-operators
+
+    :param http_client: The HTTP client with which to perform the requests.
+    :param q:
+    :param geocode:
+    :param lang:
+    :param locale:
+    :param result_type:
+    :param count: The maximum number of statuses to retrieve per page, up to 100.
+    :param until:
+    :param since_id:
+    :param max_id:
+    :param include_entities:
+    :param tweet_mode:
+    :param max_num_statuses: The maximum number of statuses to yield, after which no further pages are retrieved.
+    :param seen_ids: The IDs of the statuses seen, which are not yielded. It is updated with the statuses yielded.
+    :param lazy: Whether to yield lazily decoded views of the statuses, whose fields are decoded on first access.
+    :return: An async iterator of pages of statuses, newest first.
+    """
+
+    seen_ids = seen_ids if seen_ids is not None else CompactIdSet()
+    num_statuses = 0
+
+    while max_num_statuses is None or num_statuses < max_num_statuses:
+        search_tweets_response: SearchTweetsResponse = await search_tweets(
+            http_client=http_client,
+            q=q,
+            geocode=geocode,
+            lang=lang,
+            locale=locale,
+            result_type=result_type,
+            count=count,
+            until=until,
+            since_id=since_id,
+            max_id=max_id,
+            include_entities=include_entities,
+            tweet_mode=tweet_mode,
+            lazy=lazy
+        )
+
+        statuses: list[Union[Status, LazyStatus]] = []
+        for status in search_tweets_response.statuses:
+            if max_num_statuses is not None and num_statuses + len(statuses) >= max_num_statuses:
+                break
+            if status.id not in seen_ids:
+                seen_ids.add(status.id)
+                statuses.append(status)
+
+        num_statuses += len(statuses)
+
+        if statuses:
+            yield tuple(statuses)
+
+        next_results: Optional[str] = search_tweets_response.search_metadata.next_results
+        if not next_results or not search_tweets_response.statuses:
+            break
+
+        max_id = parse_qs(next_results.lstrip('?'))['max_id'][0]
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+from typing import Optional, Union, Iterable, Any
+from json import loads as json_loads, dumps as json_dumps
+from array import array
+from pathlib import Path
+
+from twitter_api.ids import ID_TYPECODE
+
+
+class PaginationCheckpoint:
+    """
+    A checkpoint of a paginated retrieval, with which a retrieval that was stopped part-way can be resumed.
+
+    For a cursored IDs endpoint, the checkpoint records the cursor of the next page and the IDs of the pages retrieved
+    so far; for a timeline, it records the `max_id` of the next page and the highest status ID retrieved. The state
+    is kept in a JSON file and the IDs in a file of signed 64-bit integers next to it. The IDs of a page are written
+    before the state is replaced atomically, so that the checkpoint is consistent at whichever point the retrieval is
+    stopped.
+
+    A checkpoint belongs to one retrieval -- an endpoint and a user -- which is recorded when the retrieval starts;
+    resuming it with another retrieval is an error.
+    """
+
+    def __init__(self, path: Union[Path, str], resume: bool = True):
+        """
+        :param path: The path of the JSON file of the state. It is created when the retrieval starts.
+        :param resume: Whether to resume from the state of an existing checkpoint, rather than to start anew.
+        """
+
+        self.path = Path(path)
+        self.ids_path = self.path.with_name(f'{self.path.name}.ids')
+
+        state: dict[str, Any] = {}
+        if resume:
+            try:
+                state = json_loads(self.path.read_text())
+            except FileNotFoundError:
+                pass
+
+        self.job: Optional[str] = state.get('job')
+        self.cursor: Optional[int] = state.get('cursor')
+        self.max_id: Optional[int] = state.get('max_id')
+        # The highest status ID of the pages of statuses retrieved so far.
+        self.newest_id: Optional[int] = state.get('newest_id')
+        self.num_ids: int = state.get('num_ids', 0)
+        self.num_pages: int = state.get('num_pages', 0)
+        self.is_complete: bool = state.get('is_complete', False)
+
+    def start(self, job: str) -> None:
+        """
+        Start or resume the retrieval of the checkpoint.
+
+        :param job: A key identifying the retrieval, e.g. the endpoint followed by the user key.
+        :return: None
+        """
+
+        if self.job is None:
+            self.job = job
+            self.ids_path.unlink(missing_ok=True)
+            self.save()
+        elif self.job != job:
+            raise ValueError(f'The checkpoint {str(self.path)!r} is of the retrieval {self.job!r}, not {job!r}.')
+
+    def load_ids(self) -> array:
+        """
+        Load the IDs of the pages retrieved so far.
+
+        :return: An array of the IDs, in the order in which they were retrieved.
+        """
+
+        ids = array(ID_TYPECODE)
+        try:
+            with self.ids_path.open(mode='rb') as ids_file:
+                # IDs written after the state was last saved do not belong to the checkpoint.
+                ids.frombytes(ids_file.read(self.num_ids * ids.itemsize))
+        except FileNotFoundError:
+            pass
+
+        return ids
+
+    def record_ids_page(self, ids: Iterable[Union[int, str]], next_cursor: int) -> None:
+        """
+        Record a page of IDs as retrieved.
+
+        :param ids: The IDs of the page.
+        :param next_cursor: The cursor of the next page; 0 if the page is the last one.
+        :return: None
+        """
+
+        page_ids = array(ID_TYPECODE, map(int, ids))
+
+        with self.ids_path.open(mode='ab') as ids_file:
+            ids_file.truncate(self.num_ids * page_ids.itemsize)
+            page_ids.tofile(ids_file)
+
+        self.num_ids += len(page_ids)
+        self.num_pages += 1
+        self.cursor = next_cursor
+        self.is_complete = next_cursor == 0
+        self.save()
+
+    def record_max_id(self, max_id: Optional[int], newest_id: Optional[int] = None) -> None:
+        """
+        Record a page of statuses as retrieved.
+
+        :param max_id: The `max_id` of the next page, or `None` if the page was the last one.
+        :param newest_id: The highest status ID of the page, if it has statuses.
+        :return: None
+        """
+
+        self.num_pages += 1
+        self.max_id = max_id
+        if newest_id is not None:
+            self.newest_id = max(newest_id, self.newest_id or newest_id)
+        self.is_complete = max_id is None
+        self.save()
+
+    def save(self) -> None:
+        """
+        Write the state to the file, replacing it atomically.
+
+        :return: None
+        """
+
+        temporary_path = self.path.with_name(f'{self.path.name}.tmp')
+        temporary_path.write_text(
+            json_dumps(
+                dict(
+                    job=self.job,
+                    cursor=self.cursor,
+                    max_id=self.max_id,
+                    newest_id=self.newest_id,
+                    num_ids=self.num_ids,
+                    num_pages=self.num_pages,
+                    is_complete=self.is_complete
+                )
+            )
+        )
+        temporary_path.replace(self.path)
+
+    def delete(self) -> None:
+        """
+        Delete the files of the checkpoint, e.g. once the retrieval has completed.
+
+        :return: None
+        """
+
+        self.path.unlink(missing_ok=True)
+        self.ids_path.unlink(missing_ok=True)
@@ -1,10 +1,26 @@
-from typing import Optional
+from typing import Optional, AsyncIterator, Iterator, NamedTuple, Sequence, Iterable, Union
+from asyncio import Queue, create_task
+from contextlib import aclosing
 from json import dumps as json_dumps
 from dataclasses import asdict
 from enum import Enum
 
-from httpx import AsyncClient as HTTPXAsyncClient
-from twitter_api.calls import get_friend_ids, get_follower_ids, lookup_users, show_user, create_friendship, search_tweets, user_timeline_statuses
+from httpx import AsyncClient as HTTPXAsyncClient, HTTPError, HTTPStatusError
+from twitter_api.calls import (
+    iter_friend_ids, iter_follower_ids, show_user, create_friendship, user_timeline_statuses,
+    iter_user_timeline_statuses
+)
+from twitter_api.pipeline import iter_hydrated_users, iter_search_results, iter_queue_until_done
+from twitter_api.cache import ResponseCache
+from twitter_api.timeline_sync import SinceIdStore, sync_user_timeline, iter_watchlist_statuses
+from twitter_api.snapshots import SnapshotStore, IdsDiff, diff_ids
+from twitter_api.projection import make_projection
+from twitter_api.structures import Status, User
+from twitter_api.checkpoint import PaginationCheckpoint
+from twitter_api.export import OutputFormat, USER_COLUMNS, STATUS_COLUMNS
+from twitter_api.stats import StatsFormat
+from twitter_api.batching import UserLoader, UserNotFoundError
+from twitter_api.bulk_follow import DAILY_FOLLOW_LIMIT, DEFAULT_FOLLOW_INTERVAL
 from pyutils.argparse.typed_argument_parser import TypedArgumentParser
 
 
@@ -14,6 +30,48 @@ class TwitterApiAction(Enum):
     FOLLOWING = 'following'
     FOLLOW = 'follow'
     TIMELINE = 'timeline'
+    FOLLOWER_DIFF = 'follower-diff'
+    SEARCH = 'search'
+    TIMELINES = 'timelines'
+    SERVE = 'serve'
+
+
+# The columns of the records of the changes reported by the follower diff action.
+FOLLOWER_CHANGE_COLUMNS: dict[str, str] = {
+    'change': 'string',
+    'id': 'int64',
+    'screen_name': 'string'
+}
+
+# The columns of the records output by the actions that support other output formats than text.
+ACTION_COLUMNS: dict[str, dict[str, str]] = {
+    TwitterApiAction.USER.value: USER_COLUMNS,
+    TwitterApiAction.FOLLOWERS.value: USER_COLUMNS,
+    TwitterApiAction.FOLLOWING.value: USER_COLUMNS,
+    TwitterApiAction.TIMELINE.value: STATUS_COLUMNS,
+    TwitterApiAction.FOLLOWER_DIFF.value: FOLLOWER_CHANGE_COLUMNS,
+    TwitterApiAction.SEARCH.value: STATUS_COLUMNS,
+    TwitterApiAction.TIMELINES.value: STATUS_COLUMNS
+}
+
+# The actions that are performed on one user, and that can therefore be performed on each user of a targets file.
+TARGETED_ACTIONS: frozenset[str] = frozenset({
+    TwitterApiAction.USER.value,
+    TwitterApiAction.FOLLOWERS.value,
+    TwitterApiAction.FOLLOWING.value,
+    TwitterApiAction.FOLLOW.value,
+    TwitterApiAction.TIMELINE.value,
+    TwitterApiAction.FOLLOWER_DIFF.value
+})
+
+# The column prepended to the records of an action performed on the users of a targets file.
+TARGET_COLUMNS: dict[str, str] = {'target': 'string'}
+
+
+class FollowerChange(NamedTuple):
+    change: str
+    id: int
+    screen_name: Optional[str]
 
 
 class TwitterApiArgumentParser(TypedArgumentParser):
@@ -22,9 +80,31 @@ class TwitterApiArgumentParser(TypedArgumentParser):
         consumer_key: str
         consumer_secret: str
         action: str
-        access_tokens_path: Optional[str]
+        access_tokens_path: Optional[list[str]]
         user_id: Optional[str]
         screen_name: Optional[str]
+        targets_file: Optional[str]
+        max_target_concurrency: int
+        max_concurrency: int
+        cache_path: Optional[str]
+        full_history: bool
+        since_id_path: Optional[str]
+        snapshots_dir: Optional[str]
+        output_format: str
+        output_path: Optional[str]
+        query: Optional[list[str]]
+        user_list_path: Optional[str]
+        max_results: Optional[int]
+        checkpoint_path: Optional[str]
+        resume: bool
+        stats: bool
+        stats_format: str
+        socket_path: Optional[str]
+        port: Optional[int]
+        api_base_url: Optional[str]
+        follow_log_path: Optional[str]
+        follow_interval: float
+        max_follows: Optional[int]
 
     def __init__(self, *args, **kwargs):
         super().__init__(
@@ -53,7 +133,7 @@ class TwitterApiArgumentParser(TypedArgumentParser):
             choices=[member.value for member in TwitterApiAction]
         )
 
-        user_group = self.add_mutually_exclusive_group(required=True)
+        user_group = self.add_mutually_exclusive_group()
         user_group.add_argument(
             '--user-id',
             help='An user ID of an user to examine.'
@@ -62,56 +142,287 @@ class TwitterApiArgumentParser(TypedArgumentParser):
             '--screen-name',
             help='A screen name of a user to examine.'
         )
+        user_group.add_argument(
+            '--targets-file',
+            help=(
+                'The path of a file listing users to examine, one user ID or screen name per line, or `-` to read '
+                'them from standard input. The action is performed on every user concurrently with one client, and '
+                'each result is labelled with its user.'
+            )
+        )
+
+        self.add_argument(
+            '--max-target-concurrency',
+            help='The maximum number of users of the targets file on which to perform the action at the same time.',
+            type=int,
+            default=10
+        )
+
+        self.add_argument(
+            '--user-list-path',
+            help=(
+                'The path of a file listing users, one user ID or screen name per line, whose timelines to retrieve '
+                'concurrently and merge.'
+            )
+        )
+
+        self.add_argument(
+            '--query',
+            help='A query with which to search for statuses. Several queries are searched concurrently.',
+            nargs='+'
+        )
+
+        self.add_argument(
+            '--max-results',
+            help='The maximum number of statuses to retrieve per search query.',
+            type=int
+        )
 
         self.add_argument(
             '--access-tokens-path',
-            help='The path of a file storing access tokens.',
+            help=(
+                'The path of a file storing access tokens. If several paths or a directory of files are provided, '
+                'requests are spread over the access tokens according to their remaining rate limit budgets.'
+            ),
+            nargs='+'
+        )
+
+        self.add_argument(
+            '--max-concurrency',
+            help='The maximum number of lookup, timeline or search requests to have in flight at the same time.',
+            type=int,
+            default=10
+        )
+
+        self.add_argument(
+            '--cache-path',
+            help='The path of an SQLite database in which to cache responses, to be reused by later invocations.'
+        )
+
+        self.add_argument(
+            '--full-history',
+            help='Retrieve as much of the timeline as is available rather than only the most recent page.',
+            action='store_true'
+        )
+
+        self.add_argument(
+            '--since-id-path',
+            help=(
+                'The path of a file recording the highest status ID seen per user, with which only statuses newer '
+                'than the ones retrieved by an earlier invocation are retrieved.'
+            )
         )
 
+        self.add_argument(
+            '--snapshots-dir',
+            help='The path of a directory storing the follower ID snapshots with which to diff.',
+            default='snapshots'
+        )
+
+        self.add_argument(
+            '--output-format',
+            help=(
+                'The format in which to output the results of the action. Other formats than text write one record '
+                'per user, status or follower change; NDJSON records are written as soon as they are retrieved, and '
+                'Parquet requires pyarrow.'
+            ),
+            choices=[member.value for member in OutputFormat],
+            default=OutputFormat.TEXT.value
+        )
 
-async def twitter_api(
+        self.add_argument(
+            '--output-path',
+            help=(
+                'The path of a file to which to write the records of other output formats than text, rather than '
+                'standard output. With --resume, the records are appended to it.'
+            )
+        )
+
+        self.add_argument(
+            '--checkpoint-path',
+            help=(
+                'The path of a file in which to record the progress of the retrieval of IDs or of the timeline, '
+                'with which a stopped invocation can be resumed. It is deleted once the action has completed.'
+            )
+        )
+
+        self.add_argument(
+            '--resume',
+            help='Resume the retrieval from the checkpoint file rather than starting anew.',
+            action='store_true'
+        )
+
+        self.add_argument(
+            '--stats',
+            help=(
+                'Print statistics of the requests per endpoint to standard error at the end: request counts, '
+                'latency percentiles, response bytes, decoding time, retries and rate limit waits.'
+            ),
+            action='store_true'
+        )
+
+        self.add_argument(
+            '--stats-format',
+            help='The format in which to print the statistics.',
+            choices=[member.value for member in StatsFormat],
+            default=StatsFormat.SUMMARY.value
+        )
+
+        self.add_argument(
+            '--socket-path',
+            help=(
+                'The path of the Unix socket on which the serve action listens for action requests, keeping the '
+                'client, its connections and the cache warm between them; see `twitter_api_client.py`.'
+            )
+        )
+
+        self.add_argument(
+            '--port',
+            help='The port of the loopback interface on which the serve action listens, if no socket path is provided.',
+            type=int
+        )
+
+        self.add_argument(
+            '--follow-log-path',
+            help=(
+                'The path of a file recording the users of the targets file that the follow action has processed, '
+                'with which a repeated invocation skips them.'
+            )
+        )
+
+        self.add_argument(
+            '--follow-interval',
+            help=(
+                'The minimum number of seconds between the follow requests of the follow action with a targets file, '
+                f'to stay within the daily follow limit. Defaults to {DEFAULT_FOLLOW_INTERVAL:g}, which spreads the '
+                f'limit of {DAILY_FOLLOW_LIMIT} follows over a day.'
+            ),
+            type=float,
+            default=DEFAULT_FOLLOW_INTERVAL
+        )
+
+        self.add_argument(
+            '--max-follows',
+            help='The maximum number of follow requests that the follow action with a targets file sends.',
+            type=int
+        )
+
+        self.add_argument(
+            '--api-base-url',
+            help='An origin to which to send the requests instead of the API, e.g. a local fake API server.'
+        )
+
+
+def _iter_follower_changes(ids_diff: IdsDiff) -> Iterator[FollowerChange]:
+    for change, ids, users in [
+        ('+', ids_diff.added_ids, ids_diff.added_users),
+        ('-', ids_diff.removed_ids, ids_diff.removed_users)
+    ]:
+        for user in users:
+            yield FollowerChange(change=change, id=user.id, screen_name=user.screen_name)
+
+        # Users that could not be looked up, e.g. because they have been suspended, are reported by ID.
+        looked_up_ids: set[int] = {user.id for user in users}
+        for id_ in ids:
+            if id_ not in looked_up_ids:
+                yield FollowerChange(change=change, id=id_, screen_name=None)
+
+
+# The fields of the statuses printed by the actions in the text output format, and the ID, with which the timelines
+# are paginated, the since IDs are stored and the search results are deduplicated.
+_TEXT_STATUS_FIELDS: tuple[str, ...] = ('id', 'created_at', 'user.screen_name', 'full_text')
+
+# The fields of the users and statuses of the actions in the text output format; the user action prints the complete
+# user.
+_TEXT_ACTION_FIELDS: dict[str, Optional[tuple[str, ...]]] = {
+    TwitterApiAction.USER.value: None,
+    TwitterApiAction.FOLLOWERS.value: ('screen_name',),
+    TwitterApiAction.FOLLOWING.value: ('screen_name',),
+    TwitterApiAction.TIMELINE.value: _TEXT_STATUS_FIELDS,
+    TwitterApiAction.SEARCH.value: _TEXT_STATUS_FIELDS,
+    TwitterApiAction.TIMELINES.value: _TEXT_STATUS_FIELDS
+}
+
+
+def _format_status(status: tuple) -> str:
+    return f'{status.created_at} - {status.user_screen_name} - {status.full_text}'
+
+
+async def iter_action_results(
     http_client: HTTPXAsyncClient,
     action: str,
-    user_id: Optional[str],
-    screen_name: Optional[str]
-) -> Optional[str]:
+    user_id: Optional[str] = None,
+    screen_name: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
+    max_concurrency: int = 10,
+    cache: Optional[ResponseCache] = None,
+    full_history: bool = False,
+    since_id_store: Optional[SinceIdStore] = None,
+    snapshot_store: Optional[SnapshotStore] = None,
+    checkpoint: Optional[PaginationCheckpoint] = None,
+    queries: Optional[Sequence[str]] = None,
+    max_results: Optional[int] = None,
+    user_list: Optional[tuple[Sequence[int], Sequence[str]]] = None,
+    user_loader: Optional[UserLoader] = None
+) -> AsyncIterator[Union[User, tuple]]:
+    """
+    Perform an action and yield its users, statuses or follower changes.
+
+    The users and statuses are projected onto `fields` straight from the JSON objects of the responses, and are
+    yielded as soon as their response has been received rather than once the action is complete.
+
+    :param http_client: The HTTP client with which to perform the requests.
+    :param action: The action to perform.
+    :param user_id: The user ID of the user to examine.
+    :param screen_name: The screen name of the user to examine.
+    :param fields: The fields onto which to project the users and statuses. Without them, the user action yields the
+        complete user; the other actions producing users or statuses require them.
+    :param max_concurrency: The maximum number of user lookup requests to have in flight at the same time.
+    :param cache: A cache from which to serve responses if present and in which to store responses otherwise.
+    :param full_history: Whether to retrieve as much of the timeline as is available.
+    :param since_id_store: A store of the highest status IDs seen, with which to retrieve only new statuses.
+    :param snapshot_store: The store of the follower ID snapshots with which to diff.
+    :param checkpoint: A checkpoint from which to resume the retrieval of IDs or of the timeline.
+    :param queries: The queries with which to search for statuses.
+    :param max_results: The maximum number of statuses to retrieve per search query.
+    :param user_list: The user IDs and screen names of the users whose timelines to retrieve.
+    :param user_loader: A loader with which to look up the user of the user action, with `fields` as its fields.
+    :return: An async iterator of users, statuses or follower changes.
+    """
+
+    fields = tuple(fields) if fields is not None else None
+
     if action == 'user':
-        return json_dumps(
-            asdict(
-                await show_user(
-                    http_client=http_client,
-                    user_id=user_id,
-                    screen_name=screen_name
-                )
-            ),
-            indent=4
-        )
-    elif action == 'followers':
-        return '\n'.join(
-            user.screen_name
-            for user in await lookup_users(
+        yield (
+            await user_loader.load(user_id=user_id, screen_name=screen_name) if user_loader is not None
+            else await show_user(
                 http_client=http_client,
-                user_ids=await get_follower_ids(
-                    http_client=http_client,
-                    user_id=user_id,
-                    screen_name=screen_name,
-                    follow_cursor=True
-                )
+                user_id=user_id,
+                screen_name=screen_name,
+                cache=cache,
+                fields=fields
             )
         )
-    elif action == 'following':
-        return '\n'.join(
-            user.screen_name
-            for user in await lookup_users(
+    elif action in {'followers', 'following'}:
+        async with aclosing(
+            iter_hydrated_users(
                 http_client=http_client,
-                user_ids=await get_friend_ids(
+                id_pages=(iter_follower_ids if action == 'followers' else iter_friend_ids)(
                     http_client=http_client,
                     user_id=user_id,
                     screen_name=screen_name,
-                    follow_cursor=True
-                )
+                    cache=cache,
+                    checkpoint=checkpoint,
+                    record_pages=False
+                ),
+                max_concurrency=max_concurrency,
+                cache=cache,
+                fields=fields,
+                checkpoint=checkpoint
             )
-        )
+        ) as users:
+            async for user in users:
+                yield user
     elif action == 'follow':
         await create_friendship(
             http_client=http_client,
@@ -119,13 +430,245 @@ async def twitter_api(
             screen_name=screen_name
         )
     elif action == 'timeline':
-        return '\n'.join(
-            f'{entry.created_at} - {entry.user.screen_name} - {entry.full_text}'
-            for entry in reversed(
-                await user_timeline_statuses(
+        if since_id_store is not None:
+            for status in await sync_user_timeline(
+                http_client=http_client,
+                since_id_store=since_id_store,
+                user_id=user_id,
+                screen_name=screen_name,
+                cache=cache,
+                checkpoint=checkpoint,
+                fields=fields
+            ):
+                yield status
+        elif full_history:
+            async with aclosing(
+                iter_user_timeline_statuses(
                     http_client=http_client,
                     user_id=user_id,
-                    screen_name=screen_name
+                    screen_name=screen_name,
+                    cache=cache,
+                    checkpoint=checkpoint,
+                    fields=fields
                 )
+            ) as pages:
+                async for page in pages:
+                    for status in page:
+                        yield status
+        else:
+            for status in await user_timeline_statuses(
+                http_client=http_client,
+                user_id=user_id,
+                screen_name=screen_name,
+                cache=cache,
+                fields=fields
+            ):
+                yield status
+    elif action == 'follower-diff':
+        for change in _iter_follower_changes(
+            ids_diff=await diff_ids(
+                http_client=http_client,
+                snapshot_store=snapshot_store,
+                user_id=user_id,
+                screen_name=screen_name,
+                max_concurrency=max_concurrency,
+                cache=cache,
+                checkpoint=checkpoint
+            )
+        ):
+            yield change
+    elif action == 'search':
+        project = make_projection(structure=Status, fields=fields)
+        async with aclosing(
+            iter_search_results(
+                http_client=http_client,
+                queries=queries,
+                max_num_statuses=max_results,
+                lazy=True
+            )
+        ) as search_results:
+            async for _, status in search_results:
+                yield project(status.json_object)
+    elif action == 'timelines':
+        project = make_projection(structure=Status, fields=fields)
+        async with aclosing(
+            iter_watchlist_statuses(
+                http_client=http_client,
+                user_ids=user_list[0],
+                screen_names=user_list[1],
+                since_id_store=since_id_store,
+                max_concurrency=max_concurrency,
+                cache=cache,
+                lazy=True
             )
+        ) as statuses:
+            async for status in statuses:
+                yield project(status.json_object)
+    else:
+        raise ValueError(f'Unsupported action: {action!r}')
+
+
+async def twitter_api(http_client: HTTPXAsyncClient, action: str, **kwargs) -> AsyncIterator[str]:
+    """
+    Perform an action and yield its output in the text output format, one line at a time.
+
+    :param http_client: The HTTP client with which to perform the requests.
+    :param action: The action to perform.
+    :param kwargs: Keyword arguments to pass to `iter_action_results`.
+    :return: An async iterator of lines of output.
+    """
+
+    async with aclosing(
+        iter_action_results(
+            http_client=http_client,
+            action=action,
+            fields=_TEXT_ACTION_FIELDS.get(action),
+            **kwargs
+        )
+    ) as results:
+        if action == 'user':
+            async for user in results:
+                yield json_dumps(asdict(user), indent=4)
+        elif action in {'followers', 'following'}:
+            async for user in results:
+                yield user.screen_name
+        elif action == 'timeline':
+            # The timeline is printed oldest first.
+            for status in reversed([status async for status in results]):
+                yield _format_status(status=status)
+        elif action == 'follower-diff':
+            async for change in results:
+                yield f'{change.change}{change.screen_name or change.id}'
+        elif action in {'search', 'timelines'}:
+            async for status in results:
+                yield _format_status(status=status)
+        else:
+            # The follow action has no output.
+            async for _ in results:
+                pass
+
+
+async def twitter_api_records(http_client: HTTPXAsyncClient, action: str, **kwargs) -> AsyncIterator[tuple]:
+    """
+    Perform an action and yield its users, statuses or follower changes as records with the columns in
+    `ACTION_COLUMNS`.
+
+    :param http_client: The HTTP client with which to perform the requests.
+    :param action: The action to perform; one of the keys of `ACTION_COLUMNS`.
+    :param kwargs: Keyword arguments to pass to `iter_action_results`; a user loader must have the columns as its
+        fields.
+    :return: An async iterator of records.
+    """
+
+    if action not in ACTION_COLUMNS:
+        raise ValueError(f'The action {action!r} does not produce records.')
+
+    async with aclosing(
+        iter_action_results(
+            http_client=http_client,
+            action=action,
+            fields=tuple(ACTION_COLUMNS[action]),
+            **kwargs
+        )
+    ) as records:
+        async for record in records:
+            yield record
+
+
+async def iter_target_results(
+    http_client: HTTPXAsyncClient,
+    action: str,
+    targets: Iterable[tuple[Optional[str], Optional[str]]],
+    records: bool = False,
+    max_target_concurrency: int = 10,
+    target_errors: Optional[list[tuple[str, Union[HTTPError, UserNotFoundError]]]] = None,
+    **kwargs
+) -> AsyncIterator[tuple[str, Union[str, tuple]]]:
+    """
+    Perform an action on each of several users concurrently, yielding the results of each user as they are produced.
+
+    Each user is taken by one of `max_target_concurrency` workers, which performs the action with `twitter_api` or
+    `twitter_api_records`. All of them share the HTTP client -- and so its connections and, with a
+    `RateLimitedAsyncClient`, its rate limit budgets -- and the results of the different users are interleaved. The
+    lookups of the user action are coalesced by a `UserLoader`, so that the users being worked on at the same time
+    are looked up with one request.
+
+    :param http_client: The HTTP client with which to perform the requests.
+    :param action: The action to perform; one of `TARGETED_ACTIONS`.
+    :param targets: Pairs of a user ID and a screen name, one of which is `None`, of the users on which to perform
+        the action.
+    :param records: Whether to yield records, as `twitter_api_records` does, rather than text.
+    :param max_target_concurrency: The maximum number of users on which to perform the action at the same time.
+    :param target_errors: A list to which to append the errors of the users on which the action failed -- error
+        responses, failed connections, or users that could not be looked up -- as pairs of a user ID or screen name
+        and an error, so that the action is still performed on the other users. Without it, an error stops the
+        action.
+    :param kwargs: Keyword arguments to pass to `twitter_api` or `twitter_api_records`.
+    :return: An async iterator of pairs of a user ID or screen name and a result of the action.
+    """
+
+    if action not in TARGETED_ACTIONS:
+        raise ValueError(f'The action {action!r} cannot be performed on a list of users.')
+
+    target_queue: Queue[Optional[tuple[Optional[str], Optional[str]]]] = Queue()
+    for target in targets:
+        target_queue.put_nowait(target)
+    for _ in range(max_target_concurrency):
+        target_queue.put_nowait(None)
+
+    result_queue: Queue[tuple[str, Union[str, tuple]]] = Queue(maxsize=max_target_concurrency)
+
+    if action == TwitterApiAction.USER.value:
+        kwargs['user_loader'] = UserLoader(
+            http_client=http_client,
+            cache=kwargs.get('cache'),
+            fields=tuple(ACTION_COLUMNS[action]) if records else None
         )
+
+    async def work() -> None:
+        while (target := target_queue.get_nowait()) is not None:
+            user_id, screen_name = target
+            target_name: str = user_id if user_id is not None else screen_name
+            try:
+                async with aclosing(
+                    (twitter_api_records if records else twitter_api)(
+                        http_client=http_client,
+                        action=action,
+                        user_id=user_id,
+                        screen_name=screen_name,
+                        **kwargs
+                    )
+                ) as results:
+                    async for result in results:
+                        await result_queue.put((target_name, result))
+            except (HTTPError, UserNotFoundError) as e:
+                if target_errors is None:
+                    raise
+                target_errors.append((target_name, e))
+
+    tasks = [create_task(work()) for _ in range(max_target_concurrency)]
+
+    async with aclosing(iter_queue_until_done(queue=result_queue, tasks=tasks)) as results:
+        async for target_result in results:
+            yield target_result
+
+
+def format_target_error(e: Union[HTTPError, UserNotFoundError]) -> str:
+    """
+    Format an error recorded by `iter_target_results` on one line, without the URL of the request.
+
+    :param e: The error.
+    :return: The status of an error response and the messages of its error payload, or the message of another error.
+    """
+
+    if isinstance(e, HTTPStatusError):
+        try:
+            messages: list[str] = [
+                f'{error["message"]} (code {error["code"]})' for error in e.response.json()['errors']
+            ]
+        except (ValueError, KeyError, TypeError):
+            messages = []
+        return f'{e.response.status_code} {e.response.reason_phrase}' + (f': {"; ".join(messages)}' if messages else '')
+    if isinstance(e, HTTPError):
+        return f'{e.__class__.__name__}: {e}'.replace('\n', ' ')
+    return str(e)
@@ -0,0 +1,113 @@
+from typing import Optional
+
+from httpx import Auth, Limits, Timeout, URL, Request, Response, AsyncBaseTransport, AsyncHTTPTransport
+
+from twitter_api.rate_limit import RateLimitedAsyncClient, RateLimitScheduler
+from twitter_api.token_pool import TokenPool
+from twitter_api.stats import RequestStats
+
+try:
+    import h2
+except ImportError:
+    h2 = None
+
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+DEFAULT_KEEPALIVE_EXPIRY = 60.0
+DEFAULT_CONNECT_TIMEOUT = 10.0
+DEFAULT_READ_TIMEOUT = 60.0
+DEFAULT_WRITE_TIMEOUT = 10.0
+
+
+class BaseUrlTransport(AsyncBaseTransport):
+    """
+    A transport sending requests to another origin than the one of their URLs, e.g. to a local fake API server.
+
+    Only the scheme, host and port of the requests are replaced, after the requests have been signed, so that the
+    requests are otherwise identical to the ones sent to the API.
+    """
+
+    def __init__(self, base_url: str, transport: AsyncBaseTransport):
+        """
+        :param base_url: The origin to which to send the requests, e.g. `http://127.0.0.1:8080`.
+        :param transport: The transport with which to send the requests.
+        """
+
+        self.base_url = URL(base_url)
+        self.transport = transport
+
+    async def handle_async_request(self, request: Request) -> Response:
+        request.url = request.url.copy_with(
+            scheme=self.base_url.scheme,
+            host=self.base_url.host,
+            port=self.base_url.port
+        )
+        return await self.transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def make_http_client(
+    auth: Optional[Auth] = None,
+    token_pool: Optional[TokenPool] = None,
+    rate_limit_scheduler: Optional[RateLimitScheduler] = None,
+    request_stats: Optional[RequestStats] = None,
+    max_connections: int = DEFAULT_MAX_CONNECTIONS,
+    max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+    http2: Optional[bool] = None,
+    connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+    read_timeout: float = DEFAULT_READ_TIMEOUT,
+    write_timeout: float = DEFAULT_WRITE_TIMEOUT,
+    pool_timeout: Optional[float] = None,
+    api_base_url: Optional[str] = None
+) -> RateLimitedAsyncClient:
+    """
+    Make an HTTP client tuned for many concurrent requests to the API.
+
+    The defaults of `httpx.AsyncClient` time out requests waiting for a connection after five seconds, so that with
+    more concurrent requests than connections, requests fail with `PoolTimeout`. Here, that wait is not timed out, as
+    the callers' own concurrency limits bound it; `max_connections` should still be at least the number of concurrent
+    requests, so that no request waits. Only a few idle connections are kept alive, however, as the connection pool's
+    bookkeeping grows with the product of the number of waiting requests and the number of idle connections: keeping
+    100 connections alive is several times slower than reopening all but 20 of them. If the `h2` package is
+    installed, HTTP/2 is used, multiplexing the concurrent requests over a single connection.
+
+    :param auth: The auth with which to sign the requests.
+    :param token_pool: A pool of access tokens with which to sign the requests, instead of `auth`.
+    :param rate_limit_scheduler: The scheduler through which to send the requests.
+    :param request_stats: A statistics collector in which to record the requests.
+    :param max_connections: The maximum number of connections to have open at the same time.
+    :param max_keepalive_connections: The maximum number of idle connections to keep alive.
+    :param keepalive_expiry: The number of seconds after which to close an idle connection.
+    :param http2: Whether to use HTTP/2, which requires the `h2` package (`pip install httpx[http2]`). Defaults to
+        whether `h2` is installed.
+    :param connect_timeout: The number of seconds to wait for a connection to be established.
+    :param read_timeout: The number of seconds to wait for a chunk of a response.
+    :param write_timeout: The number of seconds to wait for a chunk of a request to be sent.
+    :param pool_timeout: The number of seconds to wait for a connection from the pool; `None` to wait indefinitely.
+    :param api_base_url: An origin to which to send the requests instead of the API, e.g. a local fake API server.
+    :return: The HTTP client.
+    """
+
+    limits = Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections,
+        keepalive_expiry=keepalive_expiry
+    )
+    http2 = http2 if http2 is not None else h2 is not None
+
+    return RateLimitedAsyncClient(
+        auth=auth,
+        token_pool=token_pool,
+        rate_limit_scheduler=rate_limit_scheduler,
+        request_stats=request_stats,
+        limits=limits,
+        http2=http2,
+        timeout=Timeout(connect=connect_timeout, read=read_timeout, write=write_timeout, pool=pool_timeout),
+        transport=(
+            BaseUrlTransport(base_url=api_base_url, transport=AsyncHTTPTransport(limits=limits, http2=http2))
+            if api_base_url is not None else None
+        )
+    )
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+from typing import Optional, Union, Callable, Iterable, Sequence, TextIO
+from asyncio import PriorityQueue, create_task, gather as asyncio_gather, wait as asyncio_wait, FIRST_COMPLETED
+from dataclasses import dataclass
+from itertools import count as itertools_count
+from pathlib import Path
+
+from httpx import AsyncClient as HTTPXAsyncClient, HTTPStatusError
+
+from twitter_api.calls import iter_friend_ids, iter_follower_ids, lookup_users, UNAVAILABLE_ACCOUNT_STATUS_CODES
+from twitter_api.cache import ResponseCache
+from twitter_api.ids import CompactIdSet
+from twitter_api.lazy import LazyUser
+
+# The number of discovered accounts to look up at a time before they are put on the frontier.
+FRONTIER_LOOKUP_SIZE = 1000
+
+
+@dataclass
+class CrawlStats:
+    # The number of accounts whose relations were retrieved.
+    num_expanded: int = 0
+    # The number of accounts whose relations could not be retrieved, or that could not be looked up.
+    num_skipped: int = 0
+    # The number of accounts first seen in the relations of an expanded account.
+    num_discovered: int = 0
+    num_edges: int = 0
+
+
+class EdgeListWriter:
+    """
+    A persistent edge list of the follow relations found by a crawl.
+
+    The edge list is a text file with one edge per line: the ID of the following account and the ID of the followed
+    account, separated by a space. Edges are appended, so that the edges of a crawl that was stopped are kept.
+    """
+
+    def __init__(self, path: Union[Path, str]):
+        """
+        :param path: The path of the edge list file. It is created if it does not exist.
+        """
+
+        self.path = Path(path)
+        self.file: TextIO = self.path.open(mode='a')
+
+    def __enter__(self) -> EdgeListWriter:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def write_edges(self, edges: Sequence[tuple[int, int]]) -> int:
+        """
+        Append edges to the edge list.
+
+        :param edges: The edges, as pairs of the ID of the following account and the ID of the followed account.
+        :return: The number of edges written.
+        """
+
+        self.file.write(''.join(f'{source_id} {target_id}\n' for source_id, target_id in edges))
+        self.file.flush()
+        return len(edges)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+async def crawl_social_graph(
+    http_client: HTTPXAsyncClient,
+    edge_list_writer: EdgeListWriter,
+    seed_user_ids: Optional[Iterable[int]] = None,
+    seed_screen_names: Optional[Iterable[str]] = None,
+    max_depth: int = 1,
+    relations: Sequence[str] = ('friends', 'followers'),
+    max_concurrency: int = 10,
+    max_ids_per_account: Optional[int] = None,
+    priority: Optional[Callable[[LazyUser], float]] = None,
+    visited: Optional[CompactIdSet] = None,
+    cache: Optional[ResponseCache] = None
+) -> CrawlStats:
+    """
+    Crawl the follow graph outwards from seed accounts, writing the follow relations found to an edge list.
+
+    Accounts are taken from a frontier by `max_concurrency` workers, which retrieve their friend and follower IDs
+    with `iter_friend_ids` and `iter_follower_ids`. Each ID not seen before is added to the visited set, so that every
+    account is put on the frontier at most once, and the accounts to be expanded in turn are looked up with
+    `lookup_users` first, skipping protected accounts that cannot be expanded. Without `priority`, the frontier is
+    expanded breadth-first; with it, the account with the lowest priority value is expanded first.
+
+    With a `RateLimitedAsyncClient`, the requests of the workers wait for the rate limit budgets of their endpoints,
+    so the concurrency limit bounds the number of requests in flight while the budgets bound the request rate.
+
+    :param http_client: The HTTP client with which to perform the requests.
+    :param edge_list_writer: The edge list to which to append the follow relations found.
+    :param seed_user_ids: The user IDs of the accounts from which to start.
+    :param seed_screen_names: The screen names of the accounts from which to start.
+    :param max_depth: The number of hops from the seed accounts to crawl; 1 expands the seed accounts only.
+    :param relations: The relations to follow: `friends`, `followers`, or both.
+    :param max_concurrency: The maximum number of accounts to expand at the same time.
+    :param max_ids_per_account: The maximum number of IDs to retrieve per account and relation, which bounds the cost
+        of expanding accounts with very many followers.
+    :param priority: A function of a looked-up account giving its priority on the frontier.
+    :param visited: The set of the IDs of the accounts seen, e.g. by an earlier crawl. Accounts in it are not put on
+        the frontier again. It is updated during the crawl.
+    :param cache: A cache from which to serve responses if present and in which to store responses otherwise.
+    :return: Statistics of the crawl.
+    """
+
+    for relation in relations:
+        if relation not in {'friends', 'followers'}:
+            raise ValueError(f'Unsupported relation: {relation}')
+
+    visited = visited if visited is not None else CompactIdSet()
+    stats = CrawlStats()
+
+    # Entries are ordered by priority, then by the order in which they were put on the frontier.
+    frontier: PriorityQueue[tuple[float, int, int, int]] = PriorityQueue()
+    sequence_numbers = itertools_count()
+
+    async def enqueue(users: Iterable[LazyUser], depth: int) -> None:
+        for user in users:
+            # Protected accounts followed by the authenticated user can still be expanded.
+            if user.protected and not user.following:
+                continue
+
+            await frontier.put(
+                (priority(user) if priority is not None else depth, next(sequence_numbers), depth, user.id)
+            )
+
+    async def enqueue_ids(ids: list[int], depth: int) -> None:
+        for index in range(0, len(ids), FRONTIER_LOOKUP_SIZE):
+            chunk_ids: list[int] = ids[index:index+FRONTIER_LOOKUP_SIZE]
+            users: tuple[LazyUser, ...] = await lookup_users(
+                http_client=http_client,
+                user_ids=chunk_ids,
+                cache=cache,
+                lazy=True
+            )
+            # Accounts that could not be looked up, e.g. suspended or deleted ones, cannot be expanded.
+            stats.num_skipped += len(chunk_ids) - len(users)
+            await enqueue(users=users, depth=depth)
+
+    async def expand(user_id: int, depth: int) -> None:
+        new_ids: list[int] = []
+        skipped = False
+
+        for relation in relations:
+            num_ids = 0
+            try:
+                async for ids_result in (iter_friend_ids if relation == 'friends' else iter_follower_ids)(
+                    http_client=http_client,
+                    user_id=user_id,
+                    cache=cache
+                ):
+                    ids: list[int] = ids_result.ids
+                    if max_ids_per_account is not None:
+                        ids = ids[:max_ids_per_account - num_ids]
+                    num_ids += len(ids)
+
+                    stats.num_edges += edge_list_writer.write_edges(
+                        edges=(
+                            [(user_id, id_) for id_ in ids] if relation == 'friends'
+                            else [(id_, user_id) for id_ in ids]
+                        )
+                    )
+
+                    for id_ in ids:
+                        if id_ not in visited:
+                            visited.add(id_)
+                            new_ids.append(id_)
+
+                    if max_ids_per_account is not None and num_ids >= max_ids_per_account:
+                        break
+            except HTTPStatusError as e:
+                if e.response.status_code not in UNAVAILABLE_ACCOUNT_STATUS_CODES:
+                    raise
+                # The IDs of the relations retrieved before are already marked as visited, so they are still enqueued.
+                skipped = True
+                break
+
+        if skipped:
+            stats.num_skipped += 1
+        else:
+            stats.num_expanded += 1
+        stats.num_discovered += len(new_ids)
+
+        if depth + 1 < max_depth:
+            await enqueue_ids(ids=new_ids, depth=depth + 1)
+
+    async def work() -> None:
+        while True:
+            _, _, depth, user_id = await frontier.get()
+            try:
+                await expand(user_id=user_id, depth=depth)
+            finally:
+                frontier.task_done()
+
+    if max_depth < 1:
+        return stats
+
+    seed_users: tuple[LazyUser, ...] = await lookup_users(
+        http_client=http_client,
+        user_ids=seed_user_ids,
+        screen_names=seed_screen_names,
+        cache=cache,
+        lazy=True
+    )
+    visited.update(user.id for user in seed_users)
+    await enqueue(users=seed_users, depth=0)
+
+    workers = [create_task(work()) for _ in range(max_concurrency)]
+    # Completes only if a worker fails, as the workers otherwise wait for the frontier indefinitely.
+    workers_done = asyncio_gather(*workers)
+    frontier_done = create_task(frontier.join())
+
+    try:
+        await asyncio_wait({frontier_done, workers_done}, return_when=FIRST_COMPLETED)
+        if workers_done.done():
+            # Raises the exception of the failed worker.
+            workers_done.result()
+    finally:
+        frontier_done.cancel()
+        for worker in workers:
+            worker.cancel()
+        await asyncio_gather(*workers, workers_done, frontier_done, return_exceptions=True)
+
+    return stats
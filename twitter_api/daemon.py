@@ -0,0 +1,141 @@
+from typing import Optional, Any, Union
+from asyncio import start_server, start_unix_server, open_unix_connection, StreamReader, StreamWriter, AbstractServer
+from pathlib import Path
+
+from httpx import AsyncClient as HTTPXAsyncClient, HTTPStatusError
+
+from twitter_api.cli import twitter_api, twitter_api_records, ACTION_COLUMNS, TwitterApiAction
+from twitter_api.export import make_column_names
+
+try:
+    from orjson import loads as json_loads, dumps as _json_dumps_bytes
+except ImportError:
+    from json import loads as json_loads, dumps as _json_dumps
+
+    def _json_dumps_bytes(obj: Any) -> bytes:
+        return _json_dumps(obj, ensure_ascii=False).encode()
+
+# The actions that a daemon performs on request.
+DAEMON_ACTIONS: frozenset[str] = frozenset({
+    TwitterApiAction.USER.value,
+    TwitterApiAction.FOLLOWERS.value,
+    TwitterApiAction.FOLLOWING.value,
+    TwitterApiAction.TIMELINE.value
+})
+
+
+async def _handle_request(
+    http_client: HTTPXAsyncClient,
+    request: dict[str, Any],
+    writer: StreamWriter,
+    **kwargs
+) -> None:
+    """
+    Perform the action of a request and write its results to the connection it was received on.
+
+    :param http_client: The HTTP client with which to perform the action.
+    :param request: The action request.
+    :param writer: The writer of the connection.
+    :param kwargs: Keyword arguments to pass to `twitter_api` or `twitter_api_records`.
+    :return: None
+    """
+
+    action: str = request.get('action')
+    if action not in DAEMON_ACTIONS:
+        raise ValueError(f'Unsupported action: {action!r}')
+
+    if request.get('user_id') is None and request.get('screen_name') is None:
+        raise ValueError(f'The action {action!r} requires user_id or screen_name.')
+
+    records: bool = bool(request.get('records', False))
+    column_names: tuple[str, ...] = make_column_names(columns=ACTION_COLUMNS[action])
+
+    async for result in (twitter_api_records if records else twitter_api)(
+        http_client=http_client,
+        action=action,
+        user_id=request.get('user_id'),
+        screen_name=request.get('screen_name'),
+        full_history=bool(request.get('full_history', False)),
+        **kwargs
+    ):
+        writer.write(
+            _json_dumps_bytes(dict(result=dict(zip(column_names, result)) if records else result)) + b'\n'
+        )
+        await writer.drain()
+
+
+async def _is_serving(socket_path: Path) -> bool:
+    try:
+        _, writer = await open_unix_connection(path=str(socket_path))
+    except OSError:
+        return False
+
+    writer.close()
+    await writer.wait_closed()
+    return True
+
+
+async def start_daemon(
+    http_client: HTTPXAsyncClient,
+    socket_path: Optional[Union[Path, str]] = None,
+    port: Optional[int] = None,
+    **kwargs
+) -> AbstractServer:
+    """
+    Start a server performing actions on request, with one long-lived HTTP client.
+
+    The server listens on a Unix socket or on a TCP port of the loopback interface. A client sends action requests
+    as JSON objects, one per line, e.g. `{"action": "followers", "screen_name": "jack", "records": true}`; the
+    server responds to each request with one line per result -- `{"result": ...}`, with text as `twitter_api`
+    produces it, or with records as objects keyed by column name -- followed by either `{"done": true}` or
+    `{"error": {...}}`. Requests on one connection are performed in turn, and requests on different connections
+    concurrently.
+
+    As the HTTP client, its connections and its authentication, and the caches and stores passed in `kwargs`, live
+    as long as the server, a request costs only the requests to the API that its action needs.
+
+    :param http_client: The HTTP client with which to perform the actions.
+    :param socket_path: The path of the Unix socket on which to listen. A stale socket at the path is replaced.
+    :param port: The port of the loopback interface on which to listen, if no socket path is provided.
+    :param kwargs: Keyword arguments to pass to `twitter_api` or `twitter_api_records`, e.g. a cache.
+    :return: The server, which is serving.
+    """
+
+    async def handle_connection(reader: StreamReader, writer: StreamWriter) -> None:
+        try:
+            while line := await reader.readline():
+                if not line.strip():
+                    continue
+
+                try:
+                    await _handle_request(http_client=http_client, request=json_loads(line), writer=writer, **kwargs)
+                    response: dict[str, Any] = dict(done=True)
+                except HTTPStatusError as e:
+                    response = dict(
+                        error=dict(status_code=e.response.status_code, message=str(e), body=e.response.text)
+                    )
+                except Exception as e:
+                    # Any failure of a request is reported to its client, rather than stopping the server.
+                    response = dict(error=dict(status_code=None, message=f'{e.__class__.__name__}: {e}', body=None))
+
+                writer.write(_json_dumps_bytes(response) + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    if socket_path is not None:
+        socket_path = Path(socket_path)
+        if socket_path.is_socket():
+            if await _is_serving(socket_path=socket_path):
+                raise FileExistsError(f'A server is already listening on {socket_path}.')
+            # The socket of a server that was killed before it could remove it.
+            socket_path.unlink()
+
+        return await start_unix_server(handle_connection, path=str(socket_path))
+
+    if port is not None:
+        return await start_server(handle_connection, host='127.0.0.1', port=port)
+
+    raise ValueError('A socket path or a port must be provided.')
@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+from typing import Any, AsyncIterable, BinaryIO, Iterable, Optional, Sequence, Union
+from abc import ABC, abstractmethod
+from enum import Enum
+from os import fstat
+from pathlib import Path
+from stat import S_ISFIFO, S_ISSOCK
+from sys import stdout
+from time import monotonic
+
+try:
+    from orjson import dumps as _json_dumps_bytes
+except ImportError:
+    from json import dumps as _json_dumps
+
+    def _json_dumps_bytes(obj: Any) -> bytes:
+        return _json_dumps(obj, ensure_ascii=False).encode()
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# The columns into which users are exported, as field paths of `User` mapped to Arrow type aliases.
+USER_COLUMNS: dict[str, str] = {
+    'id': 'int64',
+    'screen_name': 'string',
+    'name': 'string',
+    'location': 'string',
+    'description': 'string',
+    'url': 'string',
+    'protected': 'bool',
+    'verified': 'bool',
+    'followers_count': 'int64',
+    'friends_count': 'int64',
+    'listed_count': 'int64',
+    'favourites_count': 'int64',
+    'statuses_count': 'int64',
+    'created_at': 'string',
+    'default_profile': 'bool',
+    'default_profile_image': 'bool',
+    'profile_image_url_https': 'string'
+}
+
+# The columns into which statuses are exported, as field paths of `Status` mapped to Arrow type aliases.
+STATUS_COLUMNS: dict[str, str] = {
+    'id': 'int64',
+    'created_at': 'string',
+    'user.id': 'int64',
+    'user.screen_name': 'string',
+    'full_text': 'string',
+    'text': 'string',
+    'lang': 'string',
+    'source': 'string',
+    'in_reply_to_status_id': 'int64',
+    'in_reply_to_user_id': 'int64',
+    'in_reply_to_screen_name': 'string',
+    'is_quote_status': 'bool',
+    'quoted_status_id': 'int64',
+    'retweeted_status.id': 'int64',
+    'retweet_count': 'int64',
+    'favorite_count': 'int64'
+}
+
+# The number of records to buffer before they are written as one batch.
+DEFAULT_BATCH_SIZE = 10_000
+
+# The maximum number of seconds for which NDJSON written to a regular file is held in the file's buffer.
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+
+class OutputFormat(Enum):
+    TEXT = 'text'
+    NDJSON = 'ndjson'
+    PARQUET = 'parquet'
+
+
+def make_column_names(columns: Iterable[str]) -> tuple[str, ...]:
+    """
+    Name the columns of records as the fields of the projections of their paths, with underscores in place of the
+    dots.
+
+    :param columns: The field paths of the columns, e.g. `user.screen_name`.
+    :return: The names of the columns, e.g. `user_screen_name`.
+    """
+
+    return tuple(path.replace('.', '_') for path in columns)
+
+
+class RecordWriter(ABC):
+    """
+    A writer of records -- tuples of the values of a fixed set of columns -- to a binary file, batch by batch.
+
+    Only one batch of records needs to be held in memory at a time, regardless of the total number of records.
+    """
+
+    # The number of records per batch when none is specified.
+    default_batch_size: int = DEFAULT_BATCH_SIZE
+
+    def __init__(self, file: BinaryIO, columns: dict[str, str]):
+        """
+        :param file: The binary file to which to write the records.
+        :param columns: The columns of the records, as field paths mapped to Arrow type aliases.
+        """
+
+        self.file = file
+        self.columns = columns
+        self.num_written_records = 0
+        self.column_names: tuple[str, ...] = make_column_names(columns=columns)
+
+    @abstractmethod
+    def write_batch(self, records: Sequence[tuple]) -> None:
+        """
+        Write a batch of records.
+
+        :param records: The records to write.
+        :return: None
+        """
+
+    def close(self) -> None:
+        self.file.flush()
+
+    def __enter__(self) -> RecordWriter:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+def _is_stream(file: BinaryIO) -> bool:
+    try:
+        return file.isatty() or S_ISFIFO(mode := fstat(file.fileno()).st_mode) or S_ISSOCK(mode)
+    except (OSError, ValueError):
+        return False
+
+
+class NdjsonRecordWriter(RecordWriter):
+    """
+    A writer of records as newline-delimited JSON objects, keyed by the column names.
+
+    By default, each record is written on its own as soon as it is produced. Output read as a stream -- a terminal,
+    or a pipe into e.g. `jq` -- is flushed after every batch, so that the consumer receives the first records within
+    the latency of one request; output to a file is flushed at most once per `flush_interval`, so that a large export
+    is written in buffer-sized chunks rather than with one system call per record.
+    """
+
+    default_batch_size = 1
+
+    def __init__(self, file: BinaryIO, columns: dict[str, str], flush_interval: Optional[float] = None):
+        """
+        :param file: The binary file to which to write the records.
+        :param columns: The columns of the records, as field paths mapped to Arrow type aliases.
+        :param flush_interval: The minimum number of seconds between flushes of the file. Defaults to 0 for a
+            terminal, a pipe or a socket, and to `DEFAULT_FLUSH_INTERVAL` otherwise.
+        """
+
+        super().__init__(file=file, columns=columns)
+
+        self.flush_interval: float = (
+            flush_interval if flush_interval is not None
+            else 0.0 if _is_stream(file=file)
+            else DEFAULT_FLUSH_INTERVAL
+        )
+        self._last_flush_time: float = monotonic()
+
+    def write_batch(self, records: Sequence[tuple]) -> None:
+        column_names = self.column_names
+        self.file.write(
+            b''.join(_json_dumps_bytes(dict(zip(column_names, record))) + b'\n' for record in records)
+        )
+        self.num_written_records += len(records)
+
+        if (now := monotonic()) - self._last_flush_time >= self.flush_interval:
+            self.file.flush()
+            self._last_flush_time = now
+
+
+class ParquetRecordWriter(RecordWriter):
+    """
+    A writer of records as a Parquet file, with one row group per batch of records.
+
+    The records of a batch are transposed into columns and converted into an Arrow record batch with the schema given
+    by the column types, so that batches in which a column happens to be all null still share the one schema.
+    """
+
+    def __init__(self, file: BinaryIO, columns: dict[str, str]):
+        if pyarrow is None:
+            raise RuntimeError('Writing Parquet requires pyarrow (`pip install twitter_api[parquet]`).')
+
+        super().__init__(file=file, columns=columns)
+
+        self.schema = pyarrow.schema([
+            (column_name, pyarrow.type_for_alias(type_alias))
+            for column_name, type_alias in zip(self.column_names, columns.values())
+        ])
+        self._parquet_writer = pyarrow.parquet.ParquetWriter(where=file, schema=self.schema)
+
+    def write_batch(self, records: Sequence[tuple]) -> None:
+        if not records:
+            return
+
+        self._parquet_writer.write_batch(
+            pyarrow.RecordBatch.from_arrays(
+                [
+                    pyarrow.array(column_values, type=field.type)
+                    for column_values, field in zip(zip(*records), self.schema)
+                ],
+                schema=self.schema
+            )
+        )
+        self.num_written_records += len(records)
+
+    def close(self) -> None:
+        self._parquet_writer.close()
+        super().close()
+
+
+def make_record_writer(
+    output_format: Union[OutputFormat, str],
+    file: BinaryIO,
+    columns: dict[str, str]
+) -> RecordWriter:
+    """
+    Make a record writer of an output format.
+
+    :param output_format: The output format, either NDJSON or Parquet.
+    :param file: The binary file to which to write the records.
+    :param columns: The columns of the records, as field paths mapped to Arrow type aliases.
+    :return: A record writer.
+    """
+
+    match OutputFormat(output_format):
+        case OutputFormat.NDJSON:
+            return NdjsonRecordWriter(file=file, columns=columns)
+        case OutputFormat.PARQUET:
+            return ParquetRecordWriter(file=file, columns=columns)
+        case _:
+            raise ValueError(f'No record writer for the output format {output_format!r}.')
+
+
+async def export_records(
+    records: AsyncIterable[tuple],
+    record_writer: RecordWriter,
+    batch_size: Optional[int] = None
+) -> int:
+    """
+    Write records to a record writer in batches, as they are produced.
+
+    :param records: An async iterable of records, e.g. user projections from `iter_hydrated_users` with the columns
+        of the writer as fields. An async generator is closed once its records are written, or once writing fails.
+    :param record_writer: The record writer to which to write the records.
+    :param batch_size: The number of records to buffer before writing them as one batch. Defaults to the default
+        batch size of the writer.
+    :return: The number of records written.
+    """
+
+    batch_size = batch_size or record_writer.default_batch_size
+
+    batch: list[tuple] = []
+
+    try:
+        async for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                record_writer.write_batch(records=batch)
+                batch = []
+    finally:
+        # Closed here, rather than when garbage collected, so that a failure to write, e.g. to a closed pipe, stops
+        # the generators producing the records in order.
+        if (aclose := getattr(records, 'aclose', None)) is not None:
+            await aclose()
+
+    if batch:
+        record_writer.write_batch(records=batch)
+
+    return record_writer.num_written_records
+
+
+def open_output(output_path: Optional[str], append: bool = False) -> BinaryIO:
+    """
+    Open the binary file to which to write output, or standard output if no path is provided.
+
+    :param output_path: The path of the output file.
+    :param append: Whether to append to the output file rather than to overwrite it, e.g. when resuming a retrieval
+        whose earlier records are in it.
+    :return: A binary file.
+    """
+
+    if output_path is None:
+        return open(stdout.fileno(), mode='wb', closefd=False)
+
+    return Path(output_path).open(mode='ab' if append else 'wb')
@@ -0,0 +1,486 @@
+from typing import Optional, Any, Callable
+from argparse import ArgumentParser
+from asyncio import run as asyncio_run, start_server, sleep as asyncio_sleep, StreamReader, StreamWriter, \
+    AbstractServer, IncompleteReadError
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from math import ceil
+from re import compile as re_compile, Pattern
+from time import time
+from urllib.parse import urlsplit, parse_qsl, quote
+from zlib import crc32
+
+from twitter_api.synthetic import make_user_object, make_status_object, timeline_status_id, search_status_id
+
+try:
+    from orjson import dumps as _json_dumps_bytes
+except ImportError:
+    from json import dumps as _json_dumps
+
+    def _json_dumps_bytes(obj: Any) -> bytes:
+        return _json_dumps(obj, ensure_ascii=False).encode()
+
+# The number of requests per rate limit window that the API allows per endpoint, with user authentication.
+DEFAULT_RATE_LIMITS: dict[str, int] = {
+    'friends/ids': 15,
+    'followers/ids': 15,
+    'users/lookup': 900,
+    'users/show': 900,
+    'statuses/user_timeline': 900,
+    'search/tweets': 180
+}
+
+# The length of a rate limit window, in seconds.
+DEFAULT_RATE_LIMIT_WINDOW = 900
+
+# The user ID of the authenticated user, whose friends and followers are listed when no user is specified.
+AUTHENTICATED_USER_ID = 1
+
+# The first user ID of the synthetic followers and friends, which keeps them apart from the examined accounts.
+FOLLOWER_ID_BASE = 1_000_000_000
+FRIEND_ID_BASE = 2_000_000_000
+
+MAX_IDS_PAGE_SIZE = 5000
+MAX_LOOKUP_BATCH_SIZE = 100
+MAX_TIMELINE_PAGE_SIZE = 200
+MAX_SEARCH_PAGE_SIZE = 100
+
+_RATE_LIMIT_EXCEEDED_ERROR = dict(code=88, message='Rate limit exceeded')
+_USER_NOT_FOUND_ERROR = dict(code=50, message='User not found.')
+_NO_USER_MATCHES_ERROR = dict(code=17, message='No user matches for specified terms.')
+_PAGE_NOT_FOUND_ERROR = dict(code=34, message='Sorry, that page does not exist.')
+
+# A parameter of an OAuth 1.0a `Authorization` header, e.g. `oauth_token="..."`.
+_OAUTH_PARAMETER_PATTERN: Pattern = re_compile(r'(oauth_[a-z_]+)="([^"]*)"')
+
+
+@dataclass
+class FakeApiConfig:
+    # The number of followers of the accounts not listed in `account_num_followers`.
+    num_followers: int = 10_000
+    # The number of followers of specific accounts, keyed by user ID.
+    account_num_followers: dict[int, int] = field(default_factory=dict)
+    # The number of accounts that every account follows.
+    num_friends: int = 1_000
+    # The number of statuses in every user timeline; the API serves at most the 3,200 most recent.
+    num_statuses: int = 3_200
+    # The number of statuses matching every search query.
+    num_search_results: int = 1_000
+    # The number of seconds to wait before responding to a request, to simulate the network.
+    latency: float = 0.0
+    # The number of requests per rate limit window allowed per credential and endpoint, keyed by endpoint.
+    rate_limits: dict[str, int] = field(default_factory=lambda: dict(DEFAULT_RATE_LIMITS))
+    rate_limit_window: int = DEFAULT_RATE_LIMIT_WINDOW
+
+
+def _account_id(params: dict[str, str]) -> Optional[int]:
+    if (user_id := params.get('user_id')) is not None:
+        return int(user_id) if user_id.isdigit() and int(user_id) > 0 else None
+    if (screen_name := params.get('screen_name')) is not None:
+        return _screen_name_user_id(screen_name=screen_name)
+    return AUTHENTICATED_USER_ID
+
+
+def _screen_name_user_id(screen_name: str) -> Optional[int]:
+    # The synthetic users are named after their user IDs, as by `make_user_object`.
+    if screen_name.lower().startswith('user') and (user_id := screen_name[4:]).isdigit() and int(user_id) > 0:
+        return int(user_id)
+    return None
+
+
+def _page_size(params: dict[str, str], default: int, maximum: int) -> int:
+    try:
+        return max(1, min(int(params['count']), maximum))
+    except (KeyError, ValueError):
+        return default
+
+
+def _first_index(num_statuses: int, status_id: Callable[[int], int], max_id: Optional[str]) -> int:
+    # The status IDs decrease with the index, so that the first status not newer than `max_id` is found by bisection.
+    if max_id is None:
+        return 0
+    return bisect_left(range(num_statuses), -int(max_id), key=lambda index: -status_id(index))
+
+
+def _credential(authorization: str) -> str:
+    """
+    Identify the credential with which a request was signed, by which the rate limits are counted.
+
+    The nonce, the timestamp and the signature of an OAuth 1.0a header change with every request, so the credential
+    is its access token -- or its consumer key, for requests without one. Other headers, e.g. bearer tokens, are the
+    credential as a whole.
+
+    :param authorization: The value of the `Authorization` header of a request.
+    :return: The credential.
+    """
+
+    oauth_parameters: dict[str, str] = dict(_OAUTH_PARAMETER_PATTERN.findall(authorization))
+    return oauth_parameters.get('oauth_token') or oauth_parameters.get('oauth_consumer_key') or authorization
+
+
+class FakeTwitterApi:
+    """
+    A fake of the Twitter API, serving synthetic data from the endpoints with which the actions retrieve users and
+    statuses: `friends/ids`, `followers/ids`, `users/lookup`, `users/show`, `statuses/user_timeline` and
+    `search/tweets`.
+
+    The data is generated on request rather than stored, so that accounts with millions of followers cost no memory:
+    every positive user ID, and every screen name of the form `user<ID>`, is an existing user; the followers and
+    friends of an account are consecutive ranges of user IDs; and status IDs are derived from positions in timelines
+    and search results. The responses carry the `x-rate-limit-*` headers of the API, and requests beyond the limit of
+    a window are refused with 429.
+    """
+
+    def __init__(self, config: Optional[FakeApiConfig] = None):
+        """
+        :param config: The sizes of the synthetic data, the latency and the rate limits.
+        """
+
+        self.config = config if config is not None else FakeApiConfig()
+
+        self._handlers: dict[str, Callable[[dict[str, str]], tuple[int, Any]]] = {
+            'friends/ids': self._friend_ids,
+            'followers/ids': self._follower_ids,
+            'users/lookup': self._lookup_users,
+            'users/show': self._show_user,
+            'statuses/user_timeline': self._user_timeline,
+            'search/tweets': self._search_tweets
+        }
+        # The reset time and the remaining number of requests of the current windows, keyed by credential and endpoint.
+        self._windows: dict[tuple[str, str], tuple[int, int]] = {}
+
+        self.num_requests: Counter[str] = Counter()
+
+    def respond(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, str],
+        authorization: str = ''
+    ) -> tuple[int, dict[str, str], bytes]:
+        """
+        Respond to a request.
+
+        :param method: The method of the request.
+        :param path: The path of the request, e.g. `/1.1/users/show.json`.
+        :param params: The parameters of the request.
+        :param authorization: The value of the `Authorization` header of the request, by whose credential the rate
+            limits are counted.
+        :return: The status code, the headers and the body of the response.
+        """
+
+        endpoint: str = path.removeprefix('/1.1/').removesuffix('.json')
+        if method != 'GET' or (handler := self._handlers.get(endpoint)) is None:
+            return 404, {}, _json_dumps_bytes(dict(errors=[_PAGE_NOT_FOUND_ERROR]))
+
+        self.num_requests[endpoint] += 1
+
+        headers: dict[str, str] = {}
+        if (limit := self.config.rate_limits.get(endpoint)) is not None:
+            now: float = time()
+            credential: str = _credential(authorization=authorization)
+            reset, remaining = self._windows.get((credential, endpoint), (0, 0))
+            if now >= reset:
+                reset, remaining = ceil(now) + self.config.rate_limit_window, limit
+
+            headers = {
+                'x-rate-limit-limit': str(limit),
+                'x-rate-limit-remaining': str(max(remaining - 1, 0)),
+                'x-rate-limit-reset': str(reset)
+            }
+
+            if remaining == 0:
+                return 429, headers, _json_dumps_bytes(dict(errors=[_RATE_LIMIT_EXCEEDED_ERROR]))
+
+            self._windows[(credential, endpoint)] = (reset, remaining - 1)
+
+        status_code, json_object = handler(params)
+        return status_code, headers, _json_dumps_bytes(json_object)
+
+    def _ids(self, params: dict[str, str], id_base: int, num_ids: Callable[[int], int]) -> tuple[int, Any]:
+        if (account_id := _account_id(params=params)) is None:
+            return 404, dict(errors=[_USER_NOT_FOUND_ERROR])
+
+        total: int = num_ids(account_id)
+        count: int = _page_size(params=params, default=MAX_IDS_PAGE_SIZE, maximum=MAX_IDS_PAGE_SIZE)
+        # The cursors are the offsets of the pages, except for the first page's, which is -1 as in the API.
+        offset: int = max(int(params.get('cursor', -1)), 0)
+        end: int = min(offset + count, total)
+
+        # Newest first, as in the API.
+        ids: list = list(range(id_base + total - 1 - offset, id_base + total - 1 - end, -1))
+        if params.get('stringify_ids') in {'true', 'True', '1'}:
+            ids = [str(user_id) for user_id in ids]
+
+        next_cursor: int = end if end < total else 0
+        previous_cursor: int = -offset if offset > 0 else 0
+
+        return 200, dict(
+            ids=ids,
+            next_cursor=next_cursor,
+            next_cursor_str=str(next_cursor),
+            previous_cursor=previous_cursor,
+            previous_cursor_str=str(previous_cursor),
+            total_count=None
+        )
+
+    def _num_followers(self, account_id: int) -> int:
+        return self.config.account_num_followers.get(account_id, self.config.num_followers)
+
+    def _friend_ids(self, params: dict[str, str]) -> tuple[int, Any]:
+        return self._ids(params=params, id_base=FRIEND_ID_BASE, num_ids=lambda _: self.config.num_friends)
+
+    def _follower_ids(self, params: dict[str, str]) -> tuple[int, Any]:
+        return self._ids(params=params, id_base=FOLLOWER_ID_BASE, num_ids=self._num_followers)
+
+    def _lookup_users(self, params: dict[str, str]) -> tuple[int, Any]:
+        user_ids: list[Optional[int]] = [
+            int(user_id) if user_id.isdigit() and int(user_id) > 0 else None
+            for user_id in params.get('user_id', '').split(',')
+            if user_id
+        ] + [
+            _screen_name_user_id(screen_name=screen_name)
+            for screen_name in params.get('screen_name', '').split(',')
+            if screen_name
+        ]
+
+        if len(user_ids) > MAX_LOOKUP_BATCH_SIZE:
+            return 403, dict(errors=[dict(code=18, message='Too many terms specified in query.')])
+
+        # Each user is returned once, however many times it is requested.
+        found_ids: dict[int, None] = dict.fromkeys(user_id for user_id in user_ids if user_id is not None)
+        if not found_ids:
+            return 404, dict(errors=[_NO_USER_MATCHES_ERROR])
+
+        return 200, [make_user_object(user_id=user_id, with_status=True) for user_id in found_ids]
+
+    def _show_user(self, params: dict[str, str]) -> tuple[int, Any]:
+        # Unlike the other endpoints, the endpoint does not default to the authenticated user.
+        account_id: Optional[int] = (
+            _account_id(params=params) if 'user_id' in params or 'screen_name' in params else None
+        )
+        if account_id is None:
+            return 404, dict(errors=[_USER_NOT_FOUND_ERROR])
+
+        return 200, make_user_object(user_id=account_id, with_status=True)
+
+    def _user_timeline(self, params: dict[str, str]) -> tuple[int, Any]:
+        if (account_id := _account_id(params=params)) is None:
+            return 404, dict(errors=[_PAGE_NOT_FOUND_ERROR])
+
+        num_statuses: int = self.config.num_statuses
+        count: int = _page_size(params=params, default=20, maximum=MAX_TIMELINE_PAGE_SIZE)
+        since_id: int = int(params.get('since_id', 0))
+
+        def status_id(index: int) -> int:
+            return timeline_status_id(user_id=account_id, index=index)
+
+        start: int = _first_index(num_statuses=num_statuses, status_id=status_id, max_id=params.get('max_id'))
+        status_ids: list[int] = [
+            status_id(index)
+            for index in range(start, min(start + count, num_statuses))
+        ]
+
+        user_object: dict[str, Any] = make_user_object(user_id=account_id)
+        return 200, [
+            make_status_object(status_id=status_id_, user_object=user_object)
+            for status_id_ in status_ids
+            if status_id_ > since_id
+        ]
+
+    def _search_tweets(self, params: dict[str, str]) -> tuple[int, Any]:
+        query: str = params.get('q', '')
+        num_statuses: int = self.config.num_search_results
+        count: int = _page_size(params=params, default=15, maximum=MAX_SEARCH_PAGE_SIZE)
+        since_id: int = int(params.get('since_id', 0))
+        # The results of different queries are distinct statuses.
+        sequence: int = crc32(query.encode())
+
+        def status_id(index: int) -> int:
+            return search_status_id(sequence=sequence, index=index)
+
+        start: int = _first_index(num_statuses=num_statuses, status_id=status_id, max_id=params.get('max_id'))
+        end: int = min(start + count, num_statuses)
+        status_ids: list[int] = [
+            status_id_
+            for status_id_ in (status_id(index) for index in range(start, end))
+            if status_id_ > since_id
+        ]
+
+        search_metadata: dict[str, Any] = dict(
+            completed_in=0.01,
+            max_id=status_ids[0] if status_ids else 0,
+            max_id_str=str(status_ids[0] if status_ids else 0),
+            query=quote(query),
+            count=count,
+            since_id=since_id,
+            since_id_str=str(since_id)
+        )
+        if end < num_statuses and len(status_ids) == end - start:
+            search_metadata['next_results'] = (
+                f'?max_id={status_ids[-1] - 1}&q={quote(query)}&count={count}&include_entities=1'
+            )
+
+        return 200, dict(
+            statuses=[
+                make_status_object(
+                    status_id=status_id_,
+                    user_object=make_user_object(user_id=status_id_ % 1_000 + 1)
+                )
+                for status_id_ in status_ids
+            ],
+            search_metadata=search_metadata
+        )
+
+
+async def serve_fake_api(api: FakeTwitterApi, host: str = '127.0.0.1', port: int = 8080) -> AbstractServer:
+    """
+    Start an HTTP/1.1 server serving a fake of the Twitter API, with keep-alive connections.
+
+    Point the actions at it with `--api-base-url http://<host>:<port>`; any credentials are accepted.
+
+    :param api: The fake of the API to serve.
+    :param host: The host on which to listen.
+    :param port: The port on which to listen.
+    :return: The server, which is serving.
+    """
+
+    async def handle_connection(reader: StreamReader, writer: StreamWriter) -> None:
+        try:
+            while True:
+                request_line, *header_lines = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1').split('\r\n')
+                method, target, _ = request_line.split(' ', 2)
+                headers: dict[str, str] = {
+                    name.strip().lower(): value.strip()
+                    for name, _, value in (line.partition(':') for line in header_lines if line)
+                }
+
+                url = urlsplit(target)
+                params: dict[str, str] = dict(parse_qsl(url.query))
+                if content_length := int(headers.get('content-length', 0)):
+                    params |= dict(parse_qsl((await reader.readexactly(content_length)).decode()))
+
+                if api.config.latency:
+                    await asyncio_sleep(api.config.latency)
+
+                status_code, response_headers, body = api.respond(
+                    method=method,
+                    path=url.path,
+                    params=params,
+                    authorization=headers.get('authorization', '')
+                )
+
+                writer.write(
+                    f'HTTP/1.1 {status_code} {HTTPStatus(status_code).phrase}\r\n'.encode()
+                    + b'Content-Type: application/json;charset=utf-8\r\n'
+                    + f'Content-Length: {len(body)}\r\n'.encode()
+                    + b''.join(f'{name}: {value}\r\n'.encode() for name, value in response_headers.items())
+                    + b'\r\n'
+                    + body
+                )
+                await writer.drain()
+
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return await start_server(handle_connection, host=host, port=port, backlog=1024)
+
+
+def _parse_account_num_followers(value: str) -> tuple[int, int]:
+    user_id, _, num_followers = value.partition('=')
+    return int(user_id), int(num_followers)
+
+
+def main():
+    parser = ArgumentParser(description='Serve a fake of the Twitter API with synthetic data.')
+
+    parser.add_argument('--host', help='The host on which to listen.', default='127.0.0.1')
+    parser.add_argument('--port', help='The port on which to listen.', type=int, default=8080)
+    parser.add_argument(
+        '--num-followers',
+        help='The number of followers of every account.',
+        type=int,
+        default=FakeApiConfig.num_followers
+    )
+    parser.add_argument(
+        '--account-followers',
+        help='The number of followers of a specific account, as USER_ID=NUM_FOLLOWERS.',
+        type=_parse_account_num_followers,
+        action='append',
+        default=[]
+    )
+    parser.add_argument(
+        '--num-friends',
+        help='The number of accounts that every account follows.',
+        type=int,
+        default=FakeApiConfig.num_friends
+    )
+    parser.add_argument(
+        '--num-statuses',
+        help='The number of statuses in every user timeline.',
+        type=int,
+        default=FakeApiConfig.num_statuses
+    )
+    parser.add_argument(
+        '--num-search-results',
+        help='The number of statuses matching every search query.',
+        type=int,
+        default=FakeApiConfig.num_search_results
+    )
+    parser.add_argument(
+        '--latency',
+        help='The number of seconds to wait before responding to a request, to simulate the network.',
+        type=float,
+        default=FakeApiConfig.latency
+    )
+    parser.add_argument(
+        '--rate-limit-multiplier',
+        help='A factor by which to multiply the rate limits of the API, e.g. to benchmark without being throttled.',
+        type=float,
+        default=1.0
+    )
+    parser.add_argument(
+        '--rate-limit-window',
+        help='The length of a rate limit window, in seconds.',
+        type=int,
+        default=DEFAULT_RATE_LIMIT_WINDOW
+    )
+
+    args = parser.parse_args()
+
+    api = FakeTwitterApi(
+        config=FakeApiConfig(
+            num_followers=args.num_followers,
+            account_num_followers=dict(args.account_followers),
+            num_friends=args.num_friends,
+            num_statuses=args.num_statuses,
+            num_search_results=args.num_search_results,
+            latency=args.latency,
+            rate_limits={
+                endpoint: max(round(limit * args.rate_limit_multiplier), 1)
+                for endpoint, limit in DEFAULT_RATE_LIMITS.items()
+            },
+            rate_limit_window=args.rate_limit_window
+        )
+    )
+
+    async def serve() -> None:
+        server = await serve_fake_api(api=api, host=args.host, port=args.port)
+        print(f'Serving a fake of the Twitter API on http://{args.host}:{args.port}', flush=True)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio_run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
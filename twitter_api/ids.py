@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+from array import array
+from typing import Iterable, Iterator
+from bisect import bisect_left
+from itertools import chain
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# The typecode of a signed 64-bit integer array, wide enough for any user ID.
+ID_TYPECODE = 'q'
+
+
+def sorted_id_array(ids: Iterable[int]) -> array:
+    """
+    Make a compact array of unique user IDs in ascending order.
+
+    :param ids: The user IDs.
+    :return: A sorted array of signed 64-bit integers, without duplicates.
+    """
+
+    if numpy is not None:
+        id_array = ids if isinstance(ids, array) else array(ID_TYPECODE, ids)
+        return array(ID_TYPECODE, numpy.unique(numpy.frombuffer(id_array, dtype=numpy.int64)).tobytes())
+
+    return array(ID_TYPECODE, sorted(set(ids)))
+
+
+def difference_sorted_ids(ids: array, other_ids: array) -> array:
+    """
+    Compute the IDs that are in one sorted ID array but not in another.
+
+    The arrays are merged in one linear pass; if NumPy is available, the merge is vectorized.
+
+    :param ids: A sorted array of unique IDs, as made by `sorted_id_array`.
+    :param other_ids: Another sorted array of unique IDs.
+    :return: A sorted array of the IDs in `ids` that are not in `other_ids`.
+    """
+
+    if numpy is not None:
+        return array(
+            ID_TYPECODE,
+            numpy.setdiff1d(
+                numpy.frombuffer(ids, dtype=numpy.int64),
+                numpy.frombuffer(other_ids, dtype=numpy.int64),
+                assume_unique=True
+            ).tobytes()
+        )
+
+    difference = array(ID_TYPECODE)
+
+    other_index = 0
+    num_other_ids = len(other_ids)
+
+    for id_ in ids:
+        while other_index < num_other_ids and other_ids[other_index] < id_:
+            other_index += 1
+        if other_index == num_other_ids or other_ids[other_index] != id_:
+            difference.append(id_)
+
+    return difference
+
+
+def diff_sorted_ids(old_ids: array, new_ids: array) -> tuple[array, array]:
+    """
+    Compute the IDs that were added and removed between two sorted ID arrays.
+
+    :param old_ids: The sorted array of unique IDs before.
+    :param new_ids: The sorted array of unique IDs after.
+    :return: The sorted arrays of the added IDs and of the removed IDs.
+    """
+
+    return (
+        difference_sorted_ids(ids=new_ids, other_ids=old_ids),
+        difference_sorted_ids(ids=old_ids, other_ids=new_ids)
+    )
+
+
+def intersect_sorted_ids(ids: array, other_ids: array) -> array:
+    """
+    Compute the IDs that are in both of two sorted ID arrays.
+
+    If NumPy is available, the intersection is vectorized; otherwise, the IDs of the smaller array are looked up in
+    the larger one by binary search.
+
+    :param ids: A sorted array of unique IDs, as made by `sorted_id_array`.
+    :param other_ids: Another sorted array of unique IDs.
+    :return: A sorted array of the IDs in both `ids` and `other_ids`.
+    """
+
+    if numpy is not None:
+        return array(
+            ID_TYPECODE,
+            numpy.intersect1d(
+                numpy.frombuffer(ids, dtype=numpy.int64),
+                numpy.frombuffer(other_ids, dtype=numpy.int64),
+                assume_unique=True
+            ).tobytes()
+        )
+
+    if len(ids) > len(other_ids):
+        ids, other_ids = other_ids, ids
+
+    return array(ID_TYPECODE, (id_ for id_ in ids if _sorted_contains(sorted_ids=other_ids, id_=id_)))
+
+
+def _sorted_contains(sorted_ids: array, id_: int) -> bool:
+    index: int = bisect_left(sorted_ids, id_)
+    return index != len(sorted_ids) and sorted_ids[index] == id_
+
+
+class CompactIds:
+    """
+    An immutable set of user IDs stored as a sorted array of signed 64-bit integers.
+
+    At eight bytes per ID, it is several times smaller than a list or set of Python integers, and supports
+    membership tests by binary search and set operations by merging sorted arrays. Iteration yields the IDs in
+    ascending order.
+    """
+
+    __slots__ = ('array',)
+
+    def __init__(self, ids: Iterable[int] = ()):
+        """
+        :param ids: The user IDs of the set. Duplicates are removed.
+        """
+
+        self.array: array = ids.array if isinstance(ids, CompactIds) else sorted_id_array(ids=ids)
+
+    @classmethod
+    def from_sorted_array(cls, id_array: array) -> CompactIds:
+        """
+        Make a set from an array of IDs that is already sorted and without duplicates, without copying it.
+
+        :param id_array: A sorted array of unique IDs, as made by `sorted_id_array`.
+        :return: A set of the IDs in the array.
+        """
+
+        compact_ids = cls.__new__(cls)
+        compact_ids.array = id_array
+        return compact_ids
+
+    @staticmethod
+    def _as_array(ids: Iterable[int]) -> array:
+        return ids.array if isinstance(ids, CompactIds) else sorted_id_array(ids=ids)
+
+    def __len__(self) -> int:
+        return len(self.array)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.array)
+
+    def __contains__(self, id_: object) -> bool:
+        return isinstance(id_, int) and _sorted_contains(sorted_ids=self.array, id_=id_)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CompactIds):
+            return NotImplemented
+        return self.array == other.array
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(<{len(self)} IDs>)'
+
+    @property
+    def nbytes(self) -> int:
+        return self.array.itemsize * len(self.array)
+
+    def intersection(self, *others: Iterable[int]) -> CompactIds:
+        id_array: array = self.array
+        for other in others:
+            id_array = intersect_sorted_ids(ids=id_array, other_ids=self._as_array(ids=other))
+        return self.from_sorted_array(id_array=id_array)
+
+    def difference(self, *others: Iterable[int]) -> CompactIds:
+        id_array: array = self.array
+        for other in others:
+            id_array = difference_sorted_ids(ids=id_array, other_ids=self._as_array(ids=other))
+        return self.from_sorted_array(id_array=id_array)
+
+    def union(self, *others: Iterable[int]) -> CompactIds:
+        return self.from_sorted_array(
+            id_array=sorted_id_array(
+                ids=array(ID_TYPECODE, chain(self.array, *(self._as_array(ids=other) for other in others)))
+            )
+        )
+
+    def __and__(self, other: Iterable[int]) -> CompactIds:
+        return self.intersection(other)
+
+    def __sub__(self, other: Iterable[int]) -> CompactIds:
+        return self.difference(other)
+
+    def __or__(self, other: Iterable[int]) -> CompactIds:
+        return self.union(other)
+
+
+class CompactIdSet:
+    """
+    A growable set of user IDs, stored mostly as a `CompactIds`.
+
+    IDs are added to a small buffer set, which is merged into the sorted array once it holds `max_buffer_size` IDs,
+    so that the set takes close to eight bytes per ID. Each merge rebuilds the array in time linear in the size n of
+    the set, so adding an ID costs O(n / max_buffer_size) amortized time.
+    """
+
+    __slots__ = ('compact_ids', '_buffer', 'max_buffer_size')
+
+    def __init__(self, ids: Iterable[int] = (), max_buffer_size: int = 65_536):
+        """
+        :param ids: The initial user IDs of the set.
+        :param max_buffer_size: The number of added IDs to buffer before merging them into the sorted array.
+        """
+
+        self.compact_ids = CompactIds(ids=ids)
+        self._buffer: set[int] = set()
+        self.max_buffer_size = max_buffer_size
+
+    def _merge(self) -> None:
+        if self._buffer:
+            self.compact_ids = self.compact_ids.union(self._buffer)
+            self._buffer.clear()
+
+    def add(self, id_: int) -> None:
+        if id_ in self._buffer or id_ in self.compact_ids:
+            return
+
+        self._buffer.add(id_)
+        if len(self._buffer) >= self.max_buffer_size:
+            self._merge()
+
+    def update(self, ids: Iterable[int]) -> None:
+        for id_ in ids:
+            self.add(id_)
+
+    def __contains__(self, id_: object) -> bool:
+        return id_ in self._buffer or id_ in self.compact_ids
+
+    def __len__(self) -> int:
+        return len(self.compact_ids) + len(self._buffer)
+
+    def __iter__(self) -> Iterator[int]:
+        self._merge()
+        return iter(self.compact_ids)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(<{len(self)} IDs>)'
+
+    def to_compact_ids(self) -> CompactIds:
+        """
+        Make an immutable snapshot of the set.
+
+        :return: The IDs of the set, as a `CompactIds`.
+        """
+
+        self._merge()
+        return self.compact_ids
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from typing import Any, Callable, ClassVar, Optional
+from dataclasses import fields
+
+from twitter_api.structures import User, Status, UserEntities, StatusEntities, ExtendedEntities, Media
+
+
+class LazyStructure:
+    """
+    A read-only view of a JSON object that decodes the fields of a structure on first access.
+
+    Scalar fields are returned straight from the JSON object; nested objects are decoded when first accessed and
+    the result is kept. Accessing a field of the structure that the JSON object lacks yields `None`, as for the
+    optional fields of the structure.
+    """
+
+    __slots__ = ('json_object', '_decoded')
+
+    structure: ClassVar[type]
+    # The decoders of the fields whose values are nested objects, keyed by field name.
+    nested_decoders: ClassVar[dict[str, Callable[[Any], Any]]] = {}
+    _field_names: ClassVar[frozenset[str]] = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._field_names = frozenset(field.name for field in fields(cls.structure))
+
+    def __init__(self, json_object: dict[str, Any]):
+        """
+        :param json_object: The JSON object, as returned by the API.
+        """
+
+        self.json_object = json_object
+        self._decoded: Optional[dict[str, Any]] = None
+
+    @classmethod
+    def from_json(cls, json_object: dict[str, Any]) -> LazyStructure:
+        return cls(json_object=json_object)
+
+    def __getattr__(self, name: str) -> Any:
+        if name not in self._field_names:
+            raise AttributeError(f'{self.__class__.__name__!r} object has no attribute {name!r}')
+
+        value: Any = self.json_object.get(name)
+
+        if value is None or (decode := self.nested_decoders.get(name)) is None:
+            return value
+
+        if self._decoded is None:
+            self._decoded = {}
+        elif name in self._decoded:
+            return self._decoded[name]
+
+        self._decoded[name] = decoded_value = decode(value)
+        return decoded_value
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, LazyStructure):
+            return NotImplemented
+        return self.structure is other.structure and self.json_object == other.json_object
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(id={self.json_object.get("id")!r})'
+
+    def to_structure(self) -> Any:
+        """
+        Decode the complete structure, as is done by the eager decoding path.
+
+        :return: An instance of the structure.
+        """
+
+        return self.structure.from_json(json_object=self.json_object)
+
+
+class LazyUser(LazyStructure):
+    __slots__ = ()
+    structure = User
+
+
+class LazyStatus(LazyStructure):
+    __slots__ = ()
+    structure = Status
+
+
+LazyUser.nested_decoders = {
+    'entities': lambda json_object: UserEntities.from_json(json_object=json_object),
+    'status': LazyStatus
+}
+
+LazyStatus.nested_decoders = {
+    'entities': lambda json_object: StatusEntities.from_json(json_object=json_object),
+    'extended_entities': lambda json_object: ExtendedEntities(
+        media=[Media.from_json(json_object=media_object) for media_object in json_object['media']]
+    ),
+    'user': LazyUser,
+    'retweeted_status': LazyStatus,
+    'quoted_status': LazyStatus
+}
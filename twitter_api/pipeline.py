@@ -0,0 +1,213 @@
+from typing import AsyncIterable, AsyncIterator, Optional, Union, Sequence, TypeVar
+from asyncio import Queue, Task, create_task, gather as asyncio_gather, wait as asyncio_wait, FIRST_COMPLETED
+from collections import deque
+from contextlib import aclosing
+from dataclasses import dataclass
+
+from httpx import AsyncClient as HTTPXAsyncClient
+
+from twitter_api.calls import lookup_users, iter_search_tweets
+from twitter_api.cache import ResponseCache
+from twitter_api.ids import CompactIdSet
+from twitter_api.lazy import LazyUser, LazyStatus
+from twitter_api.structures import IdsResult, User, Status
+from twitter_api.checkpoint import PaginationCheckpoint
+
+# The maximum number of users that can be looked up in one `users/lookup` request.
+LOOKUP_BATCH_SIZE = 100
+
+T = TypeVar('T')
+
+
+@dataclass
+class _PendingPage:
+    id_page: Union[IdsResult, list[int]]
+    # The number of batches of the page that have been queued but whose users have not been yielded yet.
+    num_pending_batches: int = 0
+    # Whether all batches of the page have been queued.
+    is_queued: bool = False
+
+
+async def iter_queue_until_done(queue: Queue[T], tasks: Sequence[Task]) -> AsyncIterator[T]:
+    """
+    Yield the items put on a queue by tasks, until all the tasks are done and the queue is drained.
+
+    The tasks are cancelled when the iteration stops, including when the iterator is closed early by the caller.
+
+    :param queue: The queue on which the tasks put their results.
+    :param tasks: The tasks producing the results, e.g. workers.
+    :return: An async iterator of the items of the queue.
+    """
+
+    all_done = asyncio_gather(*tasks)
+
+    try:
+        while True:
+            get_task = create_task(queue.get())
+            await asyncio_wait({get_task, all_done}, return_when=FIRST_COMPLETED)
+
+            if get_task.done():
+                yield get_task.result()
+                continue
+
+            get_task.cancel()
+            # Raises the exception of a failed task, if any.
+            all_done.result()
+
+            while not queue.empty():
+                yield queue.get_nowait()
+
+            break
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio_gather(*tasks, all_done, return_exceptions=True)
+
+
+async def iter_hydrated_users(
+    http_client: HTTPXAsyncClient,
+    id_pages: AsyncIterable[Union[IdsResult, list[int]]],
+    max_concurrency: int = 10,
+    max_queued_batches: Optional[int] = None,
+    include_entities: Optional[bool] = None,
+    cache: Optional[ResponseCache] = None,
+    lazy: bool = False,
+    fields: Optional[Sequence[str]] = None,
+    checkpoint: Optional[PaginationCheckpoint] = None
+) -> AsyncIterator[Union[User, LazyUser, tuple]]:
+    """
+    Look up the users of pages of user IDs while the pages are still being retrieved.
+
+    Each page is split into batches of 100 IDs, which are put on a bounded queue consumed by `max_concurrency` lookup
+    workers. When the queue is full, no further pages are retrieved until a worker has taken a batch, so that the
+    number of IDs and users held in memory stays bounded regardless of the total number of IDs.
+
+    The users are yielded as soon as their batch has been looked up; the order of the users is thus not the order
+    of the IDs.
+
+    With a checkpoint, a page is recorded in it only once the users of all its batches have been yielded -- and the
+    pages before it recorded -- so that a retrieval resumed from the checkpoint looks up every user that was not
+    yielded before it was stopped. The pages must then be retrieved with `record_pages=False`.
+
+    :param http_client: The HTTP client with which to perform the HTTP requests to look up the users.
+    :param id_pages: An async iterable of pages of user IDs, e.g. from `iter_follower_ids`.
+    :param max_concurrency: The maximum number of lookup requests to have in flight at the same time.
+    :param max_queued_batches: The maximum number of ID batches awaiting lookup. Defaults to twice `max_concurrency`.
+    :param include_entities:
+    :param cache: A cache from which to serve users if present and in which to store users otherwise.
+    :param lazy: Whether to yield lazily decoded views of the users, whose fields are decoded on first access.
+    :param fields: The fields of the users to yield as named tuples instead of the users; see `lookup_users`.
+    :param checkpoint: A checkpoint in which to record the pages of IDs, as `IdsResult`s, whose users have been
+        yielded.
+    :return: An async iterator of the looked-up users.
+    """
+
+    batch_queue: Queue[Optional[tuple[_PendingPage, list[int]]]] = Queue(
+        maxsize=max_queued_batches or 2 * max_concurrency
+    )
+    result_queue: Queue[tuple[_PendingPage, tuple[Union[User, LazyUser, tuple], ...]]] = Queue(
+        maxsize=max_concurrency
+    )
+    # The pages whose users have not all been yielded yet, in the order in which they were retrieved.
+    pending_pages: deque[_PendingPage] = deque()
+
+    async def produce() -> None:
+        try:
+            async for id_page in id_pages:
+                pending_page = _PendingPage(id_page=id_page)
+                pending_pages.append(pending_page)
+
+                ids: list[int] = id_page.ids if isinstance(id_page, IdsResult) else id_page
+                for index in range(0, len(ids), LOOKUP_BATCH_SIZE):
+                    pending_page.num_pending_batches += 1
+                    await batch_queue.put((pending_page, ids[index:index+LOOKUP_BATCH_SIZE]))
+
+                pending_page.is_queued = True
+        finally:
+            # Closed here, rather than when garbage collected, if the producer is cancelled while waiting for a worker.
+            if (aclose := getattr(id_pages, 'aclose', None)) is not None:
+                await aclose()
+
+        for _ in range(max_concurrency):
+            await batch_queue.put(None)
+
+    async def consume() -> None:
+        while (item := await batch_queue.get()) is not None:
+            pending_page, batch = item
+            await result_queue.put((
+                pending_page,
+                await lookup_users(
+                    http_client=http_client,
+                    user_ids=batch,
+                    include_entities=include_entities,
+                    cache=cache,
+                    lazy=lazy,
+                    fields=fields
+                )
+            ))
+
+    def record_yielded_pages() -> None:
+        while pending_pages and pending_pages[0].is_queued and pending_pages[0].num_pending_batches == 0:
+            id_page: Union[IdsResult, list[int]] = pending_pages.popleft().id_page
+            if checkpoint is not None and isinstance(id_page, IdsResult):
+                checkpoint.record_ids_page(ids=id_page.ids, next_cursor=id_page.next_cursor)
+
+    tasks = [create_task(produce()), *(create_task(consume()) for _ in range(max_concurrency))]
+
+    async with aclosing(iter_queue_until_done(queue=result_queue, tasks=tasks)) as results:
+        async for pending_page, users in results:
+            for user in users:
+                yield user
+            pending_page.num_pending_batches -= 1
+            record_yielded_pages()
+
+
+async def iter_search_results(
+    http_client: HTTPXAsyncClient,
+    queries: Sequence[str],
+    max_concurrency: int = 4,
+    max_num_statuses: Optional[int] = None,
+    deduplicate: bool = True,
+    **kwargs
+) -> AsyncIterator[tuple[str, Union[Status, LazyStatus]]]:
+    """
+    Run several searches concurrently, yielding the statuses of each search as soon as its pages are retrieved.
+
+    Each query is followed through its pages with `iter_search_tweets` by one of `max_concurrency` workers. The
+    statuses of the different searches are interleaved in the order in which their pages arrive.
+
+    :param http_client: The HTTP client with which to perform the requests.
+    :param queries: The search queries.
+    :param max_concurrency: The maximum number of searches to run at the same time.
+    :param max_num_statuses: The maximum number of statuses to yield per query.
+    :param deduplicate: Whether to yield a status matched by several queries only for the first one.
+    :param kwargs: Keyword arguments to pass to `iter_search_tweets`.
+    :return: An async iterator of pairs of a query and a status matched by it.
+    """
+
+    query_queue: Queue[Optional[str]] = Queue()
+    for query in queries:
+        query_queue.put_nowait(query)
+    for _ in range(max_concurrency):
+        query_queue.put_nowait(None)
+
+    result_queue: Queue[tuple[str, tuple[Union[Status, LazyStatus], ...]]] = Queue(maxsize=max_concurrency)
+    seen_ids: Optional[CompactIdSet] = CompactIdSet() if deduplicate else None
+
+    async def search() -> None:
+        while (query := query_queue.get_nowait()) is not None:
+            async for statuses in iter_search_tweets(
+                http_client=http_client,
+                q=query,
+                max_num_statuses=max_num_statuses,
+                seen_ids=seen_ids,
+                **kwargs
+            ):
+                await result_queue.put((query, statuses))
+
+    tasks = [create_task(search()) for _ in range(max_concurrency)]
+
+    async with aclosing(iter_queue_until_done(queue=result_queue, tasks=tasks)) as results:
+        async for query, statuses in results:
+            for status in statuses:
+                yield query, status
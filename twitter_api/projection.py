@@ -0,0 +1,61 @@
+from typing import Any, Callable, NamedTuple, Optional, Union, get_type_hints, get_origin, get_args
+from collections import namedtuple
+from dataclasses import fields as dataclass_fields, is_dataclass
+from functools import lru_cache
+from sys import modules
+
+
+def _field_types(structure: type) -> dict[str, Any]:
+    type_hints: dict[str, Any] = get_type_hints(structure, vars(modules[structure.__module__]))
+    return {field.name: type_hints[field.name] for field in dataclass_fields(structure)}
+
+
+def _validate_path(structure: type, path: str) -> None:
+    field_type: Any = structure
+
+    for name in path.split('.'):
+        if get_origin(field_type) is Union:
+            field_type = next(arg for arg in get_args(field_type) if arg is not type(None))
+
+        if not (isinstance(field_type, type) and is_dataclass(field_type)):
+            raise ValueError(f'{path!r} is not a field path of {structure.__name__}: {name!r} is not in a structure.')
+
+        if (field_type := _field_types(structure=field_type).get(name)) is None:
+            raise ValueError(f'{path!r} is not a field path of {structure.__name__}: no field {name!r}.')
+
+
+@lru_cache(maxsize=None)
+def make_projection(structure: type, fields: tuple[str, ...]) -> Callable[[dict[str, Any]], NamedTuple]:
+    """
+    Make a function that extracts fields from a JSON object of a structure into a named tuple.
+
+    Fields of nested structures are specified as dotted paths, e.g. `user.screen_name` of `Status`, and are named
+    with underscores in place of the dots, e.g. `user_screen_name`. Fields that the JSON object lacks are `None`.
+
+    :param structure: The structure whose JSON objects to project, e.g. `User` or `Status`.
+    :param fields: The names or dotted paths of the fields to extract.
+    :return: A function projecting a JSON object into a named tuple of the fields.
+    """
+
+    for path in fields:
+        _validate_path(structure=structure, path=path)
+
+    projection_type = namedtuple(f'{structure.__name__}Projection', [path.replace('.', '_') for path in fields])
+
+    def get_path(json_object: Optional[dict[str, Any]], names: list[str]) -> Any:
+        for name in names:
+            if json_object is None:
+                return None
+            json_object = json_object.get(name)
+        return json_object
+
+    split_paths: list[list[str]] = [path.split('.') for path in fields]
+
+    if all(len(names) == 1 for names in split_paths):
+        def project(json_object: dict[str, Any]) -> NamedTuple:
+            return projection_type._make(json_object.get(name) for name in fields)
+    else:
+        def project(json_object: dict[str, Any]) -> NamedTuple:
+            return projection_type._make(get_path(json_object=json_object, names=names) for names in split_paths)
+
+    return project
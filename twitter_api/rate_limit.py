@@ -0,0 +1,392 @@
+from __future__ import annotations
+
+from typing import Optional, Callable, Awaitable, Hashable, Any, Iterable, Mapping
+from dataclasses import dataclass
+from collections import defaultdict
+from asyncio import Lock, sleep as asyncio_sleep
+from random import uniform
+from time import time, perf_counter
+
+from httpx import AsyncClient as HTTPXAsyncClient, Request, Response, URL, Headers, Auth
+
+from twitter_api.calls import API_VERSION
+from twitter_api.token_pool import TokenPool
+from twitter_api.stats import RequestStats
+
+# The methods of the requests that may be retried after a server error. A request of another method, e.g. a POST
+# creating a friendship, may have taken effect before the error, so that retrying it could perform it twice.
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+
+
+def endpoint_from_url(url: URL) -> str:
+    """
+    Derive the name of the API endpoint that a URL refers to, as used in the rate limit documentation.
+
+    For example, `https://api.twitter.com/1.1/friends/ids.json` refers to `friends/ids`.
+
+    :param url: The URL of a request to the API.
+    :return: The name of the endpoint.
+    """
+
+    endpoint: str = url.path.lstrip('/')
+    endpoint = endpoint.removeprefix(f'{API_VERSION}/')
+    return endpoint.removesuffix('.json')
+
+
+@dataclass
+class RateLimitBudget:
+    """
+    The state of the rate limit window of an endpoint, as reported by the `x-rate-limit-*` response headers.
+
+    https://developer.twitter.com/en/docs/twitter-api/v1/rate-limits
+    """
+
+    limit: Optional[int] = None
+    remaining: Optional[int] = None
+    # The Unix time at which the current window resets.
+    reset: Optional[float] = None
+    # The number of requests that have been sent but not yet responded to.
+    num_in_flight: int = 0
+
+    def is_exhausted(self, now: float) -> bool:
+        """
+        Determine whether sending another request in the current window would exceed the budget.
+
+        :param now: The current Unix time.
+        :return: Whether the budget is exhausted.
+        """
+
+        if self.remaining is None or self.reset is None or now >= self.reset:
+            return False
+
+        return self.remaining - self.num_in_flight <= 0
+
+
+class RateLimitScheduler:
+    """
+    Pace requests according to the per-endpoint rate limit budgets reported by the API, and retry requests that are
+    rejected because of the rate limit or -- if their methods are idempotent -- that fail because of a server error.
+
+    A request to an endpoint whose budget is exhausted is held back until the window resets; requests to the same
+    endpoint queue up behind it. The budgets are keyed by endpoint and, optionally, by credential, as each access
+    token has windows of its own.
+
+    The clock and sleep functions can be replaced, e.g. to test the scheduler against a local fake server without
+    waiting for real windows to reset.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        reset_margin: float = 1.0,
+        clock: Callable[[], float] = time,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio_sleep
+    ):
+        """
+        :param max_retries: The maximum number of times to retry a request that was rejected or failed.
+        :param backoff_base: The base delay in seconds of the exponential backoff between retries.
+        :param backoff_max: The maximum delay in seconds between retries.
+        :param reset_margin: A number of seconds to wait in addition to the reported reset time, to account for
+            clock skew.
+        :param clock: A function returning the current Unix time.
+        :param sleep: A coroutine function sleeping for a number of seconds.
+        """
+
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.reset_margin = reset_margin
+
+        self._clock = clock
+        self._sleep = sleep
+
+        self.budgets: dict[tuple[Optional[Hashable], str], RateLimitBudget] = defaultdict(RateLimitBudget)
+        self._locks: dict[tuple[Optional[Hashable], str], Lock] = defaultdict(Lock)
+        # The number of credential selections made, by which credentials with equal budgets are taken in turn.
+        self._num_selections = 0
+
+    def budget(self, endpoint: str, credential: Optional[Hashable] = None) -> RateLimitBudget:
+        """
+        Retrieve the rate limit budget of an endpoint.
+
+        :param endpoint: The name of the endpoint, e.g. `friends/ids`.
+        :param credential: A key identifying the credential whose budget to retrieve.
+        :return: The rate limit budget of the endpoint.
+        """
+
+        return self.budgets[(credential, endpoint)]
+
+    def select_credential(self, endpoint: str, credentials: Iterable[Hashable]) -> Hashable:
+        """
+        Select the credential with the most remaining budget for an endpoint.
+
+        Credentials whose budget is unknown, e.g. because they have not been used yet, are preferred. If the budgets
+        of all credentials are exhausted, the one whose window resets first is selected. Credentials with equal
+        budgets are selected in turn, so that concurrent first requests are spread over all of them.
+
+        :param endpoint: The name of the endpoint.
+        :param credentials: Keys identifying the credentials from which to select.
+        :return: The key of the selected credential.
+        """
+
+        now: float = self._clock()
+
+        def sort_key(credential: Hashable) -> tuple[bool, float, float]:
+            budget = self.budget(endpoint=endpoint, credential=credential)
+            if budget.remaining is None or budget.reset is None or now >= budget.reset:
+                return True, float('inf'), 0.0
+            return (
+                not budget.is_exhausted(now=now),
+                budget.remaining - budget.num_in_flight,
+                -budget.reset
+            )
+
+        candidates: list[Hashable] = list(credentials)
+        offset: int = self._num_selections % len(candidates)
+        self._num_selections += 1
+
+        # `max` selects the first of equal credentials, so that rotating the candidates breaks ties round-robin.
+        return max(candidates[offset:] + candidates[:offset], key=sort_key)
+
+    async def acquire(
+        self,
+        endpoint: str,
+        credential: Optional[Hashable] = None,
+        stats: Optional[RequestStats] = None
+    ) -> None:
+        """
+        Wait until a request to an endpoint can be sent without exceeding its budget, and reserve a slot for it.
+
+        Each call must be followed by a call to `release` once the request has been responded to.
+
+        :param endpoint: The name of the endpoint.
+        :param credential: A key identifying the credential with which the request is to be sent.
+        :param stats: A statistics collector in which to record the wait for the window to reset, as one sleep per call.
+        :return: None
+        """
+
+        key = (credential, endpoint)
+        budget = self.budgets[key]
+
+        start: float = self._clock()
+        # A caller finding the budget exhausted waits for the window to reset, if not in its own sleep then queued for
+        # the lock behind a caller sleeping.
+        waits_for_reset: bool = budget.is_exhausted(now=start)
+
+        async with self._locks[key]:
+            while budget.is_exhausted(now=self._clock()):
+                waits_for_reset = True
+                await self._sleep(budget.reset - self._clock() + self.reset_margin)
+
+            if waits_for_reset and stats is not None:
+                stats.record_rate_limit_sleep(endpoint=endpoint, duration=self._clock() - start)
+
+            if budget.reset is not None and self._clock() >= budget.reset:
+                # The window has reset; the new budget is unknown until the next response.
+                budget.remaining = None
+                budget.reset = None
+
+            budget.num_in_flight += 1
+
+    def release(self, endpoint: str, credential: Optional[Hashable] = None) -> None:
+        """
+        Release the slot reserved for a request by `acquire`.
+
+        :param endpoint: The name of the endpoint.
+        :param credential: A key identifying the credential with which the request was sent.
+        :return: None
+        """
+
+        self.budgets[(credential, endpoint)].num_in_flight -= 1
+
+    def update(
+        self,
+        endpoint: str,
+        status_code: int,
+        headers: Headers,
+        credential: Optional[Hashable] = None
+    ) -> None:
+        """
+        Update the budget of an endpoint from the rate limit headers of a response.
+
+        :param endpoint: The name of the endpoint.
+        :param status_code: The status code of the response.
+        :param headers: The headers of the response.
+        :param credential: A key identifying the credential with which the request was sent.
+        :return: None
+        """
+
+        budget = self.budgets[(credential, endpoint)]
+
+        if (remaining := headers.get('x-rate-limit-remaining')) is not None:
+            reset = float(headers['x-rate-limit-reset'])
+            # Responses may arrive out of order; within a window, the lowest reported value is the most recent.
+            if reset == budget.reset and budget.remaining is not None:
+                budget.remaining = min(budget.remaining, int(remaining))
+            else:
+                budget.remaining = int(remaining)
+            budget.reset = reset
+            if (limit := headers.get('x-rate-limit-limit')) is not None:
+                budget.limit = int(limit)
+
+        if status_code == 429 and budget.reset is not None:
+            budget.remaining = 0
+
+    def retry_delay(
+        self,
+        endpoint: str,
+        response: Response,
+        attempt: int,
+        credential: Optional[Hashable] = None
+    ) -> float:
+        """
+        Determine how long to wait before retrying a request.
+
+        A request rejected because of the rate limit is retried immediately if the window's reset time is known, as
+        `acquire` then waits for it; otherwise, an exponential backoff with jitter is used.
+
+        :param endpoint: The name of the endpoint.
+        :param response: The response to the request to be retried.
+        :param attempt: The number of retries that have been performed so far.
+        :param credential: A key identifying the credential with which the request was sent.
+        :return: The number of seconds to wait.
+        """
+
+        if response.status_code == 429:
+            reset: Optional[float] = self.budget(endpoint=endpoint, credential=credential).reset
+            if reset is not None and reset > self._clock():
+                return 0.0
+            if (retry_after := response.headers.get('retry-after', '')).isdigit():
+                return float(retry_after)
+
+        return uniform(0.5, 1.0) * min(self.backoff_max, self.backoff_base * 2 ** attempt)
+
+    @staticmethod
+    def should_retry(request: Request, response: Response) -> bool:
+        """
+        Determine whether a request should be retried given its response.
+
+        A request rejected because of the rate limit was not performed, and is always retried. A request that failed
+        because of a server error is only retried if its method is idempotent.
+
+        :param request: The request.
+        :param response: The response to the request.
+        :return: Whether the request was rejected because of the rate limit, or failed because of a server error and
+            is idempotent.
+        """
+
+        if response.status_code == 429:
+            return True
+
+        return response.status_code >= 500 and request.method in IDEMPOTENT_METHODS
+
+    async def send(
+        self,
+        send: Callable[..., Awaitable[Response]],
+        request: Request,
+        credential: Optional[Hashable] = None,
+        auths: Optional[Mapping[Hashable, Auth]] = None,
+        stats: Optional[RequestStats] = None,
+        **kwargs
+    ) -> Response:
+        """
+        Send a request within the rate limit budget of its endpoint, retrying it if it is rejected or fails.
+
+        :param send: A coroutine function sending a request, e.g. `httpx.AsyncClient.send`.
+        :param request: The request to send.
+        :param credential: A key identifying the credential with which the request is sent.
+        :param auths: Auth handlers keyed by credential, from which the one with the most remaining budget is
+            selected for each attempt. Overrides `credential`.
+        :param stats: A statistics collector in which to record the attempts, retries and rate limit waits.
+        :param kwargs: Keyword arguments to pass to `send`.
+        :return: The response to the last attempt of sending the request.
+        """
+
+        endpoint: str = endpoint_from_url(url=request.url)
+
+        attempt = 0
+        while True:
+            if auths:
+                credential = self.select_credential(endpoint=endpoint, credentials=auths.keys())
+                kwargs['auth'] = auths[credential]
+
+            await self.acquire(endpoint=endpoint, credential=credential, stats=stats)
+            try:
+                start: float = perf_counter()
+                response: Response = await send(request, **kwargs)
+            finally:
+                self.release(endpoint=endpoint, credential=credential)
+
+            if stats is not None:
+                stats.record_request(
+                    endpoint=endpoint,
+                    latency=perf_counter() - start,
+                    num_bytes=response.num_bytes_downloaded,
+                    status_code=response.status_code
+                )
+
+            self.update(
+                endpoint=endpoint,
+                status_code=response.status_code,
+                headers=response.headers,
+                credential=credential
+            )
+
+            if attempt >= self.max_retries or not self.should_retry(request=request, response=response):
+                return response
+
+            delay: float = self.retry_delay(
+                endpoint=endpoint,
+                response=response,
+                attempt=attempt,
+                credential=credential
+            )
+            if stats is not None:
+                stats.record_retry(endpoint=endpoint, delay=delay)
+            await response.aclose()
+            await self._sleep(delay)
+            attempt += 1
+
+
+class RateLimitedAsyncClient(HTTPXAsyncClient):
+    """
+    An HTTP client whose requests are sent through a rate limit scheduler.
+
+    As the functions in `twitter_api.calls` only use the client's `get` and `post` methods, passing an instance of
+    this client to them is enough to have them paced and retried. If the client has a token pool, each request is
+    signed with the pool's token that has the most remaining budget for the request's endpoint. If the client has a
+    statistics collector, the requests are recorded in it, and so is the time the calls spend decoding the responses.
+    """
+
+    def __init__(
+        self,
+        *args,
+        rate_limit_scheduler: Optional[RateLimitScheduler] = None,
+        token_pool: Optional[TokenPool] = None,
+        request_stats: Optional[RequestStats] = None,
+        **kwargs
+    ):
+        """
+        :param args: Positional arguments to pass to `httpx.AsyncClient`.
+        :param rate_limit_scheduler: The scheduler through which to send requests. A scheduler can be shared by
+            several clients.
+        :param token_pool: A pool of access tokens with which to sign the requests, instead of the client's auth.
+        :param request_stats: A statistics collector in which to record the requests.
+        :param kwargs: Keyword arguments to pass to `httpx.AsyncClient`.
+        """
+
+        super().__init__(*args, **kwargs)
+        self.rate_limit_scheduler: RateLimitScheduler = rate_limit_scheduler or RateLimitScheduler()
+        self.token_pool: Optional[TokenPool] = token_pool
+        self.request_stats: Optional[RequestStats] = request_stats
+
+    async def send(self, request: Request, **kwargs) -> Response:
+        return await self.rate_limit_scheduler.send(
+            send=super().send,
+            request=request,
+            auths=self.token_pool.auths if self.token_pool is not None else None,
+            stats=self.request_stats,
+            **kwargs
+        )
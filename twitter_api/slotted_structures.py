@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from typing import Optional, Any, ClassVar, Callable, Union, get_type_hints, get_origin, get_args
+from sys import intern, modules
+
+# The decoders of the fields of each structure, keyed by field name; `None` for fields whose values are kept as is.
+_FIELD_DECODERS: dict[type, dict[str, Optional[Callable[[Any], Any]]]] = {}
+
+
+def _intern(value: Any) -> Any:
+    return intern(value) if isinstance(value, str) else value
+
+
+class SlottedJsonDataclass:
+    """
+    A base class of dataclasses with `__slots__`, decodable from JSON objects.
+
+    Instances have no `__dict__`, which makes them considerably smaller than those of the structures in
+    `twitter_api.structures`. The values of the fields listed in `interned_field_names` are interned, so that the
+    few distinct values that these fields take are shared by all instances rather than stored once per instance.
+    """
+
+    __slots__ = ()
+
+    interned_field_names: ClassVar[frozenset[str]] = frozenset()
+
+    @classmethod
+    def _field_decoders(cls) -> dict[str, Optional[Callable[[Any], Any]]]:
+        if (field_decoders := _FIELD_DECODERS.get(cls)) is not None:
+            return field_decoders
+
+        type_hints: dict[str, Any] = get_type_hints(cls, vars(modules[cls.__module__]))
+
+        field_decoders = {}
+        for field in fields(cls):
+            field_type: Any = type_hints[field.name]
+
+            if get_origin(field_type) is Union:
+                field_type = next(arg for arg in get_args(field_type) if arg is not type(None))
+
+            if get_origin(field_type) is list:
+                (item_type,) = get_args(field_type)
+                if isinstance(item_type, type) and issubclass(item_type, SlottedJsonDataclass):
+                    field_decoders[field.name] = lambda value, item_type=item_type: [
+                        item_type.from_json(json_object=item) for item in value
+                    ]
+                    continue
+
+            if isinstance(field_type, type) and issubclass(field_type, SlottedJsonDataclass):
+                field_decoders[field.name] = lambda value, field_type=field_type: field_type.from_json(
+                    json_object=value
+                )
+            elif field.name in cls.interned_field_names:
+                field_decoders[field.name] = _intern
+            else:
+                field_decoders[field.name] = None
+
+        _FIELD_DECODERS[cls] = field_decoders
+        return field_decoders
+
+    @classmethod
+    def from_json(cls, json_object: dict[str, Any]):
+        """
+        Decode a JSON object, as returned by the API, ignoring keys that are not fields of the structure.
+
+        :param json_object: The JSON object to decode.
+        :return: An instance of the structure.
+        """
+
+        kwargs: dict[str, Any] = {}
+
+        for name, decode in cls._field_decoders().items():
+            if name not in json_object:
+                continue
+
+            value: Any = json_object[name]
+            kwargs[name] = decode(value) if value is not None and decode is not None else value
+
+        return cls(**kwargs)
+
+
+@dataclass(slots=True)
+class SlottedUrl(SlottedJsonDataclass):
+    url: str
+    expanded_url: str
+    display_url: str
+    indices: list[int]
+
+
+@dataclass(slots=True)
+class SlottedUserUrl(SlottedJsonDataclass):
+    urls: list[SlottedUrl]
+
+
+@dataclass(slots=True)
+class SlottedDescription(SlottedJsonDataclass):
+    urls: list[SlottedUrl]
+
+
+@dataclass(slots=True)
+class SlottedUserEntities(SlottedJsonDataclass):
+    description: SlottedDescription
+    url: Optional[SlottedUserUrl] = None
+
+
+@dataclass(slots=True)
+class SlottedUserMention(SlottedJsonDataclass):
+    screen_name: str
+    name: str
+    id: int
+    id_str: str
+    indices: list[int]
+
+
+@dataclass(slots=True)
+class SlottedMediaSizeSpecifier(SlottedJsonDataclass):
+    interned_field_names = frozenset({'resize'})
+
+    w: str
+    h: str
+    resize: str
+
+
+@dataclass(slots=True)
+class SlottedMediaSize(SlottedJsonDataclass):
+    thumb: SlottedMediaSizeSpecifier
+    media: SlottedMediaSizeSpecifier
+    large: SlottedMediaSizeSpecifier
+    small: SlottedMediaSizeSpecifier
+
+
+@dataclass(slots=True)
+class SlottedMedia(SlottedJsonDataclass):
+    interned_field_names = frozenset({'type'})
+
+    id: int
+    id_str: str
+    indices: list[int]
+    media_url: str
+    media_url_https: str
+    url: str
+    display_url: str
+    expanded_url: str
+    type: str
+    sizes: SlottedMediaSize
+
+
+@dataclass(slots=True)
+class SlottedExtendedEntities(SlottedJsonDataclass):
+    media: list[SlottedMedia]
+
+
+@dataclass(slots=True)
+class SlottedStatusEntities(SlottedJsonDataclass):
+    hashtags: list[Any]
+    symbols: list[Any]
+    user_mentions: list[SlottedUserMention]
+    urls: list[Any]
+    media: Optional[list[SlottedMedia]] = None
+
+
+@dataclass(slots=True)
+class SlottedStatus(SlottedJsonDataclass):
+    interned_field_names = frozenset({'source', 'lang'})
+
+    created_at: str
+    id: int
+    id_str: str
+    truncated: bool
+    entities: SlottedStatusEntities
+    source: str
+    in_reply_to_status_id: Any
+    in_reply_to_status_id_str: Any
+    in_reply_to_user_id: Any
+    in_reply_to_user_id_str: Any
+    in_reply_to_screen_name: Any
+    geo: Any
+    coordinates: Any
+    place: Any
+    contributors: Any
+    is_quote_status: bool
+    retweet_count: int
+    favorite_count: int
+    favorited: bool
+    retweeted: bool
+    lang: str
+    user: Optional[SlottedUser] = None
+    possibly_sensitive: Optional[bool] = None
+    retweeted_status: Optional[SlottedStatus] = None
+    quoted_status_id: Optional[int] = None
+    quoted_status_id_str: Optional[str] = None
+    quoted_status: Optional[SlottedStatus] = None
+    extended_entities: Optional[SlottedExtendedEntities] = None
+    text: Optional[str] = None
+    full_text: Optional[str] = None
+    display_text_range: Optional[list[int]] = None
+    quoted_status_permalink: Optional[str] = None
+
+
+@dataclass(slots=True)
+class SlottedUser(SlottedJsonDataclass):
+    interned_field_names = frozenset({
+        'lang',
+        'time_zone',
+        'translator_type',
+        'profile_background_color',
+        'profile_background_image_url',
+        'profile_background_image_url_https',
+        'profile_link_color',
+        'profile_sidebar_border_color',
+        'profile_sidebar_fill_color',
+        'profile_text_color'
+    })
+
+    id: int
+    id_str: str
+    name: str
+    screen_name: str
+    location: str
+    description: str
+    url: str
+    entities: SlottedUserEntities
+    protected: bool
+    followers_count: int
+    friends_count: int
+    listed_count: int
+    created_at: str
+    favourites_count: int
+    utc_offset: Any
+    time_zone: Any
+    geo_enabled: bool
+    verified: bool
+    statuses_count: int
+    lang: Any
+    contributors_enabled: bool
+    is_translator: bool
+    is_translation_enabled: bool
+    profile_background_color: str
+    profile_background_image_url: str
+    profile_background_image_url_https: str
+    profile_background_tile: bool
+    profile_image_url: str
+    profile_image_url_https: str
+    profile_link_color: str
+    profile_sidebar_border_color: str
+    profile_sidebar_fill_color: str
+    profile_text_color: str
+    profile_use_background_image: bool
+    has_extended_profile: bool
+    default_profile: bool
+    default_profile_image: bool
+    following: bool
+    follow_request_sent: bool
+    notifications: bool
+    translator_type: str
+    status: Optional[SlottedStatus] = None
+    profile_banner_url: Optional[str] = None
+    profile_location: Optional[str] = None
+    suspended: Optional[bool] = None
+    needs_phone_verification: Optional[bool] = None
+    muting: Optional[bool] = None
+    withheld_in_countries: Optional[list[Any]] = None
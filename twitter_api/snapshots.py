@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+from typing import Optional, Union
+from dataclasses import dataclass, field
+from array import array
+from pathlib import Path
+
+from httpx import AsyncClient as HTTPXAsyncClient
+
+from twitter_api.calls import iter_follower_ids, iter_friend_ids, lookup_users
+from twitter_api.cache import ResponseCache, user_key
+from twitter_api.ids import ID_TYPECODE, sorted_id_array, diff_sorted_ids
+from twitter_api.checkpoint import PaginationCheckpoint
+from twitter_api.structures import User
+
+
+class SnapshotStore:
+    """
+    A directory of snapshots of the follower or friend IDs of accounts.
+
+    Each snapshot is stored in a file of its own as a sorted array of signed 64-bit integers in the machine's byte
+    order, i.e. eight bytes per ID.
+    """
+
+    def __init__(self, directory: Union[Path, str]):
+        """
+        :param directory: The path of the directory in which to store the snapshots. It is created if it does not
+            exist.
+        """
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, account_key: str, relation: str) -> Path:
+        return self.directory / f'{relation}-{account_key}.ids'
+
+    def load(self, account_key: str, relation: str = 'followers') -> Optional[array]:
+        """
+        Load the snapshot of an account.
+
+        :param account_key: A key identifying the account, as made by `twitter_api.cache.user_key`.
+        :param relation: The relation of the snapshot, either `followers` or `friends`.
+        :return: The sorted array of IDs of the snapshot, or `None` if there is no snapshot.
+        """
+
+        path: Path = self._path(account_key=account_key, relation=relation)
+
+        ids = array(ID_TYPECODE)
+        try:
+            ids.frombytes(path.read_bytes())
+        except FileNotFoundError:
+            return None
+
+        return ids
+
+    def save(self, account_key: str, ids: array, relation: str = 'followers') -> None:
+        """
+        Save the snapshot of an account, replacing an earlier one atomically.
+
+        :param account_key: A key identifying the account, as made by `twitter_api.cache.user_key`.
+        :param ids: The sorted array of IDs of the snapshot.
+        :param relation: The relation of the snapshot, either `followers` or `friends`.
+        :return: None
+        """
+
+        path: Path = self._path(account_key=account_key, relation=relation)
+
+        temporary_path = path.with_name(f'{path.name}.tmp')
+        temporary_path.write_bytes(ids.tobytes())
+        temporary_path.replace(path)
+
+
+@dataclass
+class IdsDiff:
+    added_ids: array = field(default_factory=lambda: array(ID_TYPECODE))
+    removed_ids: array = field(default_factory=lambda: array(ID_TYPECODE))
+    added_users: tuple[User, ...] = ()
+    removed_users: tuple[User, ...] = ()
+    # Whether there was no earlier snapshot to compare with, in which case the diff is empty.
+    is_initial: bool = False
+
+
+async def diff_ids(
+    http_client: HTTPXAsyncClient,
+    snapshot_store: SnapshotStore,
+    user_id: Optional[int] = None,
+    screen_name: Optional[str] = None,
+    relation: str = 'followers',
+    hydrate: bool = True,
+    max_concurrency: int = 10,
+    cache: Optional[ResponseCache] = None,
+    checkpoint: Optional[PaginationCheckpoint] = None
+) -> IdsDiff:
+    """
+    Compute which users followed or unfollowed an account since its last snapshot, and record a new snapshot.
+
+    Only the users whose IDs were added or removed are looked up. The IDs themselves are always retrieved anew,
+    bypassing the cache, which would otherwise hide recent changes.
+
+    :param http_client: The HTTP client with which to perform the requests.
+    :param snapshot_store: The store of the snapshots to compare with and update.
+    :param user_id: The user ID of the account whose followers or friends to diff.
+    :param screen_name: The screen name of the account whose followers or friends to diff.
+    :param relation: Either `followers` to diff the account's followers or `friends` to diff the account's friends.
+    :param hydrate: Whether to look up the users whose IDs were added or removed.
+    :param max_concurrency: The maximum number of lookup requests to have in flight at the same time.
+    :param cache: A cache from which to serve the looked-up users if present and in which to store them otherwise.
+    :param checkpoint: A checkpoint from which to resume the retrieval of the IDs and in which to record its pages.
+    :return: The IDs, and possibly the users, that were added and removed.
+    """
+
+    if relation == 'followers':
+        iter_ids = iter_follower_ids
+    elif relation == 'friends':
+        iter_ids = iter_friend_ids
+    else:
+        raise ValueError(f'Unsupported relation: {relation}')
+
+    account_key: str = user_key(user_id=user_id, screen_name=screen_name)
+
+    ids: array = checkpoint.load_ids() if checkpoint is not None else array(ID_TYPECODE)
+    async for ids_result in iter_ids(
+        http_client=http_client,
+        user_id=user_id,
+        screen_name=screen_name,
+        checkpoint=checkpoint
+    ):
+        ids.extend(ids_result.ids)
+
+    new_ids: array = sorted_id_array(ids=ids)
+    old_ids: Optional[array] = snapshot_store.load(account_key=account_key, relation=relation)
+
+    if old_ids is None:
+        snapshot_store.save(account_key=account_key, ids=new_ids, relation=relation)
+        return IdsDiff(is_initial=True)
+
+    added_ids, removed_ids = diff_sorted_ids(old_ids=old_ids, new_ids=new_ids)
+
+    ids_diff = IdsDiff(added_ids=added_ids, removed_ids=removed_ids)
+
+    if hydrate:
+        ids_diff.added_users = await lookup_users(
+            http_client=http_client,
+            user_ids=added_ids,
+            max_concurrency=max_concurrency,
+            cache=cache
+        )
+        ids_diff.removed_users = await lookup_users(
+            http_client=http_client,
+            user_ids=removed_ids,
+            max_concurrency=max_concurrency,
+            cache=cache
+        )
+
+    # Saved only once the diff is complete, so that a failed lookup does not lose the changes.
+    snapshot_store.save(account_key=account_key, ids=new_ids, relation=relation)
+
+    return ids_diff
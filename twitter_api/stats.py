@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+from typing import Optional, Any, ContextManager, Iterator, Union
+from array import array
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from enum import Enum
+from json import dumps as json_dumps
+from math import ceil
+from random import randrange
+from time import perf_counter
+
+# The latency quantiles that are reported per endpoint.
+LATENCY_QUANTILES: tuple[float, ...] = (0.5, 0.9, 0.99)
+
+# The number of latencies sampled per endpoint from which the quantiles are computed.
+LATENCY_SAMPLE_SIZE = 10_000
+
+PROMETHEUS_METRIC_PREFIX = 'twitter_api'
+
+
+class StatsFormat(Enum):
+    SUMMARY = 'summary'
+    JSON = 'json'
+    PROMETHEUS = 'prometheus'
+
+
+@dataclass
+class EndpointStats:
+    """
+    The statistics of the requests to one endpoint.
+
+    Every attempt of sending a request counts as a request, so a request that was retried twice counts three times.
+    """
+
+    num_requests: int = 0
+    # The number of requests that were retried because of a rate limit rejection or a server error.
+    num_retries: int = 0
+    # The number of times a request waited for the rate limit window of the endpoint to reset.
+    num_rate_limit_sleeps: int = 0
+    rate_limit_sleep_time: float = 0.0
+    # The number of seconds spent waiting between retries.
+    retry_sleep_time: float = 0.0
+    num_response_bytes: int = 0
+    # The number of seconds spent parsing response bodies and decoding them into structures.
+    decode_time: float = 0.0
+    status_codes: Counter[int] = field(default_factory=Counter)
+    # The total and the maximum of the number of seconds from sending a request until its response body was received.
+    latency_sum: float = 0.0
+    latency_max: Optional[float] = None
+    # A uniform sample of at most `LATENCY_SAMPLE_SIZE` latencies, so that the memory taken stays bounded however
+    # many requests are made, e.g. by a long-running server.
+    latencies: array = field(default_factory=lambda: array('d'))
+
+    def record_latency(self, latency: float) -> None:
+        """
+        Record the latency of a request, by reservoir sampling.
+
+        The request must already be counted in `num_requests`.
+
+        :param latency: The number of seconds from sending the request until its response body was received.
+        :return: None
+        """
+
+        self.latency_sum += latency
+        self.latency_max = latency if self.latency_max is None else max(self.latency_max, latency)
+
+        if len(self.latencies) < LATENCY_SAMPLE_SIZE:
+            self.latencies.append(latency)
+        elif (index := randrange(self.num_requests)) < LATENCY_SAMPLE_SIZE:
+            self.latencies[index] = latency
+
+    def latency_quantiles(self, quantiles: tuple[float, ...] = LATENCY_QUANTILES) -> dict[float, Optional[float]]:
+        """
+        Compute quantiles of the request latencies, using the nearest-rank method on the sample of the latencies.
+
+        :param quantiles: The quantiles to compute, between 0 and 1.
+        :return: The latencies in seconds keyed by quantile; `None` if there were no requests.
+        """
+
+        sorted_latencies = sorted(self.latencies)
+        if not sorted_latencies:
+            return {quantile: None for quantile in quantiles}
+
+        return {
+            quantile: sorted_latencies[max(0, ceil(quantile * len(sorted_latencies)) - 1)]
+            for quantile in quantiles
+        }
+
+
+class RequestStats:
+    """
+    A collector of per-endpoint request statistics: request counts, latencies, response sizes, decoding time, retries
+    and rate limit sleeps.
+
+    A collector is attached to a `RateLimitedAsyncClient`, whose scheduler records the requests, retries and sleeps;
+    the functions in `twitter_api.calls` record the time spent decoding the responses. The statistics can be exported
+    as JSON, in the Prometheus text exposition format, or as a summary table.
+    """
+
+    def __init__(self):
+        self.endpoints: defaultdict[str, EndpointStats] = defaultdict(EndpointStats)
+
+    def record_request(self, endpoint: str, latency: float, num_bytes: int, status_code: int) -> None:
+        """
+        Record a request that was responded to.
+
+        :param endpoint: The name of the endpoint, e.g. `friends/ids`.
+        :param latency: The number of seconds from sending the request until its response body was received.
+        :param num_bytes: The number of bytes of the response body.
+        :param status_code: The status code of the response.
+        :return: None
+        """
+
+        endpoint_stats = self.endpoints[endpoint]
+        endpoint_stats.num_requests += 1
+        endpoint_stats.record_latency(latency=latency)
+        endpoint_stats.num_response_bytes += num_bytes
+        endpoint_stats.status_codes[status_code] += 1
+
+    def record_retry(self, endpoint: str, delay: float) -> None:
+        """
+        Record the retry of a request.
+
+        :param endpoint: The name of the endpoint.
+        :param delay: The number of seconds waited before the retry.
+        :return: None
+        """
+
+        endpoint_stats = self.endpoints[endpoint]
+        endpoint_stats.num_retries += 1
+        endpoint_stats.retry_sleep_time += delay
+
+    def record_rate_limit_sleep(self, endpoint: str, duration: float) -> None:
+        """
+        Record a wait for the rate limit window of an endpoint to reset.
+
+        :param endpoint: The name of the endpoint.
+        :param duration: The number of seconds waited.
+        :return: None
+        """
+
+        endpoint_stats = self.endpoints[endpoint]
+        endpoint_stats.num_rate_limit_sleeps += 1
+        endpoint_stats.rate_limit_sleep_time += duration
+
+    @contextmanager
+    def time_decode(self, endpoint: str) -> Iterator[None]:
+        """
+        Measure the time spent decoding a response of an endpoint within the context.
+
+        :param endpoint: The name of the endpoint.
+        :return: A context manager.
+        """
+
+        start: float = perf_counter()
+        try:
+            yield
+        finally:
+            self.endpoints[endpoint].decode_time += perf_counter() - start
+
+    def to_json_object(self) -> dict[str, Any]:
+        """
+        Export the statistics as a JSON object, keyed by endpoint.
+
+        :return: A JSON-serializable dictionary.
+        """
+
+        return {
+            endpoint: dict(
+                num_requests=endpoint_stats.num_requests,
+                status_codes={str(status_code): count for status_code, count in endpoint_stats.status_codes.items()},
+                latency_seconds={
+                    f'p{quantile * 100:g}': latency
+                    for quantile, latency in endpoint_stats.latency_quantiles().items()
+                } | dict(sum=endpoint_stats.latency_sum, max=endpoint_stats.latency_max),
+                num_response_bytes=endpoint_stats.num_response_bytes,
+                decode_seconds=endpoint_stats.decode_time,
+                num_retries=endpoint_stats.num_retries,
+                retry_sleep_seconds=endpoint_stats.retry_sleep_time,
+                num_rate_limit_sleeps=endpoint_stats.num_rate_limit_sleeps,
+                rate_limit_sleep_seconds=endpoint_stats.rate_limit_sleep_time
+            )
+            for endpoint, endpoint_stats in sorted(self.endpoints.items())
+        }
+
+    def to_prometheus(self, prefix: str = PROMETHEUS_METRIC_PREFIX) -> str:
+        """
+        Export the statistics in the Prometheus text exposition format, labelled by endpoint.
+
+        https://prometheus.io/docs/instrumenting/exposition_formats/
+
+        :param prefix: The prefix of the metric names.
+        :return: The text of the metrics.
+        """
+
+        endpoints = sorted(self.endpoints.items())
+        lines: list[str] = []
+
+        def add_metric(name: str, metric_type: str, help_text: str, samples: list[tuple[str, str, float]]) -> None:
+            lines.append(f'# HELP {prefix}_{name} {help_text}')
+            lines.append(f'# TYPE {prefix}_{name} {metric_type}')
+            lines.extend(f'{prefix}_{name}{suffix}{{{labels}}} {value!r}' for suffix, labels, value in samples)
+
+        add_metric(
+            name='requests_total',
+            metric_type='counter',
+            help_text='The number of requests sent, including retries.',
+            samples=[
+                ('', f'endpoint="{endpoint}",code="{status_code}"', float(count))
+                for endpoint, endpoint_stats in endpoints
+                for status_code, count in sorted(endpoint_stats.status_codes.items())
+            ]
+        )
+        add_metric(
+            name='request_duration_seconds',
+            metric_type='summary',
+            help_text='The latency of the requests, until the response body was received.',
+            samples=[
+                sample
+                for endpoint, endpoint_stats in endpoints
+                for sample in [
+                    *(
+                        ('', f'endpoint="{endpoint}",quantile="{quantile:g}"', latency)
+                        for quantile, latency in endpoint_stats.latency_quantiles().items()
+                        if latency is not None
+                    ),
+                    ('_sum', f'endpoint="{endpoint}"', endpoint_stats.latency_sum),
+                    ('_count', f'endpoint="{endpoint}"', float(endpoint_stats.num_requests))
+                ]
+            ]
+        )
+
+        for name, attribute, metric_type, help_text in [
+            ('response_bytes_total', 'num_response_bytes', 'counter', 'The number of response body bytes received.'),
+            ('decode_seconds_total', 'decode_time', 'counter', 'The time spent decoding responses.'),
+            ('retries_total', 'num_retries', 'counter', 'The number of retried requests.'),
+            ('retry_sleep_seconds_total', 'retry_sleep_time', 'counter', 'The time spent waiting between retries.'),
+            (
+                'rate_limit_sleeps_total',
+                'num_rate_limit_sleeps',
+                'counter',
+                'The number of waits for a rate limit window to reset.'
+            ),
+            (
+                'rate_limit_sleep_seconds_total',
+                'rate_limit_sleep_time',
+                'counter',
+                'The time spent waiting for rate limit windows to reset.'
+            )
+        ]:
+            add_metric(
+                name=name,
+                metric_type=metric_type,
+                help_text=help_text,
+                samples=[
+                    ('', f'endpoint="{endpoint}"', float(getattr(endpoint_stats, attribute)))
+                    for endpoint, endpoint_stats in endpoints
+                ]
+            )
+
+        return '\n'.join(lines) + '\n'
+
+    def summary(self) -> str:
+        """
+        Format the statistics as a table with one row per endpoint.
+
+        :return: The text of the table.
+        """
+
+        header = (
+            f'{"endpoint":<24} {"requests":>8} {"p50 ms":>8} {"p90 ms":>8} {"p99 ms":>8} {"bytes":>12} '
+            f'{"decode ms":>10} {"retries":>7} {"rl sleeps":>9} {"rl sleep s":>10}'
+        )
+        rows: list[str] = [header]
+
+        def format_milliseconds(seconds: Optional[float]) -> str:
+            return f'{seconds * 1000:.1f}' if seconds is not None else '-'
+
+        for endpoint, endpoint_stats in sorted(self.endpoints.items()):
+            quantiles = endpoint_stats.latency_quantiles(quantiles=(0.5, 0.9, 0.99))
+            rows.append(
+                f'{endpoint:<24} {endpoint_stats.num_requests:>8} {format_milliseconds(quantiles[0.5]):>8} '
+                f'{format_milliseconds(quantiles[0.9]):>8} {format_milliseconds(quantiles[0.99]):>8} '
+                f'{endpoint_stats.num_response_bytes:>12} {format_milliseconds(endpoint_stats.decode_time):>10} '
+                f'{endpoint_stats.num_retries:>7} {endpoint_stats.num_rate_limit_sleeps:>9} '
+                f'{endpoint_stats.rate_limit_sleep_time:>10.1f}'
+            )
+
+        return '\n'.join(rows)
+
+
+def time_decode(http_client: Any, endpoint: str) -> ContextManager[None]:
+    """
+    Measure the time spent decoding a response of an endpoint, if the HTTP client has a statistics collector.
+
+    :param http_client: The HTTP client with which the response was retrieved.
+    :param endpoint: The name of the endpoint.
+    :return: A context manager.
+    """
+
+    request_stats: Optional[RequestStats] = getattr(http_client, 'request_stats', None)
+    return request_stats.time_decode(endpoint=endpoint) if request_stats is not None else nullcontext()
+
+
+def format_stats(request_stats: RequestStats, stats_format: Union[StatsFormat, str]) -> str:
+    """
+    Format request statistics.
+
+    :param request_stats: The statistics to format.
+    :param stats_format: The format: a summary table, JSON, or the Prometheus text exposition format.
+    :return: The formatted statistics.
+    """
+
+    match StatsFormat(stats_format):
+        case StatsFormat.SUMMARY:
+            return request_stats.summary()
+        case StatsFormat.JSON:
+            return json_dumps(request_stats.to_json_object(), indent=2)
+        case StatsFormat.PROMETHEUS:
+            return request_stats.to_prometheus()
@@ -80,7 +80,8 @@ class Status(JsonDataclass):
     favorited: bool
     retweeted: bool
     lang: str
-    user: Optional[User]
+    # NOTE: Absent in the status embedded in a user object.
+    user: Optional[User] = None
     possibly_sensitive: Optional[bool] = None
     retweeted_status: Optional[Status] = None
     quoted_status_id: Optional[int] = None
@@ -149,12 +150,13 @@ class User(JsonDataclass):
 class SearchMetadata(JsonDataclass):
     completed_in: float
     max_id: int
-    mad_id_str: str
-    next_results: str
+    max_id_str: str
     query: str
     count: int
     since_id: int
     since_id_str: str
+    # NOTE: Absent in the metadata of the last page of results.
+    next_results: Optional[str] = None
 
 
 @dataclass
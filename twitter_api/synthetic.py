@@ -0,0 +1,224 @@
+from typing import Any, Optional
+from datetime import datetime, timezone, timedelta
+
+# The Twitter epoch of snowflake IDs, in milliseconds.
+_SNOWFLAKE_EPOCH_MS = 1288834974657
+
+_BASE_TIME = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+_COLOURS = ('F5F8FA', '1DA1F2', 'C0DEED', '000000', 'DDEEF6', '333333', 'FFFFFF')
+_LANGS = ('en', 'sv', 'de', 'fr', 'es', 'ja')
+
+
+def format_created_at(time: datetime) -> str:
+    return time.strftime('%a %b %d %H:%M:%S +0000 %Y')
+
+
+def status_id_at(time: datetime, sequence: int = 0) -> int:
+    """
+    Make a snowflake status ID for a point in time, so that status IDs are ordered by time as in the API.
+
+    :param time: The point in time.
+    :param sequence: A sequence number distinguishing statuses made at the same millisecond.
+    :return: The status ID.
+    """
+
+    return (int(time.timestamp() * 1000) - _SNOWFLAKE_EPOCH_MS) << 22 | sequence % (1 << 22)
+
+
+def timeline_status_id(user_id: int, index: int) -> int:
+    """
+    Make the status ID of a status of a synthetic user timeline, in which the user posts one status per hour,
+    backwards from the base time.
+
+    :param user_id: The user ID of the author.
+    :param index: The position of the status in the timeline, from the most recent status.
+    :return: The status ID.
+    """
+
+    return status_id_at(time=_BASE_TIME - timedelta(hours=index), sequence=user_id)
+
+
+def search_status_id(sequence: int, index: int) -> int:
+    """
+    Make the status ID of a synthetic search result, with one result per minute, backwards from the base time.
+
+    :param sequence: A sequence number distinguishing the results of different searches.
+    :param index: The position of the result in the search results, from the most recent result.
+    :return: The status ID.
+    """
+
+    return status_id_at(time=_BASE_TIME - timedelta(minutes=index), sequence=sequence + index)
+
+
+def make_user_object(user_id: int, with_status: bool = False) -> dict[str, Any]:
+    """
+    Make a synthetic user object.
+
+    :param user_id: The user ID of the user.
+    :param with_status: Whether to include the user's most recent status, as `users/lookup` does.
+    :return: A user object.
+    """
+
+    screen_name = f'user{user_id}'
+    colour = _COLOURS[user_id % len(_COLOURS)]
+    url = f'https://t.co/{user_id:x}'
+
+    user_object: dict[str, Any] = {
+        'id': user_id,
+        'id_str': str(user_id),
+        'name': f'User {user_id}',
+        'screen_name': screen_name,
+        'location': 'Stockholm, Sweden' if user_id % 3 else '',
+        'description': f'Synthetic user number {user_id}. Posts about things, sometimes other things.',
+        'url': url,
+        'entities': {
+            'url': {
+                'urls': [
+                    {
+                        'url': url,
+                        'expanded_url': f'https://example.com/{screen_name}',
+                        'display_url': f'example.com/{screen_name}',
+                        'indices': [0, 23]
+                    }
+                ]
+            },
+            'description': {'urls': []}
+        },
+        'protected': False,
+        'followers_count': user_id * 7 % 100_000,
+        'friends_count': user_id * 3 % 5_000,
+        'listed_count': user_id % 100,
+        'created_at': format_created_at(_BASE_TIME - timedelta(days=user_id % 4000)),
+        'favourites_count': user_id * 11 % 50_000,
+        'utc_offset': None,
+        'time_zone': None,
+        'geo_enabled': bool(user_id % 2),
+        'verified': user_id % 100 == 0,
+        'statuses_count': user_id * 13 % 200_000,
+        'lang': None,
+        'contributors_enabled': False,
+        'is_translator': False,
+        'is_translation_enabled': False,
+        'profile_background_color': colour,
+        'profile_background_image_url': 'http://abs.twimg.com/images/themes/theme1/bg.png',
+        'profile_background_image_url_https': 'https://abs.twimg.com/images/themes/theme1/bg.png',
+        'profile_background_tile': False,
+        'profile_image_url': f'http://pbs.twimg.com/profile_images/{user_id}/avatar_normal.jpg',
+        'profile_image_url_https': f'https://pbs.twimg.com/profile_images/{user_id}/avatar_normal.jpg',
+        'profile_banner_url': f'https://pbs.twimg.com/profile_banners/{user_id}/1577836800',
+        'profile_link_color': '1DA1F2',
+        'profile_sidebar_border_color': 'C0DEED',
+        'profile_sidebar_fill_color': 'DDEEF6',
+        'profile_text_color': '333333',
+        'profile_use_background_image': True,
+        'has_extended_profile': False,
+        'default_profile': True,
+        'default_profile_image': False,
+        'following': False,
+        'follow_request_sent': False,
+        'notifications': False,
+        'translator_type': 'none'
+    }
+
+    if with_status:
+        user_object['status'] = make_status_object(
+            status_id=status_id_at(time=_BASE_TIME, sequence=user_id),
+            user_object=None
+        )
+
+    return user_object
+
+
+def make_status_object(status_id: int, user_object: Optional[dict[str, Any]]) -> dict[str, Any]:
+    """
+    Make a synthetic status object, in the extended tweet mode.
+
+    :param status_id: The status ID of the status. Its time is derived from it as for snowflake IDs.
+    :param user_object: The user object of the author, or `None` to omit it, as in a user's embedded status.
+    :return: A status object.
+    """
+
+    time = datetime.fromtimestamp(((status_id >> 22) + _SNOWFLAKE_EPOCH_MS) / 1000, tz=timezone.utc)
+    mentioned_user_id = status_id % 1_000_003
+    full_text = (
+        f'@user{mentioned_user_id} Synthetic status {status_id}, long enough to resemble a typical tweet with a '
+        f'few clauses and a link https://t.co/{status_id % 65536:x}'
+    )
+
+    status_object: dict[str, Any] = {
+        'created_at': format_created_at(time),
+        'id': status_id,
+        'id_str': str(status_id),
+        'full_text': full_text,
+        'truncated': False,
+        'display_text_range': [0, len(full_text)],
+        'entities': {
+            'hashtags': [],
+            'symbols': [],
+            'user_mentions': [
+                {
+                    'screen_name': f'user{mentioned_user_id}',
+                    'name': f'User {mentioned_user_id}',
+                    'id': mentioned_user_id,
+                    'id_str': str(mentioned_user_id),
+                    'indices': [0, len(f'@user{mentioned_user_id}')]
+                }
+            ],
+            'urls': [
+                {
+                    'url': f'https://t.co/{status_id % 65536:x}',
+                    'expanded_url': f'https://example.com/{status_id}',
+                    'display_url': f'example.com/{status_id}',
+                    'indices': [len(full_text) - 23, len(full_text)]
+                }
+            ]
+        },
+        'source': '<a href="https://mobile.twitter.com" rel="nofollow">Twitter Web App</a>',
+        'in_reply_to_status_id': None,
+        'in_reply_to_status_id_str': None,
+        'in_reply_to_user_id': None,
+        'in_reply_to_user_id_str': None,
+        'in_reply_to_screen_name': None,
+        'geo': None,
+        'coordinates': None,
+        'place': None,
+        'contributors': None,
+        'is_quote_status': False,
+        'retweet_count': status_id % 97,
+        'favorite_count': status_id % 389,
+        'favorited': False,
+        'retweeted': False,
+        'possibly_sensitive': False,
+        'lang': _LANGS[status_id % len(_LANGS)]
+    }
+
+    if user_object is not None:
+        status_object['user'] = user_object
+
+    return status_object
+
+
+def make_timeline_objects(user_id: int, count: int, max_id: Optional[int] = None) -> list[dict[str, Any]]:
+    """
+    Make a page of a synthetic user timeline, newest first.
+
+    The user posts one status per hour, backwards from the base time.
+
+    :param user_id: The user ID of the author.
+    :param count: The number of statuses in the page.
+    :param max_id: The maximum ID of the statuses in the page.
+    :return: A list of status objects.
+    """
+
+    user_object = make_user_object(user_id=user_id)
+
+    status_ids: list[int] = []
+    hour = 0
+    while len(status_ids) < count:
+        status_id = timeline_status_id(user_id=user_id, index=hour)
+        if max_id is None or status_id <= max_id:
+            status_ids.append(status_id)
+        hour += 1
+
+    return [make_status_object(status_id=status_id, user_object=user_object) for status_id in status_ids]
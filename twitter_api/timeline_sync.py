@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+from typing import Optional, Union, Iterable, AsyncIterator
+from asyncio import Semaphore, gather as asyncio_gather
+from heapq import merge as heapq_merge
+from json import loads as json_loads, dumps as json_dumps
+from pathlib import Path
+
+from httpx import AsyncClient as HTTPXAsyncClient, HTTPStatusError
+
+from twitter_api.calls import iter_user_timeline_statuses, UNAVAILABLE_ACCOUNT_STATUS_CODES
+from twitter_api.cache import user_key
+from twitter_api.structures import Status
+from twitter_api.lazy import LazyStatus
+from twitter_api.checkpoint import PaginationCheckpoint
+
+
+class SinceIdStore:
+    """
+    A JSON file recording the highest status ID seen in the timeline of each user.
+
+    Users are keyed by user ID or screen name, in the same manner as in the response cache.
+    """
+
+    def __init__(self, path: Union[Path, str]):
+        """
+        :param path: The path of the JSON file. It is created when saved if it does not exist.
+        """
+
+        self.path = Path(path)
+
+        try:
+            self.since_ids: dict[str, int] = json_loads(self.path.read_text())
+        except FileNotFoundError:
+            self.since_ids = {}
+
+    def __enter__(self) -> SinceIdStore:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.save()
+
+    def get(self, user_id: Optional[Union[int, str]] = None, screen_name: Optional[str] = None) -> Optional[int]:
+        """
+        Retrieve the highest status ID seen in the timeline of a user.
+
+        :param user_id: The user ID of the user.
+        :param screen_name: The screen name of the user.
+        :return: The highest status ID seen, or `None` if the user's timeline has not been synced.
+        """
+
+        return self.since_ids.get(user_key(user_id=user_id, screen_name=screen_name))
+
+    def update(
+        self,
+        status_id: int,
+        user_id: Optional[Union[int, str]] = None,
+        screen_name: Optional[str] = None
+    ) -> None:
+        """
+        Record a status ID as seen in the timeline of a user, if it is higher than the one recorded.
+
+        :param status_id: The status ID.
+        :param user_id: The user ID of the user.
+        :param screen_name: The screen name of the user.
+        :return: None
+        """
+
+        key: str = user_key(user_id=user_id, screen_name=screen_name)
+        self.since_ids[key] = max(status_id, self.since_ids.get(key, status_id))
+
+    def save(self) -> None:
+        """
+        Write the recorded status IDs to the file, replacing it atomically.
+
+        :return: None
+        """
+
+        temporary_path = self.path.with_name(f'{self.path.name}.tmp')
+        temporary_path.write_text(json_dumps(self.since_ids))
+        temporary_path.replace(self.path)
+
+
+async def sync_user_timeline(
+    http_client: HTTPXAsyncClient,
+    since_id_store: SinceIdStore,
+    user_id: Optional[int] = None,
+    screen_name: Optional[str] = None,
+    **kwargs
+) -> tuple[Status, ...]:
+    """
+    Retrieve the statuses of a user that are newer than the ones seen in an earlier sync.
+
+    The first sync of a user retrieves as much of the user's timeline as the API makes available; later ones only
+    retrieve the statuses posted since, using the highest status ID recorded in the store as `since_id`.
+
+    :param http_client: The HTTP client with which to perform the requests.
+    :param since_id_store: The store of the highest status IDs seen, which is updated with the new statuses.
+    :param user_id: The user id of the user whose statuses to retrieve.
+    :param screen_name: The screen name of the user whose statuses to retrieve.
+    :param kwargs: Keyword arguments to pass to `iter_user_timeline_statuses`.
+    :return: The new statuses, newest first.
+    """
+
+    statuses: tuple[Status, ...] = tuple([
+        status
+        async for page in iter_user_timeline_statuses(
+            http_client=http_client,
+            user_id=user_id,
+            screen_name=screen_name,
+            since_id=since_id_store.get(user_id=user_id, screen_name=screen_name),
+            **kwargs
+        )
+        for status in page
+    ])
+
+    # A resumed sync does not retrieve the statuses retrieved before it was stopped; the newest of them is recorded
+    # in the checkpoint.
+    checkpoint: Optional[PaginationCheckpoint] = kwargs.get('checkpoint')
+    newest_ids: list[int] = [status.id for status in statuses]
+    if checkpoint is not None and checkpoint.newest_id is not None:
+        newest_ids.append(checkpoint.newest_id)
+
+    if newest_ids:
+        since_id_store.update(status_id=max(newest_ids), user_id=user_id, screen_name=screen_name)
+
+    return statuses
+
+
+async def iter_watchlist_statuses(
+    http_client: HTTPXAsyncClient,
+    user_ids: Optional[Iterable[int]] = None,
+    screen_names: Optional[Iterable[str]] = None,
+    since_id_store: Optional[SinceIdStore] = None,
+    max_concurrency: int = 10,
+    initial_max_num_pages: Optional[int] = 1,
+    **kwargs
+) -> AsyncIterator[Union[Status, LazyStatus]]:
+    """
+    Retrieve the new statuses of many users concurrently, and yield them as one stream, oldest first.
+
+    The timelines are retrieved by at most `max_concurrency` concurrent requests. Once all have been retrieved, the
+    timelines, each ordered by status ID, are merged into one stream ordered by status ID, i.e. by time. The users'
+    timelines that are unavailable, e.g. because they are protected, are skipped.
+
+    With a store of the highest status IDs seen, only the statuses newer than the ones of an earlier run are
+    retrieved, and the store is updated once all statuses have been yielded, so that statuses of an interrupted run
+    are retrieved again by the next one.
+
+    :param http_client: The HTTP client with which to perform the requests.
+    :param user_ids: The user IDs of the users whose statuses to retrieve.
+    :param screen_names: The screen names of the users whose statuses to retrieve.
+    :param since_id_store: The store of the highest status IDs seen, with which to retrieve only new statuses.
+    :param max_concurrency: The maximum number of requests to have in flight at the same time.
+    :param initial_max_num_pages: The maximum number of pages to retrieve of the timelines of users without a
+        recorded status ID; `None` to retrieve as much of them as is available.
+    :param kwargs: Keyword arguments to pass to `iter_user_timeline_statuses`.
+    :return: An async iterator of the statuses, oldest first.
+    """
+
+    users: list[tuple[Optional[int], Optional[str]]] = list(dict.fromkeys([
+        *((user_id, None) for user_id in user_ids or ()),
+        *((None, screen_name) for screen_name in screen_names or ())
+    ]))
+
+    semaphore = Semaphore(max_concurrency)
+
+    async def retrieve_timeline(user_id: Optional[int], screen_name: Optional[str]) -> list[Union[Status, LazyStatus]]:
+        since_id: Optional[int] = (
+            since_id_store.get(user_id=user_id, screen_name=screen_name) if since_id_store is not None else None
+        )
+        max_num_pages: Optional[int] = initial_max_num_pages if since_id is None else None
+
+        statuses: list[Union[Status, LazyStatus]] = []
+
+        async with semaphore:
+            try:
+                async for page in iter_user_timeline_statuses(
+                    http_client=http_client,
+                    user_id=user_id,
+                    screen_name=screen_name,
+                    since_id=since_id,
+                    **kwargs
+                ):
+                    statuses.extend(page)
+                    if max_num_pages is not None and (max_num_pages := max_num_pages - 1) <= 0:
+                        break
+            except HTTPStatusError as e:
+                if e.response.status_code not in UNAVAILABLE_ACCOUNT_STATUS_CODES:
+                    raise
+
+        # Oldest first.
+        statuses.reverse()
+        return statuses
+
+    timelines: list[list[Union[Status, LazyStatus]]] = await asyncio_gather(
+        *(retrieve_timeline(user_id=user_id, screen_name=screen_name) for user_id, screen_name in users)
+    )
+
+    for status in heapq_merge(*timelines, key=lambda status: status.id):
+        yield status
+
+    if since_id_store is not None:
+        for (user_id, screen_name), statuses in zip(users, timelines):
+            if statuses:
+                since_id_store.update(status_id=statuses[-1].id, user_id=user_id, screen_name=screen_name)
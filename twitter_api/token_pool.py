@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from typing import Iterable, Union
+from json import loads as json_loads
+from pathlib import Path
+
+from httpx_oauth.v1 import OAuthAuth
+
+from twitter_api.structures import AccessTokenResponse
+
+
+class TokenPool:
+    """
+    A pool of access tokens of the same consumer, each with rate limit windows of its own.
+
+    Attached to a `RateLimitedAsyncClient`, each request is signed with the token that has the most remaining budget
+    for the request's endpoint, so that the throughput scales with the number of tokens.
+    """
+
+    def __init__(self, consumer_key: str, consumer_secret: str, access_tokens: Iterable[AccessTokenResponse]):
+        """
+        :param consumer_key: The consumer key of the application the access tokens were issued to.
+        :param consumer_secret: The consumer secret of the application the access tokens were issued to.
+        :param access_tokens: The access tokens to pool.
+        """
+
+        self.auths: dict[str, OAuthAuth] = {}
+
+        for access_token in access_tokens:
+            auth = OAuthAuth(consumer_key=consumer_key, consumer_secret=consumer_secret)
+            auth.oauth_access_token = access_token.oauth_token
+            auth.oauth_access_token_secret = access_token.oauth_token_secret
+
+            self.auths[access_token.oauth_token] = auth
+
+        if not self.auths:
+            raise ValueError('A token pool requires at least one access token.')
+
+    def __len__(self) -> int:
+        return len(self.auths)
+
+    @classmethod
+    def from_paths(
+        cls,
+        consumer_key: str,
+        consumer_secret: str,
+        paths: Iterable[Union[Path, str]]
+    ) -> TokenPool:
+        """
+        Make a token pool from files storing access tokens, as written by `twitter_api.utils.set_auth_tokens`.
+
+        :param consumer_key: The consumer key of the application the access tokens were issued to.
+        :param consumer_secret: The consumer secret of the application the access tokens were issued to.
+        :param paths: Paths of access token files, or of directories whose `.json` files are access token files.
+        :return: A token pool of the access tokens in the files.
+        """
+
+        token_paths: list[Path] = []
+
+        for path in paths:
+            path = Path(path)
+            if path.is_dir():
+                token_paths.extend(sorted(path.glob('*.json')))
+            else:
+                token_paths.append(path)
+
+        return cls(
+            consumer_key=consumer_key,
+            consumer_secret=consumer_secret,
+            access_tokens=(
+                AccessTokenResponse.from_json(json_object=json_loads(s=token_path.read_text()))
+                for token_path in token_paths
+            )
+        )
@@ -1,7 +1,8 @@
-from typing import Optional, Union
+from typing import Optional, Union, Iterable, Iterator
 from dataclasses import asdict
 from json import loads as json_loads, dumps as json_dumps
 from pathlib import Path
+from sys import stdin
 
 from httpx import AsyncClient as HTTPXAsyncClient
 
@@ -49,3 +50,56 @@ async def set_auth_tokens(
 
     http_client.auth.oauth_access_token = access_token_response.oauth_token
     http_client.auth.oauth_access_token_secret = access_token_response.oauth_token_secret
+
+
+def _iter_user_list(lines: Iterable[str]) -> Iterator[tuple[Optional[str], Optional[str]]]:
+    """
+    Parse the lines of a list of users, with one user per line, either a user ID or a screen name.
+
+    Screen names may be prefixed with `@`. Blank lines and lines starting with `#` are ignored.
+
+    :param lines: The lines of the list.
+    :return: An iterator of pairs of a user ID and a screen name, one of which is `None`.
+    """
+
+    for line in lines:
+        if not (line := line.strip()) or line.startswith('#'):
+            continue
+
+        if line.isdigit():
+            yield line, None
+        else:
+            yield None, line.removeprefix('@')
+
+
+def read_user_list(path: Union[Path, str]) -> tuple[list[int], list[str]]:
+    """
+    Read a list of users from a file with one user per line, either a user ID or a screen name.
+
+    Screen names may be prefixed with `@`. Blank lines and lines starting with `#` are ignored.
+
+    :param path: The path of the file.
+    :return: The user IDs and the screen names in the file.
+    """
+
+    user_ids: list[int] = []
+    screen_names: list[str] = []
+
+    for user_id, screen_name in _iter_user_list(lines=Path(path).read_text().splitlines()):
+        if user_id is not None:
+            user_ids.append(int(user_id))
+        else:
+            screen_names.append(screen_name)
+
+    return user_ids, screen_names
+
+
+def read_targets(path: Union[Path, str]) -> list[tuple[Optional[str], Optional[str]]]:
+    """
+    Read the users on which to perform an action from a file in the format of `read_user_list`, keeping their order.
+
+    :param path: The path of the file, or `-` to read standard input.
+    :return: Pairs of a user ID and a screen name, one of which is `None`, in the order of the file.
+    """
+
+    return list(_iter_user_list(lines=stdin if str(path) == '-' else Path(path).read_text().splitlines()))
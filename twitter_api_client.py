@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+
+from argparse import ArgumentParser
+from json import loads as json_loads, dumps as json_dumps
+from socket import socket, AF_UNIX, AF_INET, SOCK_STREAM
+from sys import stdout, stderr, exit as sys_exit
+
+# NOTE: Only the standard library is imported, so that an invocation costs little more than the interpreter startup;
+# the actions are performed by a server started with the serve action of `twitter_api.py`.
+
+
+def main():
+    parser = ArgumentParser(description='Perform an action using the Twitter API through a running serve action.')
+
+    parser.add_argument(
+        'action',
+        help='The Twitter API action to perform.',
+        choices=['user', 'followers', 'following', 'timeline']
+    )
+
+    user_group = parser.add_mutually_exclusive_group(required=True)
+    user_group.add_argument('--user-id', help='An user ID of an user to examine.')
+    user_group.add_argument('--screen-name', help='A screen name of a user to examine.')
+
+    parser.add_argument(
+        '--full-history',
+        help='Retrieve as much of the timeline as is available rather than only the most recent page.',
+        action='store_true'
+    )
+
+    parser.add_argument(
+        '--output-format',
+        help='The format in which to output the results of the action; NDJSON writes one record per user or status.',
+        choices=['text', 'ndjson'],
+        default='text'
+    )
+
+    server_group = parser.add_mutually_exclusive_group(required=True)
+    server_group.add_argument('--socket-path', help='The path of the Unix socket on which the server listens.')
+    server_group.add_argument(
+        '--port',
+        help='The port of the loopback interface on which the server listens.',
+        type=int
+    )
+
+    args = parser.parse_args()
+
+    request: dict = dict(
+        action=args.action,
+        user_id=args.user_id,
+        screen_name=args.screen_name,
+        full_history=args.full_history,
+        records=args.output_format == 'ndjson'
+    )
+
+    with socket(AF_UNIX if args.socket_path is not None else AF_INET, SOCK_STREAM) as connection:
+        connection.connect(args.socket_path if args.socket_path is not None else ('127.0.0.1', args.port))
+        connection.sendall(json_dumps(request).encode() + b'\n')
+
+        with connection.makefile(mode='rb') as response_file:
+            for line in response_file:
+                response: dict = json_loads(line)
+
+                if 'result' in response:
+                    result = response['result']
+                    stdout.write((result if isinstance(result, str) else json_dumps(result, ensure_ascii=False)) + '\n')
+                elif 'error' in response:
+                    error: dict = response['error']
+                    print(error['message'] + (f'\n{error["body"]}' if error.get('body') else ''), file=stderr)
+                    sys_exit(1)
+                else:
+                    break
+
+    stdout.flush()
+
+
+if __name__ == '__main__':
+    main()